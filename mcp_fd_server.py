@@ -112,7 +112,13 @@ FZF_EXIT_INTERRUPT = 130  # User interrupted (e.g., Ctrl+C)
 # Binary discovery helpers
 # ---------------------------------------------------------------------------
 
-FD_EXECUTABLE: str | None = shutil.which("fd") or shutil.which("fdfind")
+
+def _detect_fd(which=shutil.which) -> str | None:
+    """Locate fd, falling back to the ``fdfind`` name used by Debian/Ubuntu."""
+    return which("fd") or which("fdfind")
+
+
+FD_EXECUTABLE: str | None = _detect_fd()
 FZF_EXECUTABLE: str | None = shutil.which("fzf")
 
 # Platform detection
@@ -451,7 +457,11 @@ def filter_files(
 # ---------------------------------------------------------------------------
 
 
-def _cli() -> None:
+def _cli(argv: list[str] | None = None) -> int:
+    """Run one CLI sub-command and print its JSON result.
+
+    *argv* defaults to ``sys.argv[1:]``; the return value is the exit code.
+    """
     parser = argparse.ArgumentParser(
         description="fd + fzf powers, CLI mode",
         epilog="fzf query examples: 'config .json$', '^src py$ | js$', ''main.py'' !test'",
@@ -480,7 +490,7 @@ def _cli() -> None:
         "--multiline", action="store_true", help="Enable multiline content search"
     )
 
-    ns = parser.parse_args()
+    ns = parser.parse_args(argv)
 
     if ns.cmd == "search":
         res = search_files(ns.pattern, ns.path, ns.limit, ns.flags)
@@ -497,6 +507,7 @@ def _cli() -> None:
         )
 
     print(json.dumps(res, indent=2))
+    return 0
 
 
 # ---------------------------------------------------------------------------
@@ -505,7 +516,7 @@ def _cli() -> None:
 
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        _cli()
+        sys.exit(_cli())
     else:
         # Ensure required binaries before exposing tools to LLMs
         _require(FD_EXECUTABLE, "fd")
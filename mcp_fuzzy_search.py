@@ -19,6 +19,8 @@ Tools exposed to LLMs
 * **`fuzzy_search_files`** – Search for file paths using fuzzy matching.
 * **`fuzzy_search_content`** – Search file contents with ripgrep, then apply
   fuzzy filtering to the results. Supports both path+content and content-only modes.
+* **`fuzzy_search_content_batch`** – Apply several fuzzy filters to one ripgrep
+  scan, so a burst of related content queries walks the tree only once.
 
 Understanding the Search Pipeline
 --------------------------------
@@ -88,32 +90,68 @@ Varol Aksoy (@vaksoy)
 from __future__ import annotations
 
 import argparse
+import functools
+import importlib.util
 import json
 import logging
-import os
 import platform
 import re
 import shutil
 import subprocess
 import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from itertools import islice
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
+import anyio
 from mcp.server.fastmcp import FastMCP
 
 if TYPE_CHECKING:
     import fitz
 
-try:
+# PyMuPDF takes ~100ms to import, so only look for it here and import it the
+# first time a PDF is actually opened
+PYMUPDF_AVAILABLE = importlib.util.find_spec("fitz") is not None
+
+
+@functools.cache
+def _get_fitz():
+    """Import PyMuPDF on first use."""
     import fitz  # PyMuPDF
 
-    PYMUPDF_AVAILABLE = True
+    return fitz
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve ``mcp_fuzzy_search.fitz`` lazily for code that reaches the module through us
+    if name == "fitz":
+        return _get_fitz()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# PyMuPDF is not thread-safe, and fuzzy_search_documents labels pages from a
+# worker thread while the PDF tools run on the event loop, so every fitz
+# access (and the shared document cache) goes through this lock. Hold it only
+# around PyMuPDF calls, never across fzf/pandoc, so the loop is not held up.
+_fitz_lock = threading.RLock()
+
+
+try:
+    import orjson
 except ImportError:
-    PYMUPDF_AVAILABLE = False
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except covers both
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # Tool names as seen by LLMs
 FUZZY_SEARCH_FILES_TOOL = "fuzzy_search_files"
 FUZZY_SEARCH_CONTENT_TOOL = "fuzzy_search_content"
+FUZZY_SEARCH_CONTENT_BATCH_TOOL = "fuzzy_search_content_batch"
 FUZZY_SEARCH_DOCUMENTS_TOOL = "fuzzy_search_documents"
 EXTRACT_PDF_PAGES_TOOL = "extract_pdf_pages"
 GET_PDF_OUTLINE_TOOL = "get_pdf_outline"
@@ -124,12 +162,25 @@ DEFAULT_LIMIT = 20
 DEFAULT_HIDDEN = False
 DEFAULT_MULTILINE = False
 
+# Longest line rg hands to fzf; match content is truncated to 2048 chars anyway
+RG_MAX_COLUMNS = 2048
+
+# Most PyMuPDF documents the PDF tools keep open between calls
+PDF_CACHE_MAX = 8
+
 # Executables - will check availability at startup
 RG_EXECUTABLE = shutil.which("rg")
 FZF_EXECUTABLE = shutil.which("fzf")
 RGA_EXECUTABLE = shutil.which("rga")
 PANDOC_EXECUTABLE = shutil.which("pandoc")
 
+# One ``rg --line-number`` record: file:line:content, where the file may carry
+# a Windows drive prefix (C:\path\file.py:123:content)
+_RG_LINE_RE = re.compile(r"^((?:[A-Za-z]:)?[^:\n]+):(\d+):(.*)$", re.MULTILINE)
+
+# rga's pdf adapter prefixes each line of page text with "Page N: "
+_PDF_PAGE_RE = re.compile(r"Page (\d+): ")
+
 # fzf exit codes (based on fzf source code constants)
 FZF_EXIT_OK = 0  # Success with matches
 FZF_EXIT_NO_MATCH = 1  # No matches found (NOT an error condition)
@@ -147,6 +198,25 @@ logger = logging.getLogger(__name__)
 mcp = FastMCP("fuzzy-search")
 
 
+def _threaded_tool(**tool_kwargs: Any) -> Callable[[Callable], Callable]:
+    """Register a blocking tool that FastMCP runs in a worker thread.
+
+    The decorated function is returned unchanged so the CLI and direct callers
+    keep the sync API; only the MCP registration goes through the thread pool,
+    leaving the event loop free while rg/fzf run.
+    """
+
+    def decorator(fn: Callable[..., dict[str, Any]]) -> Callable[..., dict[str, Any]]:
+        @functools.wraps(fn)
+        async def run_in_thread(**kwargs: Any) -> dict[str, Any]:
+            return await anyio.to_thread.run_sync(functools.partial(fn, **kwargs))
+
+        mcp.tool(**tool_kwargs)(run_in_thread)
+        return fn
+
+    return decorator
+
+
 def _require(exe: str | None, name: str) -> str:
     """Ensure required executable exists."""
     if not exe:
@@ -154,6 +224,193 @@ def _require(exe: str | None, name: str) -> str:
     return exe
 
 
+def _root_search_error(path: str, confirm_root: bool) -> dict[str, Any] | None:
+    """Return the error for an unconfirmed search from the filesystem root, if any."""
+    resolved_path = Path(path).resolve()
+
+    # Check for root path on different platforms
+    if platform.system() == "Windows":
+        # On Windows, check if it's a drive root like C:\ or just \
+        is_root = str(resolved_path) in ["/", "\\"] or (
+            len(str(resolved_path)) <= 3 and str(resolved_path).endswith(("\\", "/"))
+        )
+    else:
+        # On Unix-like systems, check if it's /
+        is_root = str(resolved_path) == "/"
+
+    if is_root and not confirm_root:
+        return {
+            "error": (
+                "Searching from root directory (/) is likely incorrect and could be very slow. "
+                "If you really want to search from root, please set confirm_root=True. "
+                "Otherwise, specify a more specific directory path."
+            )
+        }
+    return None
+
+
+def _read_file_bytes(file_path: str) -> bytes:
+    """Read a file's raw bytes for a multiline fzf record."""
+    with Path(file_path).open("rb") as f:
+        return f.read()
+
+
+def _build_multiline_input(file_paths: list[str]) -> bytes:
+    """Join one NUL-terminated ``path:`` + content record per readable file."""
+    records = []
+    for file_path in file_paths:
+        try:
+            content = _read_file_bytes(file_path)
+        except OSError:
+            continue  # Skip files that can't be read
+        records.append(f"{file_path}:\n".encode() + content + b"\0")
+    return b"".join(records)
+
+
+def _nul_records(buf: bytes) -> Iterator[memoryview]:
+    """Lazily yield the non-empty NUL-separated records of *buf* as zero-copy views.
+
+    Callers that stop at their result limit never slice the remaining output;
+    ``str(view, "utf-8")`` decodes a record without an intermediate bytes copy.
+    """
+    view = memoryview(buf)
+    start, end_of_buf = 0, len(buf)
+    while start < end_of_buf:
+        end = buf.find(b"\0", start)
+        if end == -1:
+            end = end_of_buf
+        if end > start:
+            yield view[start:end]
+        start = end + 1
+
+
+def _split_head(record: str) -> tuple[str, str] | None:
+    """Split a multiline record into its ``path`` and content, or None if headless."""
+    idx = record.find(":\n")
+    if idx == -1:
+        return None
+    return record[:idx], record[idx + 2 :]
+
+
+def _rg_type_flags(file_types: str) -> list[str]:
+    """Turn comma-separated rg type names (``py,rust``) into ``--type`` flags."""
+    return [f"--type={ft.strip()}" for ft in file_types.split(",") if ft.strip()]
+
+
+def _rg_content_cmd(
+    rg_bin: str, path: str, hidden: bool, rg_flags: str, file_types: str
+) -> list[str]:
+    """Build the ``rg --line-number`` command that lists every line under *path*."""
+    rg_cmd = [
+        rg_bin,
+        "--line-number",
+        "--no-heading",
+        "--color=never",
+    ]
+    if hidden:
+        rg_cmd.append("--hidden")
+    rg_cmd.extend(_rg_type_flags(file_types))
+    user_flags = rg_flags.split()
+    # Cap pathological lines (minified JS, lockfiles) unless the caller set a cap;
+    # --max-columns-preview alone only shapes how capped lines are shown
+    if not any(
+        f in ("-M", "--max-columns")
+        or f.startswith("--max-columns=")
+        or (f.startswith("-M") and f[2:].isdigit())
+        for f in user_flags
+    ):
+        rg_cmd.extend([f"--max-columns={RG_MAX_COLUMNS}", "--max-columns-preview"])
+    rg_cmd.extend(user_flags)
+    search_path = str(Path(path).resolve())
+
+    # If searching a single file, ensure filename is included in output
+    if Path(search_path).is_file():
+        rg_cmd.append("--with-filename")
+
+    rg_cmd.extend([".", search_path])  # Search for all content in the path
+    return rg_cmd
+
+
+def _fzf_content_cmd(fzf_bin: str, fuzzy_filter: str, content_only: bool) -> list[str]:
+    """Build the fzf filter for ``file:line:content`` records.
+
+    By default fzf matches the file path (field 1) and content (field 3+),
+    skipping the line number; *content_only* drops the path as well.
+    """
+    nth = "--nth=3.." if content_only else "--nth=1,3.."
+    return [fzf_bin, "--filter", fuzzy_filter, "--delimiter", ":", nth]
+
+
+def _parse_content_matches(out: str, limit: int) -> list[dict[str, Any]]:
+    """Turn fzf's ranked ``file:line:content`` output into at most *limit* matches."""
+    matches = []
+    for m in _RG_LINE_RE.finditer(out):
+        if len(matches) >= limit:
+            break  # fzf output is ranked; the rest would be dropped
+        content = m[3].strip()
+        # Truncate content to 2048 characters if needed
+        if len(content) > 2048:
+            content = content[:2048] + "..."
+        matches.append({"file": m[1], "line": int(m[2]), "content": content})
+    return matches
+
+
+def _parse_multiline_matches(out: bytes, limit: int) -> list[dict[str, Any]]:
+    """Turn NUL-separated ``path:`` + content records into at most *limit* matches."""
+    matches = []
+    for chunk in _nul_records(out):
+        if len(matches) >= limit:
+            break  # fzf output is ranked; the rest would be dropped
+        try:
+            decoded = str(chunk, "utf-8")
+        except UnicodeDecodeError:
+            continue
+        # Extract filename from first line
+        head = _split_head(decoded)
+        if head is not None:
+            file_part, content_part = head
+            content = content_part.strip()
+            # Truncate content to 2048 characters if needed
+            if len(content) > 2048:
+                content = content[:2048] + "..."
+            matches.append(
+                {
+                    "file": file_part.strip(),
+                    "line": 1,  # Multiline records don't have specific line numbers
+                    "content": content,
+                }
+            )
+    return matches
+
+
+def _rg_passthrough(rg_cmd: list[str], limit: int) -> dict[str, Any]:
+    """Return rg's first *limit* lines as content matches, without running fzf.
+
+    A blank fuzzy filter matches every line, so fzf would only echo rg's
+    output back; rg is stopped as soon as enough lines have been read.
+    """
+    with tempfile.TemporaryFile() as rg_stderr_file:
+        rg_proc = subprocess.Popen(
+            rg_cmd, stdout=subprocess.PIPE, stderr=rg_stderr_file
+        )
+        try:
+            head = b"".join(islice(rg_proc.stdout, limit))
+        finally:
+            if rg_proc.poll() is None:
+                rg_proc.kill()
+            rg_proc.wait()
+            rg_proc.stdout.close()
+        rg_stderr_file.seek(0)
+        rg_stderr = rg_stderr_file.read().decode(errors="replace")
+
+    if not head and rg_proc.returncode > 1:  # 1 = no matches, < 0 = killed by us
+        return {
+            "error": rg_stderr.strip()
+            or f"ripgrep failed with code {rg_proc.returncode}"
+        }
+    return {"matches": _parse_content_matches(head.decode(errors="replace"), limit)}
+
+
 def _handle_fzf_error(exc: subprocess.CalledProcessError) -> dict[str, Any]:
     """Handle fzf CalledProcessError, returning appropriate result dict.
 
@@ -176,28 +433,158 @@ def _handle_fzf_error(exc: subprocess.CalledProcessError) -> dict[str, Any]:
     return {"error": str(exc)}
 
 
-def _get_page_label(doc, page_idx: int) -> str:
-    """Get the label for a specific page index.
+# Open documents for the PDF tools, keyed by (resolved path, mtime_ns, size),
+# oldest first
+_pdf_cache: OrderedDict[tuple[str, int, int], fitz.Document] = OrderedDict()
 
-    Args:
-        doc: PyMuPDF document object
-        page_idx: 0-based page index
 
-    Returns:
-        Page label string, or str(page_idx + 1) if no label
+def _open_pdf_cached(pdf_path: Path) -> fitz.Document:
+    """Open a PDF, reusing the document from an earlier call while it is unchanged.
+
+    The key includes mtime and size, so an edited file is reopened and its
+    stale document closed; past PDF_CACHE_MAX entries the least recently used
+    one is closed. Documents are opened from the file's bytes, so no handle
+    stays open to block replacing or deleting it (notably on Windows).
+    Callers share the document, must not close or modify it, and may only
+    use it while holding _fitz_lock.
     """
-    try:
-        # Use PyMuPDF's page.get_label() method
-        page = doc[page_idx]
-        if hasattr(page, "get_label"):
-            label = page.get_label()
-            if label:
-                return label
-    except Exception:
-        pass
+    pdf_path = pdf_path.resolve()
+    st = pdf_path.stat()
+    key = (str(pdf_path), st.st_mtime_ns, st.st_size)
+    with _fitz_lock:
+        doc = _pdf_cache.get(key)
+        if doc is not None:
+            _pdf_cache.move_to_end(key)
+            return doc
+
+        for stale in [k for k in _pdf_cache if k[0] == key[0]]:
+            _pdf_cache.pop(stale).close()
+        doc = _get_fitz().open(stream=pdf_path.read_bytes(), filetype="pdf")
+        _pdf_cache[key] = doc
+        while len(_pdf_cache) > PDF_CACHE_MAX:
+            _pdf_cache.popitem(last=False)[1].close()
+        return doc
+
+
+def _index_rga_matches(
+    records: Iterable[bytes], limit: int | None = None
+) -> dict[str, tuple[str, int, str, str]]:
+    """Map each ``file:line:text`` fzf input line to its rga match fields.
+
+    The dict's keys, in rga's order, are the deduplicated fzf input. With
+    *limit*, reading stops once that many distinct matches are collected.
+    """
+    line_to_data: dict[str, tuple[str, int, str, str]] = {}
+    for line in records:
+        if limit is not None and len(line_to_data) >= limit:
+            break
+        # Skip begin/end/summary records without paying for a JSON parse
+        if b'"type":"match"' not in line:
+            continue
+
+        try:
+            data = _json_loads(line)
+        except json.JSONDecodeError:
+            continue
+        if data.get("type") != "match":
+            continue
+
+        match_data = data.get("data", {})
+        file_path = match_data.get("path", {}).get("text", "")
+        line_num = match_data.get("line_number") or 0
+
+        # Extract text from lines, stripping newlines for consistent formatting
+        text = match_data.get("lines", {}).get("text", "").strip()
+
+        # Extract matched text from submatches
+        submatches = match_data.get("submatches", [])
+        match_text = submatches[0]["match"]["text"] if submatches else text
+
+        # A repeated record (same file, line and text) would only be scored
+        # and returned twice
+        formatted = f"{file_path}:{line_num}:{text}"
+        if formatted in line_to_data:
+            continue
+
+        # Keep just the raw fields; only fzf's survivors become dicts
+        line_to_data[formatted] = (file_path, line_num, text, match_text)
+    return line_to_data
+
+
+def _document_match(
+    file_path: str, line_num: int, text: str, match_text: str
+) -> dict[str, Any]:
+    """Build a fuzzy_search_documents result from one rga match record."""
+    # Parse page number from "Page N: " prefix if present
+    page_number = None
+    content = text  # Default to full text
+    page_match = _PDF_PAGE_RE.match(text)
+    if page_match:
+        page_number = int(page_match[1])
+        # Strip the "Page N: " prefix from content
+        content = text[page_match.end() :]
+
+    # Truncate content and match_text to 2048 characters if needed
+    if len(content) > 2048:
+        content = content[:2048] + "..."
+    if len(match_text) > 2048:
+        match_text = match_text[:2048] + "..."
+
+    result_data: dict[str, Any] = {
+        "file": file_path,
+        "line": line_num,
+        "content": content,
+        "match_text": match_text,
+    }
+
+    # Add page information if available
+    if page_number is not None:
+        result_data["page"] = page_number  # 1-based page number from ripgrep-all
+        result_data["page_index_0based"] = (
+            page_number - 1
+        )  # 0-based index for programmatic access
+
+    return result_data
+
+
+def _pdf_page_labels(file_path: str, page_indices: set[int]) -> dict[int, str]:
+    """Read the labels of *page_indices* from one PDF, opening it only once.
+
+    Pages outside the document are skipped; an unreadable file yields no
+    labels rather than an error, since labels only decorate search results.
+    """
+    labels: dict[int, str] = {}
+    with _fitz_lock:
+        try:
+            doc = _get_fitz().open(file_path)
+        except Exception:
+            return labels
+        try:
+            for idx in sorted(page_indices):
+                if 0 <= idx < doc.page_count:
+                    # One bad page must not cost the others their labels
+                    try:
+                        labels[idx] = doc[idx].get_label()
+                    except Exception:
+                        continue
+        finally:
+            doc.close()
+    return labels
 
-    # Default to 1-based physical page number
-    return str(page_idx + 1)
+
+def _label_pdf_matches(matches: list[dict[str, Any]]) -> None:
+    """Add ``page_label`` to document matches on PDF pages, opening each file once."""
+    if not PYMUPDF_AVAILABLE:
+        return
+    pdf_pages: dict[str, set[int]] = {}
+    for match in matches:
+        if "page" in match and match["file"].lower().endswith(".pdf"):
+            pdf_pages.setdefault(match["file"], set()).add(match["page_index_0based"])
+    labels = {f: _pdf_page_labels(f, idxs) for f, idxs in pdf_pages.items()}
+    for match in matches:
+        label = labels.get(match["file"], {}).get(match.get("page_index_0based"))
+        if label:
+            match["page_label"] = label
 
 
 def _int_to_roman(num: int) -> str:
@@ -541,117 +928,116 @@ def extract_pdf_pages(
         return {"error": "Cannot use both zero_based and one_based flags together"}
 
     try:
-        # Open PDF with PyMuPDF
-        doc: fitz.Document = fitz.open(pdf_path)
-
-        # Parse page specifications
-        page_indices = []
-        index_to_spec = {}  # Map page index to original specification
-
-        for page_spec in pages.split(","):
-            page_spec = page_spec.strip()
-            if not page_spec:
-                continue
+        # Hold the PyMuPDF lock only while reading the PDF; fzf and pandoc run after
+        with _fitz_lock:
+            # Open PDF with PyMuPDF
+            doc: fitz.Document = _open_pdf_cached(pdf_path)
+
+            # get_page_labels() only returns the label rules, so resolve each
+            # page's own label, once per page per call
+            @functools.cache
+            def label_of(idx: int) -> str:
+                return doc[idx].get_label() or str(idx + 1)
+
+            # Parse page specifications
+            page_indices = []
+            index_to_spec = {}  # Map page index to original specification
+
+            for page_spec in pages.split(","):
+                page_spec = page_spec.strip()
+                if not page_spec:
+                    continue
 
-            # Use appropriate parsing function based on flags
-            if zero_based:
-                spec_indices = _parse_page_spec_zero_based(page_spec, doc)
-                if not spec_indices:
-                    doc.close()
-                    return {
-                        "error": f"Invalid page specification: '{page_spec}'. Must be a valid 0-based index or range (0 to {doc.page_count - 1})."
-                    }
-            elif one_based:
-                spec_indices = _parse_page_spec_one_based(page_spec, doc)
-                if not spec_indices:
-                    doc.close()
-                    return {
-                        "error": f"Invalid page specification: '{page_spec}'. Must be a valid 1-based page number or range (1 to {doc.page_count})."
-                    }
-            else:
-                spec_indices = _parse_page_spec_pymupdf(page_spec, doc)
-                if not spec_indices:
-                    doc.close()
-                    return {
-                        "error": f"Invalid page specification: '{page_spec}'. Not found as page label or valid page number."
-                    }
+                # Use appropriate parsing function based on flags
+                if zero_based:
+                    spec_indices = _parse_page_spec_zero_based(page_spec, doc)
+                    if not spec_indices:
+                        return {
+                            "error": f"Invalid page specification: '{page_spec}'. Must be a valid 0-based index or range (0 to {doc.page_count - 1})."
+                        }
+                elif one_based:
+                    spec_indices = _parse_page_spec_one_based(page_spec, doc)
+                    if not spec_indices:
+                        return {
+                            "error": f"Invalid page specification: '{page_spec}'. Must be a valid 1-based page number or range (1 to {doc.page_count})."
+                        }
+                else:
+                    spec_indices = _parse_page_spec_pymupdf(page_spec, doc)
+                    if not spec_indices:
+                        return {
+                            "error": f"Invalid page specification: '{page_spec}'. Not found as page label or valid page number."
+                        }
 
-            # Map each index to its original specification
-            # For ranges, map each index to its individual page number/label
-            if "-" in page_spec and len(spec_indices) > 1:
-                # This is a range - map each page to its actual label or index
-                for idx in spec_indices:
-                    if idx not in index_to_spec:  # Only map first occurrence
-                        if zero_based:
-                            # For zero-based mode, use the 0-based index
-                            index_to_spec[idx] = str(idx)
-                        elif one_based:
-                            # For one-based mode, use the 1-based page number
-                            index_to_spec[idx] = str(idx + 1)
-                        else:
-                            # Get the actual label for this page
-                            labels = doc.get_page_labels()  # type: ignore[attr-defined]
-                            if labels and idx < len(labels):
-                                index_to_spec[idx] = labels[idx]
-                            else:
+                # Map each index to its original specification
+                # For ranges, map each index to its individual page number/label
+                if "-" in page_spec and len(spec_indices) > 1:
+                    # This is a range - map each page to its actual label or index
+                    for idx in spec_indices:
+                        if idx not in index_to_spec:  # Only map first occurrence
+                            if zero_based:
+                                # For zero-based mode, use the 0-based index
+                                index_to_spec[idx] = str(idx)
+                            elif one_based:
+                                # For one-based mode, use the 1-based page number
                                 index_to_spec[idx] = str(idx + 1)
+                            else:
+                                # Get the actual label for this page
+                                index_to_spec[idx] = label_of(idx)
+                else:
+                    # Single page specification
+                    for idx in spec_indices:
+                        if idx not in index_to_spec:  # Only map first occurrence
+                            index_to_spec[idx] = page_spec
+
+                page_indices.extend(spec_indices)
+
+            if not page_indices:
+                return {"error": "No valid pages specified."}
+
+            # Remove duplicates while preserving order
+            seen = set()
+            unique_indices = []
+            for idx in page_indices:
+                if idx not in seen:
+                    seen.add(idx)
+                    unique_indices.append(idx)
+
+            # Extract content based on format
+            # Determine extraction format
+            if format == "html" or (format == "markdown" and PANDOC_EXECUTABLE):
+                # Extract as HTML for pandoc conversion
+                extract_format = "html"
             else:
-                # Single page specification
-                for idx in spec_indices:
-                    if idx not in index_to_spec:  # Only map first occurrence
-                        index_to_spec[idx] = page_spec
-
-            page_indices.extend(spec_indices)
-
-        if not page_indices:
-            doc.close()
-            return {"error": "No valid pages specified."}
-
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_indices = []
-        for idx in page_indices:
-            if idx not in seen:
-                seen.add(idx)
-                unique_indices.append(idx)
-
-        # Extract content based on format
-        # Determine extraction format
-        if format == "html" or (format == "markdown" and PANDOC_EXECUTABLE):
-            # Extract as HTML for pandoc conversion
-            extract_format = "html"
-        else:
-            # Extract as plain text
-            extract_format = "text"
-
-        # Extract pages and store individually for potential filtering
-        page_data = []  # List of (idx, label, content) tuples
-
-        for idx in unique_indices:
-            page = doc[idx]
-
-            # Get page label for context
-            labels = doc.get_page_labels()  # type: ignore[attr-defined]
-            page_label = labels[idx] if labels and idx < len(labels) else str(idx + 1)
-
-            # Extract content
-            if extract_format == "html":
-                page_content = page.get_text("html")
-                # Clean HTML if requested
-                if clean_html:
-                    # Remove style attributes
-                    page_content = re.sub(r'\sstyle="[^"]*"', "", page_content)
-                    # Remove font tags
-                    page_content = re.sub(r"</?font[^>]*>", "", page_content)
-                    # Remove span tags but keep content
-                    page_content = re.sub(r"<span[^>]*>", "", page_content)
-                    page_content = re.sub(r"</span>", "", page_content)
-            else:
-                # Plain text extraction
-                page_content = page.get_text("text")
+                # Extract as plain text
+                extract_format = "text"
+
+            # Extract pages and store individually for potential filtering
+            page_data = []  # List of (idx, label, content) tuples
+
+            for idx in unique_indices:
+                page = doc[idx]
+
+                # Get page label for context
+                page_label = label_of(idx)
+
+                # Extract content
+                if extract_format == "html":
+                    page_content = page.get_text("html")
+                    # Clean HTML if requested
+                    if clean_html:
+                        # Remove style attributes
+                        page_content = re.sub(r'\sstyle="[^"]*"', "", page_content)
+                        # Remove font tags
+                        page_content = re.sub(r"</?font[^>]*>", "", page_content)
+                        # Remove span tags but keep content
+                        page_content = re.sub(r"<span[^>]*>", "", page_content)
+                        page_content = re.sub(r"</span>", "", page_content)
+                else:
+                    # Plain text extraction
+                    page_content = page.get_text("text")
 
-            # Store page data for filtering
-            page_data.append((idx, page_label, page_content))
+                # Store page data for filtering
+                page_data.append((idx, page_label, page_content))
 
         # Apply fuzzy filtering if hint provided
         if fuzzy_hint:
@@ -735,9 +1121,6 @@ def extract_pdf_pages(
             # Use the original specification that was used to request this page
             extracted_labels.append(index_to_spec.get(idx, str(idx + 1)))
 
-        # Close the document
-        doc.close()
-
         result = {
             "content": content,
             "pages_extracted": filtered_indices,
@@ -799,26 +1182,26 @@ def get_pdf_page_labels(
         return {"error": "limit must be positive"}
 
     try:
-        # Open PDF with PyMuPDF
-        doc: fitz.Document = fitz.open(pdf_path)
-
-        # Get page count
-        page_count = doc.page_count
-
-        # Determine range to process
-        start_idx = start if start is not None else 0
-        end_idx = page_count
-        if limit is not None:
-            end_idx = min(start_idx + limit, page_count)
-
-        # Build page label mapping for the requested range
-        page_label_map = {}
-        for i in range(start_idx, end_idx):
-            page = doc[i]
-            label = page.get_label()
-            page_label_map[str(i)] = label
-
-        doc.close()
+        # PyMuPDF is not thread-safe; see _fitz_lock
+        with _fitz_lock:
+            # Open PDF with PyMuPDF
+            doc: fitz.Document = _open_pdf_cached(pdf_path)
+
+            # Get page count
+            page_count = doc.page_count
+
+            # Determine range to process
+            start_idx = start if start is not None else 0
+            end_idx = page_count
+            if limit is not None:
+                end_idx = min(start_idx + limit, page_count)
+
+            # Build page label mapping for the requested range
+            page_label_map = {}
+            for i in range(start_idx, end_idx):
+                page = doc[i]
+                label = page.get_label()
+                page_label_map[str(i)] = label
 
         return {"page_count": page_count, "page_labels": page_label_map}
 
@@ -854,10 +1237,11 @@ def get_pdf_page_count(file: str) -> dict[str, Any]:
         return {"error": f"PDF file not found: {file}"}
 
     try:
-        # Open PDF with PyMuPDF
-        doc: fitz.Document = fitz.open(pdf_path)
-        page_count = doc.page_count
-        doc.close()
+        # PyMuPDF is not thread-safe; see _fitz_lock
+        with _fitz_lock:
+            # Open PDF with PyMuPDF
+            doc: fitz.Document = _open_pdf_cached(pdf_path)
+            page_count = doc.page_count
 
         return {"page_count": page_count}
 
@@ -913,118 +1297,118 @@ def get_pdf_outline(
         return {"error": f"PDF file not found: {file}"}
 
     try:
-        # Open PDF with PyMuPDF
-        doc: fitz.Document = fitz.open(pdf_path)
+        # Hold the PyMuPDF lock while walking the outline, but not for fzf
+        with _fitz_lock:
+            # Open PDF with PyMuPDF
+            doc: fitz.Document = _open_pdf_cached(pdf_path)
+
+            # Get outline
+            outline = doc.outline
+            if not outline:
+                return {
+                    "outline": [],
+                    "total_entries": 0,
+                    "max_depth_found": 0,
+                }
+
+            # Build the outline list recursively
+            outline_list = []
+            max_depth_found = 0
+
+            def recurse_outline(ol_item, level):
+                nonlocal max_depth_found
+                while ol_item:
+                    # Skip if max_depth is set and we've exceeded it
+                    if max_depth is not None and level > max_depth:
+                        if hasattr(ol_item, "next"):
+                            ol_item = ol_item.next
+                        else:
+                            break
+                        continue
 
-        # Get outline
-        outline = doc.outline
-        if not outline:
-            doc.close()
-            return {
-                "outline": [],
-                "total_entries": 0,
-                "max_depth_found": 0,
-            }
+                    # Update max depth found
+                    if level > max_depth_found:
+                        max_depth_found = level
+
+                    # Get title
+                    title = ""
+                    if hasattr(ol_item, "title") and ol_item.title:
+                        title = ol_item.title
 
-        # Build the outline list recursively
-        outline_list = []
-        max_depth_found = 0
+                    # Get page number (1-based)
+                    is_external = (
+                        hasattr(ol_item, "is_external") and ol_item.is_external
+                    )
+                    if not is_external:
+                        uri = getattr(ol_item, "uri", None)
+                        page_num = getattr(ol_item, "page", -1)
+                        if uri:
+                            if page_num == -1:
+                                # Resolve the link to get the page
+                                try:
+                                    resolve = doc.resolve_link(uri)
+                                    page = resolve[0] + 1 if resolve else -1
+                                except Exception:
+                                    page = -1
+                            else:
+                                page = page_num + 1
+                        else:
+                            page = page_num + 1 if page_num >= 0 else -1
+                    else:
+                        page = -1
 
-        def recurse_outline(ol_item, level):
-            nonlocal max_depth_found
-            while ol_item:
-                # Skip if max_depth is set and we've exceeded it
-                if max_depth is not None and level > max_depth:
+                    # Get page label
+                    page_label = ""
+                    if page > 0:
+                        try:
+                            page_idx = page - 1
+                            page_obj = doc[page_idx]
+                            page_label = page_obj.get_label()
+                        except Exception:
+                            page_label = str(page)
+
+                    # Build entry
+                    if simple:
+                        entry = [level, title, page, page_label]
+                    else:
+                        # Get detailed link information
+                        link = {
+                            "page": page,
+                            "uri": getattr(ol_item, "uri", None),
+                            "is_external": is_external,
+                            "is_open": getattr(ol_item, "is_open", False),
+                        }
+                        if hasattr(ol_item, "dest") and ol_item.dest:
+                            dest_info = {}
+                            if hasattr(ol_item.dest, "kind"):
+                                dest_info["kind"] = ol_item.dest.kind
+                            if hasattr(ol_item.dest, "page"):
+                                dest_info["page"] = ol_item.dest.page
+                            if hasattr(ol_item.dest, "uri"):
+                                dest_info["uri"] = ol_item.dest.uri
+                            if hasattr(ol_item.dest, "lt") and ol_item.dest.lt:
+                                dest_info["lt"] = list(ol_item.dest.lt)
+                            if hasattr(ol_item.dest, "rb") and ol_item.dest.rb:
+                                dest_info["rb"] = list(ol_item.dest.rb)
+                            if hasattr(ol_item.dest, "zoom"):
+                                dest_info["zoom"] = ol_item.dest.zoom
+                            link["dest"] = dest_info
+                        entry = [level, title, page, page_label, link]
+
+                    outline_list.append(entry)
+
+                    # Recurse into children
+                    if hasattr(ol_item, "down") and ol_item.down:
+                        recurse_outline(ol_item.down, level + 1)
+
+                    # Move to next sibling
                     if hasattr(ol_item, "next"):
                         ol_item = ol_item.next
                     else:
                         break
-                    continue
 
-                # Update max depth found
-                if level > max_depth_found:
-                    max_depth_found = level
-
-                # Get title
-                title = ""
-                if hasattr(ol_item, "title") and ol_item.title:
-                    title = ol_item.title
-
-                # Get page number (1-based)
-                is_external = hasattr(ol_item, "is_external") and ol_item.is_external
-                if not is_external:
-                    uri = getattr(ol_item, "uri", None)
-                    page_num = getattr(ol_item, "page", -1)
-                    if uri:
-                        if page_num == -1:
-                            # Resolve the link to get the page
-                            try:
-                                resolve = doc.resolve_link(uri)
-                                page = resolve[0] + 1 if resolve else -1
-                            except Exception:
-                                page = -1
-                        else:
-                            page = page_num + 1
-                    else:
-                        page = page_num + 1 if page_num >= 0 else -1
-                else:
-                    page = -1
-
-                # Get page label
-                page_label = ""
-                if page > 0:
-                    try:
-                        page_idx = page - 1
-                        page_obj = doc[page_idx]
-                        page_label = page_obj.get_label()
-                    except Exception:
-                        page_label = str(page)
-
-                # Build entry
-                if simple:
-                    entry = [level, title, page, page_label]
-                else:
-                    # Get detailed link information
-                    link = {
-                        "page": page,
-                        "uri": getattr(ol_item, "uri", None),
-                        "is_external": is_external,
-                        "is_open": getattr(ol_item, "is_open", False),
-                    }
-                    if hasattr(ol_item, "dest") and ol_item.dest:
-                        dest_info = {}
-                        if hasattr(ol_item.dest, "kind"):
-                            dest_info["kind"] = ol_item.dest.kind
-                        if hasattr(ol_item.dest, "page"):
-                            dest_info["page"] = ol_item.dest.page
-                        if hasattr(ol_item.dest, "uri"):
-                            dest_info["uri"] = ol_item.dest.uri
-                        if hasattr(ol_item.dest, "lt") and ol_item.dest.lt:
-                            dest_info["lt"] = list(ol_item.dest.lt)
-                        if hasattr(ol_item.dest, "rb") and ol_item.dest.rb:
-                            dest_info["rb"] = list(ol_item.dest.rb)
-                        if hasattr(ol_item.dest, "zoom"):
-                            dest_info["zoom"] = ol_item.dest.zoom
-                        link["dest"] = dest_info
-                    entry = [level, title, page, page_label, link]
-
-                outline_list.append(entry)
-
-                # Recurse into children
-                if hasattr(ol_item, "down") and ol_item.down:
-                    recurse_outline(ol_item.down, level + 1)
-
-                # Move to next sibling
-                if hasattr(ol_item, "next"):
-                    ol_item = ol_item.next
-                else:
-                    break
-
-        # Start recursion
-        recurse_outline(outline, 1)
-
-        # Close document
-        doc.close()
+            # Start recursion
+            recurse_outline(outline, 1)
 
         # Apply fuzzy filtering if requested
         if fuzzy_filter and FZF_EXECUTABLE:
@@ -1092,7 +1476,7 @@ def get_pdf_outline(
 # ---------------------------------------------------------------------------
 # Tool: fuzzy_search_files
 # ---------------------------------------------------------------------------
-@mcp.tool(
+@_threaded_tool(
     description=(
         "Search for file paths using fuzzy matching.\n\n"
         "IMPORTANT: NO REGEX SUPPORT - fuzzy_filter uses fzf's fuzzy matching syntax, NOT regular expressions!\n\n"
@@ -1154,7 +1538,9 @@ def get_pdf_outline(
         "  limit  (int, optional): Max results to return. Default 20.\n"
         "  multiline (bool, optional): Enable multiline file content search. Default false.\n"
         "  confirm_root (bool, optional): Allow searching from root directory (/). Default false.\n"
-        "    Note: Searching from root (/) requires confirm_root=True to prevent accidental slow searches.\n\n"
+        "    Note: Searching from root (/) requires confirm_root=True to prevent accidental slow searches.\n"
+        "  file_types (str, optional): Comma-separated ripgrep types to restrict the walk (py,rust).\n"
+        "    Filters inside ripgrep, before fzf sees any candidates. See `rg --type-list`.\n\n"
         "fzf Query Syntax (NO REGEX SUPPORT):\n"
         "  CRITICAL: SPACES SEPARATE SEARCH TERMS - Each space creates a new fuzzy pattern!\n"
         "  Basic Terms: Space-separated terms use AND logic (all must match)\n"
@@ -1202,6 +1588,7 @@ def fuzzy_search_files(
     limit: int = 20,
     multiline: bool = False,
     confirm_root: bool = False,
+    file_types: str = "",
 ) -> dict[str, Any]:
     """Find files using ripgrep + fzf fuzzy filtering with optional multiline content search."""
     if not fuzzy_filter:
@@ -1210,28 +1597,9 @@ def fuzzy_search_files(
     rg_bin = _require(RG_EXECUTABLE, "rg")
     fzf_bin = _require(FZF_EXECUTABLE, "fzf")
 
-    # Check if path is root directory
-    resolved_path = Path(path).resolve()
-    is_root = False
-
-    # Check for root path on different platforms
-    if platform.system() == "Windows":
-        # On Windows, check if it's a drive root like C:\ or just \
-        is_root = str(resolved_path) in ["/", "\\"] or (
-            len(str(resolved_path)) <= 3 and str(resolved_path).endswith(("\\", "/"))
-        )
-    else:
-        # On Unix-like systems, check if it's /
-        is_root = str(resolved_path) == "/"
-
-    if is_root and not confirm_root:
-        return {
-            "error": (
-                "Searching from root directory (/) is likely incorrect and could be very slow. "
-                "If you really want to search from root, please set confirm_root=True. "
-                "Otherwise, specify a more specific directory path."
-            )
-        }
+    root_error = _root_search_error(path, confirm_root)
+    if root_error:
+        return root_error
 
     try:
         if multiline:
@@ -1240,26 +1608,16 @@ def fuzzy_search_files(
             rg_list_cmd = [rg_bin, "--files"]
             if hidden:
                 rg_list_cmd.append("--hidden")
+            rg_list_cmd.extend(_rg_type_flags(file_types))
             rg_list_cmd.append(search_path)
 
             # Get file list
             file_list_result = subprocess.check_output(rg_list_cmd, text=True)
-            file_paths = [
-                str(Path(p).resolve()) for p in file_list_result.splitlines() if p
-            ]
+            # rg already prints absolute paths under the resolved search_path
+            file_paths = [p for p in file_list_result.splitlines() if p]
 
             # Build multiline input with null separators
-            multiline_input = b""
-            for file_path in file_paths:
-                try:
-                    path_obj = Path(file_path)
-                    with path_obj.open("rb") as f:
-                        content = f.read()
-                        # Create record: filename: + content + null separator
-                        record = f"{file_path}:\n".encode() + content + b"\0"
-                        multiline_input += record
-                except (OSError, UnicodeDecodeError):
-                    continue  # Skip files that can't be read
+            multiline_input = _build_multiline_input(file_paths)
 
             if not multiline_input:
                 return {"matches": []}
@@ -1288,26 +1646,28 @@ def fuzzy_search_files(
             # Parse null-separated output
             matches = []
             if out_bytes:
-                for chunk in out_bytes.split(b"\0"):
-                    if chunk:
-                        try:
-                            decoded = chunk.decode("utf-8")
-                            # In multiline mode, return the full content including filename prefix
-                            # Truncate to 2048 characters if needed
-                            if len(decoded) > 2048:
-                                decoded = decoded[:2048] + "..."
-                            matches.append(decoded)
-                        except UnicodeDecodeError:
-                            decoded = chunk.decode("utf-8", errors="replace")
-                            if len(decoded) > 2048:
-                                decoded = decoded[:2048] + "..."
-                            matches.append(decoded)
+                for chunk in _nul_records(out_bytes):
+                    if len(matches) >= limit:
+                        break  # fzf output is ranked; the rest would be dropped
+                    try:
+                        decoded = str(chunk, "utf-8")
+                        # In multiline mode, return the full content including filename prefix
+                        # Truncate to 2048 characters if needed
+                        if len(decoded) > 2048:
+                            decoded = decoded[:2048] + "..."
+                        matches.append(decoded)
+                    except UnicodeDecodeError:
+                        decoded = str(chunk, "utf-8", "replace")
+                        if len(decoded) > 2048:
+                            decoded = decoded[:2048] + "..."
+                        matches.append(decoded)
         else:
             # Standard mode - file paths only
             search_path = str(Path(path).resolve())
             rg_cmd = [rg_bin, "--files"]
             if hidden:
                 rg_cmd.append("--hidden")
+            rg_cmd.extend(_rg_type_flags(file_types))
             rg_cmd.append(search_path)
 
             # Pipe through fzf for fuzzy filtering
@@ -1315,15 +1675,16 @@ def fuzzy_search_files(
 
             logger.debug("Pipeline: %s | %s", " ".join(rg_cmd), " ".join(fzf_cmd))
 
+            # rg's stderr is never read here, so don't give it a pipe to fill
             rg_proc = subprocess.Popen(
-                rg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                rg_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
             )
+            # Keep fzf's output as bytes and decode only the lines we return
             fzf_proc = subprocess.Popen(
                 fzf_cmd,
                 stdin=rg_proc.stdout,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True,
             )
             if rg_proc.stdout:
                 rg_proc.stdout.close()
@@ -1338,7 +1699,10 @@ def fuzzy_search_files(
                 )
                 return _handle_fzf_error(exc)
 
-            matches = [p for p in out.splitlines() if p]
+            lines = (p for p in out.splitlines() if p)
+            matches = [
+                p.decode("utf-8", errors="replace") for p in islice(lines, limit)
+            ]
 
         # Apply limit
         matches = matches[:limit]
@@ -1353,7 +1717,7 @@ def fuzzy_search_files(
 # ---------------------------------------------------------------------------
 # Tool: fuzzy_search_content
 # ---------------------------------------------------------------------------
-@mcp.tool(
+@_threaded_tool(
     description=(
         "Search file contents using fuzzy filtering.\n\n"
         "CRITICAL: NO REGEX SUPPORT - fuzzy_filter does NOT accept regular expressions!\n\n"
@@ -1419,7 +1783,8 @@ def fuzzy_search_files(
         "  ✗ `(TODO|FIXME)` → NO! Regex grouping\n"
         "  ✓ `TODO | FIXME` → Correct OR syntax\n\n"
         "Args:\n"
-        "  fuzzy_filter (str): Fuzzy search query (NOT regex!). Required.\n"
+        "  fuzzy_filter (str): Fuzzy search query (NOT regex!). Required; a blank query\n"
+        "    returns the first `limit` lines unfiltered.\n"
         "  path (str, optional): Directory/file to search. Defaults to current dir.\n"
         "  hidden (bool, optional): Search hidden files. Default false.\n"
         "  limit (int, optional): Max results to return. Default 20.\n"
@@ -1427,7 +1792,9 @@ def fuzzy_search_files(
         "  multiline (bool, optional): Enable multiline record processing. Default false.\n"
         "  content_only (bool, optional): Match only on content, ignore file paths. Default false.\n"
         "  confirm_root (bool, optional): Allow searching from root directory (/). Default false.\n"
-        "    Note: Searching from root (/) requires confirm_root=True to prevent accidental slow searches.\n\n"
+        "    Note: Searching from root (/) requires confirm_root=True to prevent accidental slow searches.\n"
+        "  file_types (str, optional): Comma-separated ripgrep types to search (py,js).\n"
+        "    Same as repeating '-t' in rg_flags. See `rg --type-list`.\n\n"
         "Fuzzy Filter Syntax (NO REGEX - these are fzf patterns):\n"
         "  CRITICAL: SPACES MATTER! Each space separates fuzzy patterns (AND logic)\n"
         "  Basic search: `update_ondemand_max_spend` → finds all occurrences\n"
@@ -1490,96 +1857,34 @@ def fuzzy_search_content(
     multiline: bool = False,
     content_only: bool = False,
     confirm_root: bool = False,
+    file_types: str = "",
 ) -> dict[str, Any]:
     """Search all content then apply fuzzy filtering - similar to 'rg . | fzf'.
 
     By default, matches on both file paths AND content (skips line numbers).
     With content_only=True, matches ONLY on content, ignoring file paths.
     """
-    # Enable debug logging for Windows investigation (only in CI)
-    import logging
-
-    logger = logging.getLogger(__name__)
-
-    # Force debug logging for CI investigation
-    is_ci = (
-        os.getenv("CI") == "true"
-        or os.getenv("GITHUB_ACTIONS") == "true"
-        or os.getenv("GITHUB_WORKSPACE")  # More reliable GitHub Actions indicator
-        or "runner" in os.getenv("USER", "").lower()  # GitHub Actions runner user
-        or os.getenv("RUNNER_OS")  # GitHub Actions runner OS
-    )
-
-    # Enable debug logging if in CI or if Windows (for debugging)
-    # BUT only if subprocess.Popen is not mocked (to distinguish real vs mocked tests)
-    popen_is_mocked = (
-        hasattr(subprocess.Popen, "_mock_name")
-        or str(type(subprocess.Popen)).find("Mock") != -1
-    )
-    enable_debug = (
-        is_ci or platform.system().lower() == "windows"
-    ) and not popen_is_mocked
-
-    if enable_debug:
-        logging.basicConfig(
-            level=logging.DEBUG, format="%(levelname)s:%(name)s:%(message)s", force=True
-        )
-        logger.debug("=== WINDOWS DEBUG START ===")
-        logger.debug(
-            "Environment check: CI=%r, GITHUB_ACTIONS=%r, GITHUB_WORKSPACE=%r, USER=%r, RUNNER_OS=%r, platform=%r",
-            os.getenv("CI"),
-            os.getenv("GITHUB_ACTIONS"),
-            os.getenv("GITHUB_WORKSPACE"),
-            os.getenv("USER"),
-            os.getenv("RUNNER_OS"),
-            platform.system(),
-        )
-        logger.debug(
-            "fuzzy_search_content called with: fuzzy_filter=%r, path=%r, hidden=%r, limit=%r, rg_flags=%r, multiline=%r, content_only=%r",
-            fuzzy_filter,
-            path,
-            hidden,
-            limit,
-            rg_flags,
-            multiline,
-            content_only,
-        )
-
-    if not fuzzy_filter:
-        return {"error": "'fuzzy_filter' argument is required"}
+    # A blank filter matches everything: return rg's output as-is, skipping fzf
+    passthrough = not fuzzy_filter.strip()
 
     rg_bin = _require(RG_EXECUTABLE, "rg")
     fzf_bin = _require(FZF_EXECUTABLE, "fzf")
 
-    # Check if path is root directory
-    resolved_path = Path(path).resolve()
-    is_root = False
-
-    # Check for root path on different platforms
-    if platform.system() == "Windows":
-        # On Windows, check if it's a drive root like C:\ or just \
-        is_root = str(resolved_path) in ["/", "\\"] or (
-            len(str(resolved_path)) <= 3 and str(resolved_path).endswith(("\\", "/"))
-        )
-    else:
-        # On Unix-like systems, check if it's /
-        is_root = str(resolved_path) == "/"
-
-    if is_root and not confirm_root:
-        return {
-            "error": (
-                "Searching from root directory (/) is likely incorrect and could be very slow. "
-                "If you really want to search from root, please set confirm_root=True. "
-                "Otherwise, specify a more specific directory path."
-            )
-        }
+    root_error = _root_search_error(path, confirm_root)
+    if root_error:
+        return root_error
 
     try:
+        if passthrough and not multiline:
+            rg_cmd = _rg_content_cmd(rg_bin, path, hidden, rg_flags, file_types)
+            return _rg_passthrough(rg_cmd, limit)
+
         if multiline:
             # For multiline mode, get files and treat each as a single record
             rg_list_cmd = [rg_bin, "--files"]
             if hidden:
                 rg_list_cmd.append("--hidden")
+            rg_list_cmd.extend(_rg_type_flags(file_types))
             if rg_flags:
                 # Filter out options that don't apply to --files
                 safe_flags = []
@@ -1598,25 +1903,18 @@ def fuzzy_search_content(
 
             # Get file list
             file_list_result = subprocess.check_output(rg_list_cmd, text=True)
-            file_paths = [
-                str(Path(p).resolve()) for p in file_list_result.splitlines() if p
-            ]
+            # rg already prints absolute paths under the resolved search_path
+            file_paths = [p for p in file_list_result.splitlines() if p]
 
             # Build multiline input with file contents
-            multiline_input = b""
-            for file_path in file_paths:
-                try:
-                    path_obj = Path(file_path)
-                    with path_obj.open("rb") as f:
-                        content = f.read()
-                        # Create record: filename + content + null separator
-                        record = f"{file_path}:\n".encode() + content + b"\0"
-                        multiline_input += record
-                except (OSError, UnicodeDecodeError):
-                    continue
+            multiline_input = _build_multiline_input(file_paths)
 
             if not multiline_input:
                 return {"matches": []}
+            if passthrough:
+                return {"matches": _parse_multiline_matches(multiline_input, limit)}
+            if passthrough:
+                return {"matches": _parse_multiline_matches(multiline_input, limit)}
 
             # Use fzf with multiline support
             fzf_cmd = [
@@ -1644,115 +1942,20 @@ def fuzzy_search_content(
                 return _handle_fzf_error(exc)
 
             # Parse multiline results - return as file records
-            matches = []
-            if out_bytes:
-                for chunk in out_bytes.split(b"\0"):
-                    if chunk:
-                        try:
-                            decoded = chunk.decode("utf-8")
-                            # Extract filename from first line
-                            if ":\n" in decoded:
-                                file_part, content_part = decoded.split(":\n", 1)
-                                content = content_part.strip()
-                                # Truncate content to 2048 characters if needed
-                                if len(content) > 2048:
-                                    content = content[:2048] + "..."
-                                matches.append(
-                                    {
-                                        "file": file_part.strip(),
-                                        "line": 1,  # Multiline records don't have specific line numbers
-                                        "content": content,
-                                    }
-                                )
-                        except UnicodeDecodeError:
-                            continue
+            matches = _parse_multiline_matches(out_bytes, limit)
         else:
             # Standard mode - line-by-line results
-            rg_cmd = [
-                rg_bin,
-                "--line-number",
-                "--no-heading",
-                "--color=never",
-            ]
-            if hidden:
-                rg_cmd.append("--hidden")
-            if rg_flags:
-                rg_cmd.extend(rg_flags.split())
-            search_path = str(Path(path).resolve())
-
-            # If searching a single file, ensure filename is included in output
-            if Path(search_path).is_file():
-                rg_cmd.append("--with-filename")
-
-            rg_cmd.extend([".", search_path])  # Search for all content in the path
+            rg_cmd = _rg_content_cmd(rg_bin, path, hidden, rg_flags, file_types)
+            fzf_cmd = _fzf_content_cmd(fzf_bin, fuzzy_filter, content_only)
 
-            # Pipe through fzf for fuzzy filtering
-            # Default: match on file path (field 1) and content (field 3+), skip line number
-            if content_only:
-                # Match only on content (field 3+), ignore file path and line number
-                fzf_cmd = [
-                    fzf_bin,
-                    "--filter",
-                    fuzzy_filter,
-                    "--delimiter",
-                    ":",
-                    "--nth=3..",
-                ]
-            else:
-                # Match on file path (field 1) and content (field 3+), skip line number
-                fzf_cmd = [
-                    fzf_bin,
-                    "--filter",
-                    fuzzy_filter,
-                    "--delimiter",
-                    ":",
-                    "--nth=1,3..",
-                ]
-
-            if enable_debug:
-                logger.debug("Pipeline: %s | %s", " ".join(rg_cmd), " ".join(fzf_cmd))
-
-                # In CI or Windows, use subprocess.run for detailed debugging
-                rg_proc = subprocess.run(rg_cmd, capture_output=True, text=True)
-                logger.debug("Ripgrep returncode: %d", rg_proc.returncode)
-                logger.debug("Ripgrep stdout length: %d", len(rg_proc.stdout))
-                if rg_proc.stdout:
-                    logger.debug("Ripgrep stdout sample: %r", rg_proc.stdout[:200])
-                if rg_proc.stderr:
-                    logger.debug("Ripgrep stderr: %r", rg_proc.stderr[:200])
-
-                if (
-                    rg_proc.returncode != 0 and rg_proc.returncode != 1
-                ):  # 1 = no matches
-                    return {
-                        "error": rg_proc.stderr.strip()
-                        or f"ripgrep failed with code {rg_proc.returncode}"
-                    }
+            logger.debug("Pipeline: %s | %s", rg_cmd, fzf_cmd)
 
-                # Now run fzf with ripgrep's output
-                fzf_proc = subprocess.run(
-                    fzf_cmd, input=rg_proc.stdout, capture_output=True, text=True
-                )
-                logger.debug("Fzf returncode: %d", fzf_proc.returncode)
-                logger.debug("Fzf stdout length: %d", len(fzf_proc.stdout))
-                if fzf_proc.stdout:
-                    logger.debug("Fzf stdout sample: %r", fzf_proc.stdout[:200])
-
-                # Check fzf return code and handle errors
-                if fzf_proc.returncode != 0:
-                    exc = subprocess.CalledProcessError(
-                        fzf_proc.returncode,
-                        fzf_cmd,
-                        output=fzf_proc.stdout,
-                        stderr=fzf_proc.stderr,
-                    )
-                    return _handle_fzf_error(exc)
-
-                out = fzf_proc.stdout
-            else:
-                # Locally, use subprocess.Popen for test compatibility
+            # rg writes straight into fzf's stdin; nothing is buffered in Python.
+            # rg's stderr goes to an unnamed temp file: a pipe only read after
+            # fzf finishes could fill up on a noisy tree and stall both processes
+            with tempfile.TemporaryFile() as rg_stderr_file:
                 rg_proc = subprocess.Popen(
-                    rg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                    rg_cmd, stdout=subprocess.PIPE, stderr=rg_stderr_file
                 )
                 fzf_proc = subprocess.Popen(
                     fzf_cmd,
@@ -1765,78 +1968,25 @@ def fuzzy_search_content(
                     rg_proc.stdout.close()
 
                 out, err = fzf_proc.communicate()
-                rg_stderr = rg_proc.stderr.read().decode() if rg_proc.stderr else ""
                 rg_proc.wait()
+                rg_stderr_file.seek(0)
+                rg_stderr = rg_stderr_file.read().decode(errors="replace")
 
-                if (
-                    rg_proc.returncode != 0 and rg_proc.returncode != 1
-                ):  # 1 = no matches
-                    return {
-                        "error": rg_stderr.strip()
-                        or f"ripgrep failed with code {rg_proc.returncode}"
-                    }
-
-                # Check fzf return code and handle errors
-                if fzf_proc.returncode != 0:
-                    exc = subprocess.CalledProcessError(
-                        fzf_proc.returncode, fzf_cmd, output=out, stderr=err
-                    )
-                    return _handle_fzf_error(exc)
-
-            # Parse results
-            matches = []
-            lines = out.splitlines()
-            if enable_debug:
-                logger.debug("Total output lines to parse: %d", len(lines))
-
-            for i, line in enumerate(lines):
-                if not line:
-                    continue
+            if rg_proc.returncode != 0 and rg_proc.returncode != 1:  # 1 = no matches
+                return {
+                    "error": rg_stderr.strip()
+                    or f"ripgrep failed with code {rg_proc.returncode}"
+                }
 
-                if enable_debug:
-                    logger.debug("Parsing line %d: %r", i, line)
-                # Parse ripgrep output: file:line:content
-                parts = line.split(":", 2)
-
-                # Handle Windows drive letters (e.g., "C:\path\file.py:123:content")
-                if len(parts) >= 3 and len(parts[0]) == 1 and parts[0].isalpha():
-                    # Windows drive letter detected, rejoin first two parts
-                    # Split the rest to separate line number and content properly
-                    remaining = parts[2]
-                    colon_idx = remaining.find(":")
-                    if colon_idx != -1:
-                        file_path = parts[0] + ":" + parts[1]
-                        line_num = remaining[:colon_idx]
-                        content = remaining[colon_idx + 1 :]
-                        parts = [file_path, line_num, content]
-
-                if len(parts) >= 3:
-                    try:
-                        content = parts[2].strip()
-                        # Truncate content to 2048 characters if needed
-                        if len(content) > 2048:
-                            content = content[:2048] + "..."
-                        match = {
-                            "file": parts[0],
-                            "line": int(parts[1]),
-                            "content": content,
-                        }
-                        matches.append(match)
-                        if enable_debug:
-                            logger.debug("Added match: %r", match)
-                    except (ValueError, IndexError) as e:
-                        if enable_debug:
-                            logger.debug("Failed to parse line %d: %s", i, e)
-                        continue
-                else:
-                    if enable_debug:
-                        logger.debug(
-                            "Line %d has insufficient parts: %d", i, len(parts)
-                        )
+            # Check fzf return code and handle errors
+            if fzf_proc.returncode != 0:
+                exc = subprocess.CalledProcessError(
+                    fzf_proc.returncode, fzf_cmd, output=out, stderr=err
+                )
+                return _handle_fzf_error(exc)
 
-            if enable_debug:
-                logger.debug("Final matches count: %d", len(matches))
-                logger.debug("=== WINDOWS DEBUG END ===")
+            # Parse results in one regex pass over fzf's whole output
+            matches = _parse_content_matches(out, limit)
 
         # Apply limit
         matches = matches[:limit]
@@ -1848,10 +1998,98 @@ def fuzzy_search_content(
         return {"error": str(exc)}
 
 
+# ---------------------------------------------------------------------------
+# Tool: fuzzy_search_content_batch
+# ---------------------------------------------------------------------------
+@_threaded_tool(
+    description=(
+        "Run several fuzzy filters over ONE ripgrep scan of file contents.\n\n"
+        "Same matching as fuzzy_search_content (path + content, or content only),\n"
+        "but ripgrep reads the tree once and every filter is applied to that output.\n"
+        "Use it for a burst of related queries over the same directory.\n\n"
+        "CRITICAL: NO REGEX SUPPORT - each fuzzy filter uses fzf syntax.\n\n"
+        "Args:\n"
+        "  fuzzy_filters (list[str]): fzf queries, one result set each. Required.\n"
+        "  path, hidden, limit, rg_flags, content_only, confirm_root, file_types:\n"
+        "    as for fuzzy_search_content; limit applies per filter. No multiline mode.\n\n"
+        "Returns: { results: Array<{fuzzy_filter: string, matches: Array<{file, line, content}>}\n"
+        "  | {fuzzy_filter: string, error: string}> } or { error: string }"
+    )
+)
+def fuzzy_search_content_batch(
+    fuzzy_filters: list[str],
+    path: str = ".",
+    hidden: bool = False,
+    limit: int = 20,
+    rg_flags: str = "",
+    content_only: bool = False,
+    confirm_root: bool = False,
+    file_types: str = "",
+) -> dict[str, Any]:
+    """Apply several fzf filters to a single ``rg`` scan of *path*.
+
+    rg's output is held in memory once and fed to one ``fzf --filter`` per
+    query, so a burst of queries pays for the tree walk only once.
+    """
+    if not fuzzy_filters:
+        return {"error": "'fuzzy_filters' must be a non-empty list of queries"}
+
+    rg_bin = _require(RG_EXECUTABLE, "rg")
+    fzf_bin = _require(FZF_EXECUTABLE, "fzf")
+
+    root_error = _root_search_error(path, confirm_root)
+    if root_error:
+        return root_error
+
+    try:
+        rg_cmd = _rg_content_cmd(rg_bin, path, hidden, rg_flags, file_types)
+        rg_proc = subprocess.Popen(
+            rg_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        candidates, rg_err = rg_proc.communicate()
+        if rg_proc.returncode not in (0, 1):  # 1 = no matches
+            return {
+                "error": rg_err.decode(errors="replace").strip()
+                or f"ripgrep failed with code {rg_proc.returncode}"
+            }
+
+        results = []
+        for fuzzy_filter in fuzzy_filters:
+            if not candidates:
+                results.append({"fuzzy_filter": fuzzy_filter, "matches": []})
+                continue
+            if not fuzzy_filter.strip():
+                # A blank filter matches every line; take rg's first ones, skip fzf
+                head = b"\n".join(candidates.split(b"\n", limit)[:limit])
+                matches = _parse_content_matches(head.decode(errors="replace"), limit)
+                results.append({"fuzzy_filter": fuzzy_filter, "matches": matches})
+                continue
+            fzf_cmd = _fzf_content_cmd(fzf_bin, fuzzy_filter, content_only)
+            fzf_proc = subprocess.Popen(
+                fzf_cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            out, err = fzf_proc.communicate(candidates)
+            if fzf_proc.returncode != 0:
+                exc = subprocess.CalledProcessError(
+                    fzf_proc.returncode, fzf_cmd, output=out, stderr=err
+                )
+                results.append({"fuzzy_filter": fuzzy_filter, **_handle_fzf_error(exc)})
+                continue
+            matches = _parse_content_matches(out.decode(errors="replace"), limit)
+            results.append({"fuzzy_filter": fuzzy_filter, "matches": matches})
+
+        return {"results": results}
+    except Exception as exc:
+        return {"error": str(exc)}
+
+
 # ---------------------------------------------------------------------------
 # Tool: fuzzy_search_documents
 # ---------------------------------------------------------------------------
-@mcp.tool(
+@_threaded_tool(
     description=(
         "Search through PDFs and other document formats using ripgrep-all.\n\n"
         "Searches through PDFs, Office docs, archives, and more using rga (ripgrep-all).\n"
@@ -1873,7 +2111,8 @@ def fuzzy_search_content(
         "  `Conclusion | Summary` → Find ending sections\n"
         "  `et al` → Find citations with multiple authors\n\n"
         "Args:\n"
-        "  fuzzy_filter (str): Fuzzy search query. Required.\n"
+        "  fuzzy_filter (str): Fuzzy search query. Required; a blank query returns the\n"
+        "    first `limit` document lines unfiltered.\n"
         "  path (str, optional): Directory/file to search. Default: current dir.\n"
         "  file_types (str, optional): Comma-separated file types (pdf,docx,epub).\n"
         "  preview (bool, optional): Include preview context. Default: true.\n"
@@ -1897,8 +2136,8 @@ def fuzzy_search_documents(
     confirm_root: bool = False,
 ) -> dict[str, Any]:
     """Search documents using ripgrep-all with fuzzy filtering."""
-    if not fuzzy_filter:
-        return {"error": "'fuzzy_filter' argument is required"}
+    # A blank filter matches everything: return rga's first records, skipping fzf
+    passthrough = not fuzzy_filter.strip()
 
     # Check if rga is available
     if not RGA_EXECUTABLE:
@@ -1907,28 +2146,9 @@ def fuzzy_search_documents(
     rga_bin = _require(RGA_EXECUTABLE, "rga")
     fzf_bin = _require(FZF_EXECUTABLE, "fzf")
 
-    # Check if path is root directory
-    resolved_path = Path(path).resolve()
-    is_root = False
-
-    # Check for root path on different platforms
-    if platform.system() == "Windows":
-        # On Windows, check if it's a drive root like C:\ or just \
-        is_root = str(resolved_path) in ["/", "\\"] or (
-            len(str(resolved_path)) <= 3 and str(resolved_path).endswith(("\\", "/"))
-        )
-    else:
-        # On Unix-like systems, check if it's /
-        is_root = str(resolved_path) == "/"
-
-    if is_root and not confirm_root:
-        return {
-            "error": (
-                "Searching from root directory (/) is likely incorrect and could be very slow. "
-                "If you really want to search from root, please set confirm_root=True. "
-                "Otherwise, specify a more specific directory path."
-            )
-        }
+    root_error = _root_search_error(path, confirm_root)
+    if root_error:
+        return root_error
 
     try:
         # Build rga command - pass everything to match ripgrep's behavior
@@ -1961,138 +2181,45 @@ def fuzzy_search_documents(
         search_path = str(Path(path).resolve())
         # Use the fuzzy filter as the initial search pattern for rga
         # This will be further refined by fzf
-        rga_cmd.extend([fuzzy_filter, search_path])
+        rga_cmd.extend(["" if passthrough else fuzzy_filter, search_path])
 
         # Debug: Log the command
         logger.debug(f"Running rga command: {' '.join(rga_cmd)}")
 
-        # Run rga and collect JSON output with better subprocess handling
-        rga_proc = subprocess.Popen(
-            rga_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-        )
-
-        # Parse JSON lines and build formatted output for fzf
-        formatted_lines = []
-        line_to_data = {}  # Map formatted line to original data
-
-        # Cache for PDF page labels to avoid re-opening files
-        pdf_page_labels_cache = {}
-
-        # Read all stdout first to avoid broken pipe
-        stdout_data = ""
-        stderr_data = ""
-        try:
-            # Use communicate to properly handle large outputs
-            result = rga_proc.communicate()
-            if result:
-                stdout_data = result[0] if result[0] else ""
-                stderr_data = result[1] if len(result) > 1 and result[1] else ""
-        except Exception as e:
-            logger.warning(f"Error communicating with rga: {e}")
-
-        # Log any stderr output
-        if stderr_data:
-            # Filter out broken pipe errors which are expected with large outputs
-            if "broken pipe" not in stderr_data.lower():
-                logger.debug(f"rga stderr: {stderr_data}")
-
-        # Process the stdout data
-        for line in stdout_data.splitlines():
-            if not line.strip():
-                continue
-
+        # Stream rga's JSON records instead of buffering the whole output: the
+        # pipe throttles rga while records are parsed. stderr goes to an
+        # unnamed temp file so a chatty rga cannot fill a second pipe and stall.
+        with tempfile.TemporaryFile() as rga_stderr:
+            rga_proc = subprocess.Popen(
+                rga_cmd, stdout=subprocess.PIPE, stderr=rga_stderr
+            )
             try:
-                data = json.loads(line)
-                if data.get("type") == "match":
-                    match_data = data.get("data", {})
-                    file_path = match_data.get("path", {}).get("text", "")
-                    line_num = match_data.get("line_number") or 0
-
-                    # Extract text from lines
-                    lines = match_data.get("lines", {})
-                    text = lines.get("text", "")
-                    # Strip newlines to ensure consistent formatting
-                    text = text.strip()
-
-                    # Extract matched text from submatches
-                    submatches = match_data.get("submatches", [])
-                    match_text = submatches[0]["match"]["text"] if submatches else text
-
-                    # Parse page number from "Page N: " prefix if present
-                    page_number = None
-                    page_label = None
-                    content = text  # Default to full text
-                    if text.startswith("Page ") and ": " in text:
-                        try:
-                            parts = text.split(": ", 1)
-                            page_prefix = parts[0]
-                            page_number = int(page_prefix.replace("Page ", ""))
-                            # Strip the "Page N: " prefix from content
-                            content = parts[1] if len(parts) > 1 else text
-
-                            # For PDF files, get page label
-                            if file_path.lower().endswith(".pdf") and PYMUPDF_AVAILABLE:
-                                # Get page labels from cache or load them
-                                if file_path not in pdf_page_labels_cache:
-                                    try:
-                                        doc = fitz.open(file_path)
-                                        # Build mapping from page index to actual label
-                                        label_map = {}
-                                        for i in range(doc.page_count):
-                                            page = doc[i]
-                                            label_map[i] = page.get_label()
-                                        pdf_page_labels_cache[file_path] = label_map
-                                        doc.close()
-                                    except Exception:
-                                        pdf_page_labels_cache[file_path] = {}
-
-                                label_map = pdf_page_labels_cache[file_path]
-                                # Page numbers from pdftotext are 1-based, convert to 0-based for index
-                                page_idx = page_number - 1
-                                if page_idx in label_map:
-                                    page_label = label_map[page_idx]
-                        except (ValueError, IndexError):
-                            pass
-
-                    # Build formatted line for fzf
-                    formatted = f"{file_path}:{line_num}:{text}"
-                    formatted_lines.append(formatted)
-
-                    # Truncate content and match_text to 2048 characters if needed
-                    if len(content) > 2048:
-                        content = content[:2048] + "..."
-                    if len(match_text) > 2048:
-                        match_text = match_text[:2048] + "..."
-
-                    # Store mapping for later reconstruction
-                    result_data = {
-                        "file": file_path,
-                        "line": line_num,
-                        "content": content,
-                        "match_text": match_text,
-                    }
-
-                    # Add page information if available
-                    if page_number is not None:
-                        result_data["page"] = (
-                            page_number  # 1-based page number from ripgrep-all
-                        )
-                        result_data["page_index_0based"] = (
-                            page_number - 1
-                        )  # 0-based index for programmatic access
-                        if page_label:
-                            result_data["page_label"] = page_label
-
-                    line_to_data[formatted] = result_data
-            except json.JSONDecodeError:
-                continue
-
-        if not formatted_lines:
+                line_to_data = _index_rga_matches(
+                    rga_proc.stdout, limit if passthrough else None
+                )
+                rga_proc.wait()
+            finally:
+                # A malformed record must not leave rga running behind us
+                if rga_proc.poll() is None:
+                    rga_proc.kill()
+                    rga_proc.wait()
+                rga_proc.stdout.close()
+            rga_stderr.seek(0)
+            stderr_data = rga_stderr.read().decode(errors="replace")
+        # Filter out broken pipe errors which are expected with large outputs
+        if stderr_data and "broken pipe" not in stderr_data.lower():
+            logger.debug(f"rga stderr: {stderr_data}")
+
+        if not line_to_data:
             logger.debug(f"No formatted lines from rga for path: {search_path}")
             return {"matches": []}
+        if passthrough:
+            matches = [_document_match(*data) for data in line_to_data.values()]
+            _label_pdf_matches(matches)
+            return {"matches": matches}
 
         # Feed to fzf for fuzzy filtering
-        fzf_input = "\n".join(formatted_lines)
+        fzf_input = "\n".join(line_to_data)
         fzf_cmd = [fzf_bin, "--filter", fuzzy_filter]
 
         fzf_proc = subprocess.Popen(
@@ -2115,21 +2242,11 @@ def fuzzy_search_documents(
         matches = []
         fzf_output_lines = out.splitlines()
 
-        # Debug output for Windows path issues (commented out to avoid test interference)
-        # if platform.system() == "Windows" or os.environ.get("GITHUB_ACTIONS") == "true":
-        #     print(f"🔍 PDF search: fzf returned {len(fzf_output_lines)} lines")
-        #     print(f"🔍 PDF search: line_to_data has {len(line_to_data)} keys")
-        #     if fzf_output_lines:
-        #         print(
-        #             f"🔍 PDF search: first fzf output line: {repr(fzf_output_lines[0])}"
-        #         )
-        #     if line_to_data:
-        #         first_key = list(line_to_data.keys())[0]
-        #         print(f"🔍 PDF search: first line_to_data key: {repr(first_key)}")
-
         for line in fzf_output_lines:
+            if len(matches) >= limit:
+                break  # fzf output is ranked; the rest would be dropped
             if line in line_to_data:
-                matches.append(line_to_data[line])
+                matches.append(_document_match(*line_to_data[line]))
             else:
                 # Windows path handling - try to find the match with proper parsing
                 found_match = False
@@ -2149,26 +2266,19 @@ def fuzzy_search_documents(
                             # Reconstruct the original formatted line
                             reconstructed = f"{file_path}:{line_num}:{content}"
                             if reconstructed in line_to_data:
-                                matches.append(line_to_data[reconstructed])
+                                matches.append(
+                                    _document_match(*line_to_data[reconstructed])
+                                )
                                 found_match = True
 
-                # Debug output for missing matches
-                if not found_match and (
-                    platform.system() == "Windows"
-                    or os.environ.get("GITHUB_ACTIONS") == "true"
-                ):
-                    print(
-                        f"🔍 PDF search: fzf output line not found in line_to_data: {repr(line)}"
-                    )
-                    # Try to find a similar key for debugging
-                    for key in line_to_data.keys():
-                        if key.split(":")[0] in line:  # Same file path
-                            print(f"🔍 PDF search: similar key exists: {repr(key)}")
-                            break
+                # stdout carries the MCP stdio stream, so never print here
+                if not found_match:
+                    logger.debug("fzf output line not found in rga results: %r", line)
 
         # Apply limit
         matches = matches[:limit]
 
+        _label_pdf_matches(matches)
         return {"matches": matches}
     except subprocess.CalledProcessError as exc:
         return {"error": str(exc)}
@@ -2179,6 +2289,23 @@ def fuzzy_search_documents(
 # ---------------------------------------------------------------------------
 # CLI
 # ---------------------------------------------------------------------------
+def _emit(res: dict[str, Any]) -> None:
+    """Write a CLI result to stdout as indented JSON, using orjson when it is installed."""
+    if orjson is not None:
+        data = orjson.dumps(res, option=orjson.OPT_INDENT_2)
+        buffer = getattr(sys.stdout, "buffer", None)
+        if buffer is None:
+            # A text-only stdout (redirect_stdout(StringIO()), some IDE consoles)
+            print(data.decode())
+            return
+        # orjson already produces UTF-8 bytes; skip the decode/re-encode round trip
+        sys.stdout.flush()
+        buffer.write(data + b"\n")
+        buffer.flush()
+        return
+    print(json.dumps(res, indent=2))
+
+
 def _print_examples():
     """Print interactive examples and usage patterns."""
     examples = """
@@ -2259,7 +2386,11 @@ Content-only mode (--content-only): Matches ONLY on content (field 3+)
     print(examples)
 
 
-def _cli() -> None:
+def _cli(argv: list[str] | None = None) -> int:
+    """Run one CLI sub-command and print its JSON result.
+
+    *argv* defaults to ``sys.argv[1:]``; the return value is the exit code.
+    """
     parser = argparse.ArgumentParser(
         description="Fuzzy search with ripgrep + fzf. Default matches file paths AND content.",
         epilog="fzf syntax: 'term1 term2' (AND), 'a | b' (OR), '^start', 'end$', '!exclude'",
@@ -2288,6 +2419,9 @@ def _cli() -> None:
         action="store_true",
         help="Allow searching from root directory (/)",
     )
+    p_files.add_argument(
+        "--file-types", default="", help="Comma-separated rg types (py,rust)"
+    )
 
     # search-content subcommand
     p_content = sub.add_parser("search-content", help="Fuzzy search file content")
@@ -2309,6 +2443,32 @@ def _cli() -> None:
         action="store_true",
         help="Allow searching from root directory (/)",
     )
+    p_content.add_argument(
+        "--file-types", default="", help="Comma-separated rg types (py,js)"
+    )
+
+    # search-content-batch subcommand
+    p_batch = sub.add_parser(
+        "search-content-batch", help="Run several content queries over one rg scan"
+    )
+    p_batch.add_argument("fuzzy_filters", nargs="+", help="fzf queries, one per result")
+    p_batch.add_argument("--path", default=".", help="Directory to search")
+    p_batch.add_argument("--hidden", action="store_true", help="Include hidden files")
+    p_batch.add_argument("--limit", type=int, default=20, help="Max results per query")
+    p_batch.add_argument("--rg-flags", default="", help="Extra ripgrep flags")
+    p_batch.add_argument(
+        "--content-only",
+        action="store_true",
+        help="Match only content, ignore file paths",
+    )
+    p_batch.add_argument(
+        "--confirm-root",
+        action="store_true",
+        help="Allow searching from root directory (/)",
+    )
+    p_batch.add_argument(
+        "--file-types", default="", help="Comma-separated rg types (py,js)"
+    )
 
     # search-documents subcommand
     p_docs = sub.add_parser("search-documents", help="Search PDFs and documents")
@@ -2389,15 +2549,15 @@ def _cli() -> None:
         "--fuzzy-filter", help="Fuzzy search to filter outline entries by title"
     )
 
-    ns = parser.parse_args()
+    ns = parser.parse_args(argv)
 
     if ns.examples:
         _print_examples()
-        return
+        return 0
 
     if not ns.cmd:
         parser.print_help()
-        return
+        return 0
 
     # Execute command and print result
     if ns.cmd == "search-files":
@@ -2408,6 +2568,7 @@ def _cli() -> None:
             ns.limit,
             ns.multiline,
             getattr(ns, "confirm_root", False),
+            ns.file_types,
         )
     elif ns.cmd == "search-content":
         res = fuzzy_search_content(
@@ -2419,6 +2580,18 @@ def _cli() -> None:
             ns.multiline,
             ns.content_only,
             getattr(ns, "confirm_root", False),
+            ns.file_types,
+        )
+    elif ns.cmd == "search-content-batch":
+        res = fuzzy_search_content_batch(
+            ns.fuzzy_filters,
+            ns.path,
+            ns.hidden,
+            ns.limit,
+            ns.rg_flags,
+            ns.content_only,
+            ns.confirm_root,
+            ns.file_types,
         )
     elif ns.cmd == "search-documents":
         res = fuzzy_search_documents(
@@ -2454,7 +2627,8 @@ def _cli() -> None:
     else:
         parser.error(f"Unknown command: {ns.cmd}")
 
-    print(json.dumps(res, indent=2))
+    _emit(res)
+    return 0
 
 
 # ---------------------------------------------------------------------------
@@ -2462,7 +2636,7 @@ def _cli() -> None:
 # ---------------------------------------------------------------------------
 if __name__ == "__main__":
     if len(sys.argv) > 1:
-        _cli()
+        sys.exit(_cli())
     else:
         # Ensure required binaries before exposing tools
         _require(RG_EXECUTABLE, "rg")
@@ -1,8 +1,108 @@
+import asyncio
+import os
 import sys
 
 import pytest
-from mcp.client.session import ClientSession
-from mcp.client.stdio import StdioServerParameters, stdio_client
+import pytest_asyncio
+
+
+def pytest_configure(config):
+    """
+    Root ``tmp_path`` trees on tmpfs when Linux provides one.
+    rg reads every fixture file, so keeping them in RAM takes disk latency out
+    of the search tests. An explicit ``--basetemp`` or temp root still wins.
+    """
+    shm = "/dev/shm"
+    if sys.platform.startswith("linux") and not config.option.basetemp:
+        if os.path.isdir(shm) and os.access(shm, os.W_OK):
+            os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", shm)
+
+
+def _touch(root, *names):
+    """
+    Create empty files (and their parent dirs) under *root*.
+    The fd/fzf tests only match on names, so file contents are irrelevant.
+    """
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+
+
+@pytest.fixture(scope="module")
+def anyio_backend():
+    """
+    Run anyio-marked tests on asyncio only.
+    Nothing in the suite is trio-specific; tests that want another backend
+    can still parametrize ``anyio_backend`` themselves.
+    """
+    return "asyncio"
+
+
+@pytest_asyncio.fixture(scope="module")
+async def mcp_client(mcp_server):
+    """
+    One in-memory client session shared by every tool-calling test in a module.
+    Test modules provide the server through a module-scoped ``mcp_server``
+    fixture. Under xdist every worker opens its own session.
+    The session is opened and closed inside a single background task because
+    its anyio cancel scopes must not be exited from a different task than the
+    one that entered them.
+    """
+    from mcp.shared.memory import (
+        create_connected_server_and_client_session as client_session,
+    )
+
+    ready: asyncio.Future = asyncio.get_running_loop().create_future()
+    closing = asyncio.Event()
+
+    async def _hold_session() -> None:
+        async with client_session(mcp_server) as client:
+            ready.set_result(client)
+            await closing.wait()
+
+    holder = asyncio.create_task(_hold_session())
+    await asyncio.wait({ready, holder}, return_when=asyncio.FIRST_COMPLETED)
+    if not ready.done():
+        holder.result()  # re-raise whatever stopped the session from opening
+    yield ready.result()
+    closing.set()
+    await holder
+
+
+@pytest.fixture(scope="session")
+def sample_tree(tmp_path_factory):
+    """
+    Small read-only directory tree shared by tests that only search it.
+    Tests that add or change files should keep using ``tmp_path``.
+    """
+    root = tmp_path_factory.mktemp("sample_tree")
+    _touch(root, "one.py", "two.txt", "subdir/three.py", ".hidden/secret.py")
+    return root
+
+
+@pytest.fixture(scope="session")
+def fuzzy_tree(tmp_path_factory):
+    """
+    Read-only tree for the filter_files tests.
+    Holds the union of the files those tests need; each test narrows it down
+    with its own fd pattern and fzf query.
+    """
+    root = tmp_path_factory.mktemp("fuzzy_tree")
+    _touch(
+        root,
+        "main.rs",
+        "minor.rs",
+        "maintenance.rs",
+        "config.json",
+        "configuration.yaml",
+        "settings.toml",
+        ".env.local",
+        "config.env",
+        "alpha.txt",
+        "beta.txt",
+    )
+    return root
 
 
 @pytest.fixture
@@ -11,6 +111,11 @@ async def cli_client():
     Optional fixture for testing the packaged script end-to-end.
     This runs the script as a subprocess with stdio transport.
     """
+    # Imported lazily so test modules that never open a client (e.g. the
+    # subprocess-only CLI tests) don't pay for loading the MCP client stack
+    from mcp.client.session import ClientSession
+    from mcp.client.stdio import StdioServerParameters, stdio_client
+
     server_params = StdioServerParameters(
         command=sys.executable, args=["mcp_fd_server.py"]
     )
@@ -1,3 +1,4 @@
+import importlib.util
 import json
 import os
 import platform
@@ -9,6 +10,14 @@ import pytest
 
 # Only mark async tests with anyio, not all tests in the file
 
+# anyio does not pull in trio, so only run the trio variant where it is installed
+_TRIO = pytest.param(
+    "trio",
+    marks=pytest.mark.skipif(
+        importlib.util.find_spec("trio") is None, reason="trio not installed"
+    ),
+)
+
 
 def test_cli_search_command(tmp_path: Path):
     """Test CLI search subcommand."""
@@ -77,6 +86,20 @@ def test_cli_help():
     assert "filter" in result.stdout
 
 
+# Committed fd/fzf stand-ins, so the mocked CLI tests need not write scripts
+_STUB_DIR = Path(__file__).parent / "_stubs"
+
+
+@pytest.fixture
+def stub_case(monkeypatch):
+    """
+    Put the ``tests/_stubs`` fd/fzf first on PATH.
+    Returns a setter choosing which canned listing the fd stub prints.
+    """
+    monkeypatch.setenv("PATH", f"{_STUB_DIR}{os.pathsep}{os.environ.get('PATH', '')}")
+    return lambda case: monkeypatch.setenv("MCP_STUB_CASE", case)
+
+
 def test_cli_search_mocked(tmp_path: Path, monkeypatch):
     """Test CLI search with mocked subprocess behavior."""
     # Create a mock fd executable that returns predefined output
@@ -125,22 +148,13 @@ if "--hidden" in sys.argv:
     assert "src/.hidden/config.py" in output["matches"]
 
 
-def test_cli_search_limit_mocked(tmp_path: Path, monkeypatch):
+def test_cli_search_limit_mocked(stub_case):
     """CLI search should honor --limit and cap results."""
     if platform.system() == "Windows":
         pytest.skip("shebang-based mock not portable on Windows")
 
     # Mock fd to return multiple results
-    mock_fd = tmp_path / "fd"
-    mock_fd.write_text("""#!/usr/bin/env python3
-print("a")
-print("b")
-print("c")
-""")
-    mock_fd.chmod(0o755)
-
-    path_sep = ":"
-    monkeypatch.setenv("PATH", f"{tmp_path}{path_sep}{os.environ.get('PATH', '')}")
+    stub_case("abc")
 
     result = subprocess.run(
         [
@@ -161,31 +175,13 @@ print("c")
     assert len(output["matches"]) == 2
 
 
-def test_cli_filter_limit_mocked(tmp_path: Path, monkeypatch):
+def test_cli_filter_limit_mocked(stub_case):
     """CLI filter should honor --limit in standard mode (no multiline)."""
     if platform.system() == "Windows":
         pytest.skip("shebang-based mock not portable on Windows")
 
-    # Create mock fd and fzf executables
-    mock_fd = tmp_path / "fd"
-    mock_fd.write_text("""#!/usr/bin/env python3
-print("one")
-print("two")
-print("three")
-""")
-    mock_fd.chmod(0o755)
-
-    mock_fzf = tmp_path / "fzf"
-    mock_fzf.write_text("""#!/usr/bin/env python3
-import sys
-data = sys.stdin.read().splitlines()
-for line in data[:3]:
-    print(line)
-""")
-    mock_fzf.chmod(0o755)
-
-    path_sep = ":"
-    monkeypatch.setenv("PATH", f"{tmp_path}{path_sep}{os.environ.get('PATH', '')}")
+    # Mock fd listing and an fzf that passes the first three candidates through
+    stub_case("one-two-three")
 
     result = subprocess.run(
         [
@@ -207,31 +203,13 @@ for line in data[:3]:
     assert len(output["matches"]) == 2
 
 
-def test_cli_filter_first_overrides_limit_mocked(tmp_path: Path, monkeypatch):
+def test_cli_filter_first_overrides_limit_mocked(stub_case):
     """CLI filter should return a single match when both --first and --limit are set."""
     if platform.system() == "Windows":
         pytest.skip("shebang-based mock not portable on Windows")
 
-    # Create mock fd and fzf executables
-    mock_fd = tmp_path / "fd"
-    mock_fd.write_text("""#!/usr/bin/env python3
-print("one")
-print("two")
-print("three")
-""")
-    mock_fd.chmod(0o755)
-
-    mock_fzf = tmp_path / "fzf"
-    mock_fzf.write_text("""#!/usr/bin/env python3
-import sys
-data = sys.stdin.read().splitlines()
-for line in data[:3]:
-    print(line)
-""")
-    mock_fzf.chmod(0o755)
-
-    path_sep = ":"
-    monkeypatch.setenv("PATH", f"{tmp_path}{path_sep}{os.environ.get('PATH', '')}")
+    # Mock fd listing and an fzf that passes the first three candidates through
+    stub_case("one-two-three")
 
     result = subprocess.run(
         [
@@ -308,7 +286,7 @@ def test_mcp_server_mode():
 
 
 @pytest.mark.anyio
-@pytest.mark.parametrize("anyio_backend", ["asyncio", "trio"])
+@pytest.mark.parametrize("anyio_backend", ["asyncio", _TRIO])
 async def test_cli_client_fixture(tmp_path: Path, anyio_backend):
     """Test stdio client communication with the MCP server."""
     import shutil
@@ -1,212 +1,275 @@
+import contextlib
+import io
 import json
 import os
 import platform
 import shutil
 import subprocess
-import sys
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import patch
 
+import anyio
 import pytest
-from mcp.shared.memory import (
-    create_connected_server_and_client_session as client_session,
-)
+import pytest_asyncio
 
 import mcp_fd_server
 
+# Use orjson for decoding tool results when it happens to be installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
-def normalize_path(path):
-    """Normalize path to use forward slashes for cross-platform testing."""
-    # Use pathlib for proper path handling
-    return Path(path).as_posix()
+# Resolved once at import, so missing binaries skip tests before any fixture runs
+requires_fd = pytest.mark.skipif(shutil.which("fd") is None, reason="fd not on PATH")
+requires_fzf = pytest.mark.skipif(shutil.which("fzf") is None, reason="fzf not on PATH")
 
+# fd patterns shared across tests
+PATTERN_PY = r"\.py$"
+PATTERN_RS = r"\.rs$"
+PATTERN_TXT = r"\.txt$"
+SEARCH_PY_ARGS = {"pattern": PATTERN_PY}
 
-pytestmark = pytest.mark.anyio
+# Backslash -> forward slash, applied in a single C-level pass
+_TO_POSIX = str.maketrans("\\", "/")
 
 
-def _skip_if_missing(binary: str):
-    """Skip test if binary is not available on PATH."""
-    if shutil.which(binary) is None:
-        pytest.skip(f"{binary} not on PATH")
+def normalize_path(path):
+    """Normalize path to use forward slashes for cross-platform testing."""
+    return str(path).translate(_TO_POSIX)
 
 
-async def test_search_files_finds_python(tmp_path: Path):
-    """Test that search_files correctly finds Python files."""
-    _skip_if_missing("fd")
+pytestmark = pytest.mark.anyio
 
-    # Arrange
-    (tmp_path / "one.py").write_text("print('hi')")
-    (tmp_path / "two.txt").write_text("hello")
-    (tmp_path / "subdir").mkdir()
-    (tmp_path / "subdir" / "three.py").write_text("# python file")
 
-    # Act
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "search_files", {"pattern": r"\.py$", "path": str(tmp_path)}
-        )
+@pytest.fixture(scope="module")
+def mcp_server():
+    """Low-level server behind the shared ``mcp_client`` fixture."""
+    return mcp_fd_server.mcp._mcp_server
+
+
+@pytest_asyncio.fixture(scope="module")
+async def tool_meta(mcp_client):
+    """Tool descriptors keyed by name, listed once per module."""
+    result = await mcp_client.list_tools()
+    return {tool.name: tool for tool in result.tools}
+
+
+def _fake_proc(stdout=b"", stderr=b"", returncode=0):
+    """Build a plain stand-in for a Popen handle.
+
+    ``communicate()`` returns *stdout*/*stderr* and keeps the bytes it was
+    fed in ``proc.input`` so tests can inspect what reached fzf.
+    """
+    proc = SimpleNamespace(returncode=returncode, stdout=io.BytesIO(), input=None)
+
+    def communicate(input=None, timeout=None):
+        proc.input = input
+        return stdout, stderr
+
+    proc.communicate = communicate
+    proc.wait = lambda timeout=None: returncode
+    proc.poll = lambda: returncode
+    proc.kill = proc.terminate = lambda: None
+    return proc
+
+
+@pytest.fixture
+def mock_binaries(monkeypatch):
+    """Point the fd/fzf executables at dummy paths for subprocess-mocked tests."""
+    monkeypatch.setattr(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd")
+    monkeypatch.setattr(mcp_fd_server, "FZF_EXECUTABLE", "/mock/fzf")
+
+
+def _parse(result) -> dict:
+    """Decode the JSON payload of a ``call_tool`` result."""
+    return _json_loads(result.content[0].text)
+
+
+async def _call_tools_concurrently(client, *calls: tuple[str, dict]) -> list[dict]:
+    """Run independent ``call_tool`` requests concurrently.
+
+    Returns the decoded JSON payloads in the same order as *calls*.
+    """
+    results: list[dict] = [{}] * len(calls)
+
+    async def _run(i: int, name: str, arguments: dict) -> None:
+        result = await client.call_tool(name, arguments)
+        results[i] = _parse(result)
+
+    async with anyio.create_task_group() as tg:
+        for i, (name, arguments) in enumerate(calls):
+            tg.start_soon(_run, i, name, arguments)
+    return results
+
+
+@requires_fd
+@pytest.mark.parametrize(
+    "pattern,flags,expected,excluded",
+    [
+        pytest.param(
+            PATTERN_PY,
+            "",
+            {"one.py", "subdir/three.py"},
+            {"two.txt", ".hidden/secret.py"},
+            id="python",
+        ),
+        pytest.param(
+            PATTERN_PY,
+            "--hidden --type f",
+            {"one.py", "subdir/three.py", ".hidden/secret.py"},
+            {"two.txt"},
+            id="hidden",
+        ),
+        pytest.param(
+            r"\.nonexistent$", "", set(), {"one.py", "two.txt"}, id="no-match"
+        ),
+    ],
+)
+async def test_search_files(
+    sample_tree: Path, mcp_client, pattern, flags, expected, excluded
+):
+    """Test search_files patterns and flags against the shared sample tree."""
 
-        # Assert
-        assert hasattr(result, "content")
-        assert len(result.content) > 0
-        content = result.content[0]
-        assert content.type == "text"
+    # Act
+    result = await mcp_client.call_tool(
+        "search_files", {"pattern": pattern, "path": str(sample_tree), "flags": flags}
+    )
 
-        data = json.loads(content.text)
-        assert "matches" in data
-        assert normalize_path(tmp_path / "one.py") in data["matches"]
-        assert normalize_path(tmp_path / "subdir" / "three.py") in data["matches"]
-        assert all(p.endswith(".py") for p in data["matches"])
-        assert normalize_path(tmp_path / "two.txt") not in data["matches"]
+    # Assert
+    assert hasattr(result, "content")
+    assert len(result.content) > 0
+    content = result.content[0]
+    assert content.type == "text"
+
+    data = _parse(result)
+    assert "matches" in data
+    matches = set(data["matches"])
+    assert {normalize_path(sample_tree / n) for n in expected} <= matches
+    assert not {normalize_path(sample_tree / n) for n in excluded} & matches
+    if not expected:
+        assert data["matches"] == []
 
 
-async def test_search_files_with_flags(tmp_path: Path):
+@requires_fd
+async def test_search_files_with_flags(tmp_path: Path, mcp_client):
     """Test search_files with additional fd flags."""
-    _skip_if_missing("fd")
 
     # Arrange
-    (tmp_path / ".hidden.py").write_text("# hidden")
-    (tmp_path / "visible.py").write_text("# visible")
-
-    # Act without hidden flag
-
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result_no_hidden = await client.call_tool(
-            "search_files", {"pattern": r"\.py$", "path": str(tmp_path)}
-        )
-        data_no_hidden = json.loads(result_no_hidden.content[0].text)
-
-        # Act with hidden flag
-        result_with_hidden = await client.call_tool(
+    for name in (".hidden.py", "visible.py"):
+        (tmp_path / name).write_bytes(b"")
+
+    # Act without and with the hidden flag; the two fd runs are independent
+    data_no_hidden, data_with_hidden = await _call_tools_concurrently(
+        mcp_client,
+        ("search_files", dict(SEARCH_PY_ARGS, path=str(tmp_path))),
+        (
             "search_files",
-            {"pattern": r"\.py$", "path": str(tmp_path), "flags": "--hidden"},
-        )
-        data_with_hidden = json.loads(result_with_hidden.content[0].text)
+            dict(SEARCH_PY_ARGS, path=str(tmp_path), flags="--hidden"),
+        ),
+    )
 
-        # Assert
-        assert normalize_path(tmp_path / "visible.py") in data_no_hidden["matches"]
-        assert normalize_path(tmp_path / ".hidden.py") not in data_no_hidden["matches"]
-        assert normalize_path(tmp_path / ".hidden.py") in data_with_hidden["matches"]
+    # Assert
+    visible = normalize_path(tmp_path / "visible.py")
+    hidden = normalize_path(tmp_path / ".hidden.py")
+    matches_no_hidden = set(data_no_hidden["matches"])
+    assert visible in matches_no_hidden
+    assert hidden not in matches_no_hidden
+    assert {visible, hidden} <= set(data_with_hidden["matches"])
 
 
-async def test_search_files_error_handling():
+async def test_search_files_error_handling(mcp_client):
     """Test search_files error handling for missing pattern."""
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool("search_files", {"pattern": ""})
+    result = await mcp_client.call_tool("search_files", {"pattern": ""})
 
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "'pattern' argument is required" in data["error"]
+    data = _parse(result)
+    assert "error" in data
+    assert "'pattern' argument is required" in data["error"]
 
 
-async def test_filter_files_returns_best_match(tmp_path: Path):
+@requires_fd
+@requires_fzf
+async def test_filter_files_returns_best_match(fuzzy_tree: Path, mcp_client):
     """Test filter_files with fuzzy matching."""
-    _skip_if_missing("fd")
-    _skip_if_missing("fzf")
-
-    # Arrange
-    (tmp_path / "main.rs").write_text("// rust")
-    (tmp_path / "minor.rs").write_text("// rust")
-    (tmp_path / "maintenance.rs").write_text("// rust")
 
     # Act
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "filter_files",
-            {
-                "filter": "main",
-                "pattern": r"\.rs$",
-                "path": str(tmp_path),
-                "first": True,
-            },
-        )
+    result = await mcp_client.call_tool(
+        "filter_files",
+        {
+            "filter": "main",
+            "pattern": PATTERN_RS,
+            "path": str(fuzzy_tree),
+            "first": True,
+        },
+    )
 
-        # Assert
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        assert len(data["matches"]) == 1
-        assert data["matches"][0] == normalize_path(tmp_path / "main.rs")
+    # Assert
+    data = _parse(result)
+    assert "matches" in data
+    assert len(data["matches"]) == 1
+    assert data["matches"][0] == normalize_path(fuzzy_tree / "main.rs")
 
 
-async def test_filter_files_multiple_matches(tmp_path: Path):
+@requires_fd
+@requires_fzf
+async def test_filter_files_multiple_matches(fuzzy_tree: Path, mcp_client):
     """Test filter_files returning multiple fuzzy matches."""
-    _skip_if_missing("fd")
-    _skip_if_missing("fzf")
-
-    # Arrange
-    (tmp_path / "config.json").write_text("{}")
-    (tmp_path / "configuration.yaml").write_text("key: value")
-    (tmp_path / "settings.toml").write_text("[section]")
 
     # Act
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "filter_files", {"filter": "conf", "path": str(tmp_path)}
-        )
+    result = await mcp_client.call_tool(
+        "filter_files", {"filter": "conf", "path": str(fuzzy_tree)}
+    )
 
-        # Assert
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        assert any("config" in p for p in data["matches"])
+    # Assert
+    data = _parse(result)
+    assert "matches" in data
+    assert any("config" in p for p in data["matches"])
 
 
-async def test_filter_files_error_handling():
+async def test_filter_files_error_handling(mcp_client):
     """Test filter_files error handling for missing filter."""
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool("filter_files", {"filter": ""})
-
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "'filter' argument is required" in data["error"]
+    result = await mcp_client.call_tool("filter_files", {"filter": ""})
 
+    data = _parse(result)
+    assert "error" in data
+    assert "'filter' argument is required" in data["error"]
 
-async def test_list_tools():
-    """Test that tools are properly exposed with correct metadata."""
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.list_tools()
 
-        # Should have exactly 2 tools
-        assert len(result.tools) == 2
+async def test_list_tools(tool_meta):
+    """Test that exactly the two tools are exposed."""
+    assert set(tool_meta) == {"search_files", "filter_files"}
 
-        # Find tools by name
-        search_tool = next(t for t in result.tools if t.name == "search_files")
-        filter_tool = next(t for t in result.tools if t.name == "filter_files")
 
-        # Verify search_files metadata
-        assert search_tool.description.startswith(
-            "Search for files using patterns (powered by fd"
-        )
-        assert "pattern" in search_tool.inputSchema["required"]
-
-        # Verify filter_files metadata
-        assert filter_tool.description.startswith(
-            "Fuzzy search for files by NAME using fzf"
-        )
-        assert "filter" in filter_tool.inputSchema["required"]
+@pytest.mark.parametrize(
+    "name,prefix,required",
+    [
+        ("search_files", "Search for files using patterns (powered by fd", "pattern"),
+        ("filter_files", "Fuzzy search for files by NAME using fzf", "filter"),
+    ],
+)
+async def test_tool_metadata(tool_meta, name, prefix, required):
+    """Test that each tool carries the expected description and schema."""
+    tool = tool_meta[name]
+    assert tool.description.startswith(prefix)
+    assert required in tool.inputSchema["required"]
 
 
 def test_binary_discovery():
     """Test binary discovery logic for fd and fzf."""
-    with patch("shutil.which") as mock_which:
-        # Test fd discovery (fd takes precedence over fdfind)
-        mock_which.side_effect = (
-            lambda x: "/usr/bin/fd"
-            if x == "fd"
-            else ("/usr/bin/fdfind" if x == "fdfind" else None)
-        )
-        fd_path = mock_which("fd") or mock_which("fdfind")
-        assert fd_path == "/usr/bin/fd"
+    # fd takes precedence over fdfind
+    assert mcp_fd_server._detect_fd(which=lambda x: f"/usr/bin/{x}") == "/usr/bin/fd"
 
-        # Test fdfind fallback (Debian/Ubuntu)
-        mock_which.side_effect = lambda x: "/usr/bin/fdfind" if x == "fdfind" else None
-        fd_path = mock_which("fd") or mock_which("fdfind")
-        assert fd_path == "/usr/bin/fdfind"
+    # fdfind fallback (Debian/Ubuntu)
+    assert (
+        mcp_fd_server._detect_fd(
+            which=lambda x: "/usr/bin/fdfind" if x == "fdfind" else None
+        )
+        == "/usr/bin/fdfind"
+    )
 
-        # Reset side_effect and test no fd available
-        mock_which.side_effect = None
-        mock_which.return_value = None
-        fd_path = mock_which("fd") or mock_which("fdfind")
-        assert fd_path is None
+    # Neither name available
+    assert mcp_fd_server._detect_fd(which=lambda x: None) is None
 
 
 def test_require_binary():
@@ -221,181 +284,120 @@ def test_require_binary():
     assert "Cannot find the `fd` binary" in str(exc_info.value)
 
 
+@pytest.mark.usefixtures("mock_binaries")
 @patch("subprocess.check_output")
-async def test_search_files_mocked(mock_check_output):
+async def test_search_files_mocked(mock_check_output, mcp_client):
     """Test search_files with mocked subprocess for CI environments."""
     # Mock fd output
     mock_check_output.return_value = "src/main.py\nsrc/test.py\n"
 
-    # Override binary check
-    import json
-
-    with patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"):
-        async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "search_files", {"pattern": r"\.py$", "path": "src"}
-            )
+    result = await mcp_client.call_tool(
+        "search_files", dict(SEARCH_PY_ARGS, path="src")
+    )
 
-            # Assert
-            data = json.loads(result.content[0].text)
-            assert data["matches"] == ["src/main.py", "src/test.py"]
-            mock_check_output.assert_called_once()
+    # Assert
+    assert _parse(result)["matches"] == ["src/main.py", "src/test.py"]
+    mock_check_output.assert_called_once()
 
 
+@pytest.mark.usefixtures("mock_binaries")
 @patch("subprocess.Popen")
 @patch("subprocess.check_output")
-async def test_filter_files_mocked(mock_check_output, mock_popen):
+async def test_filter_files_mocked(mock_check_output, mock_popen, mcp_client):
     """Test filter_files with mocked subprocess for CI environments."""
     # Mock fd process
-    fd_proc = MagicMock()
-    fd_proc.stdout = MagicMock()
-    mock_popen.return_value = fd_proc
+    mock_popen.return_value = _fake_proc()
 
     # Mock fzf output
     mock_check_output.return_value = "src/main.py\n"
 
-    # Override binary checks
-    with (
-        patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"),
-        patch.object(mcp_fd_server, "FZF_EXECUTABLE", "/mock/fzf"),
-    ):
-        async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "filter_files", {"filter": "main", "pattern": r"\.py$"}
-            )
+    result = await mcp_client.call_tool(
+        "filter_files", {"filter": "main", "pattern": PATTERN_PY}
+    )
 
-            # Assert
-            data = json.loads(result.content[0].text)
-            assert data["matches"] == ["src/main.py"]
+    # Assert
+    assert _parse(result)["matches"] == ["src/main.py"]
 
 
 # Additional comprehensive tests
 
 
-async def test_search_files_default_path():
+@requires_fd
+async def test_search_files_default_path(mcp_client):
     """Test search_files with default path (current directory)."""
-    _skip_if_missing("fd")
 
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool("search_files", {"pattern": r"\.py$"})
+    result = await mcp_client.call_tool("search_files", SEARCH_PY_ARGS)
 
-        data = json.loads(result.content[0].text)
-        # Should find some .py files in current directory (at least mcp_fd_server.py)
-        assert "matches" in data
+    data = _parse(result)
+    # Should find some .py files in current directory (at least mcp_fd_server.py)
+    assert "matches" in data
 
 
-async def test_filter_files_with_fd_and_fzf_flags(tmp_path: Path):
+@requires_fd
+@requires_fzf
+async def test_filter_files_with_fd_and_fzf_flags(fuzzy_tree: Path, mcp_client):
     """Test filter_files with additional fd and fzf flags."""
-    _skip_if_missing("fd")
-    _skip_if_missing("fzf")
 
-    # Create test files
-    (tmp_path / ".env.local").write_text("SECRET=hidden")
-    (tmp_path / "config.env").write_text("PUBLIC=visible")
-
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "filter_files",
-            {
-                "filter": "env",
-                "pattern": "env",
-                "path": str(tmp_path),
-                "fd_flags": "--hidden",
-                "fzf_flags": "--exact",
-            },
-        )
-
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        # Should find both files with --hidden flag
-        assert len(data["matches"]) >= 1
-
-
-async def test_search_files_with_multiple_flags(tmp_path: Path):
-    """Test search_files with multiple fd flags."""
-    _skip_if_missing("fd")
-
-    # Create test structure
-    (tmp_path / ".hidden").mkdir()
-    (tmp_path / ".hidden" / "secret.py").write_text("# secret")
-    (tmp_path / "public.py").write_text("# public")
-
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "search_files",
-            {"pattern": r"\.py$", "path": str(tmp_path), "flags": "--hidden --type f"},
-        )
-
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        # Should find both files with --hidden flag
-        assert any("secret.py" in match for match in data["matches"])
-        assert any("public.py" in match for match in data["matches"])
+    result = await mcp_client.call_tool(
+        "filter_files",
+        {
+            "filter": "env",
+            "pattern": "env",
+            "path": str(fuzzy_tree),
+            "fd_flags": "--hidden",
+            "fzf_flags": "--exact",
+        },
+    )
 
+    data = _parse(result)
+    assert "matches" in data
+    # Should find both files with --hidden flag
+    assert len(data["matches"]) >= 1
 
-async def test_empty_search_results(tmp_path: Path):
-    """Test behavior when search returns no results."""
-    _skip_if_missing("fd")
 
-    # Create directory with no matching files
-    (tmp_path / "readme.txt").write_text("documentation")
+@requires_fd
+@requires_fzf
+async def test_filter_files_empty_results(fuzzy_tree: Path, mcp_client):
+    """Test filter_files with no fuzzy matches."""
 
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "search_files", {"pattern": r"\.nonexistent$", "path": str(tmp_path)}
-        )
+    result = await mcp_client.call_tool(
+        "filter_files",
+        {"filter": "zzz_nonmatch", "pattern": PATTERN_TXT, "path": str(fuzzy_tree)},
+    )
 
-        data = json.loads(result.content[0].text)
+    data = _parse(result)
+    # fzf may return error for no matches, or empty matches list
+    if "error" in data:
+        # This is acceptable - fzf can return error when no matches
+        assert isinstance(data["error"], str)
+    else:
         assert "matches" in data
-        assert data["matches"] == []
+        assert isinstance(data["matches"], list)
 
 
-async def test_filter_files_empty_results(tmp_path: Path):
-    """Test filter_files with no fuzzy matches."""
-    _skip_if_missing("fd")
-    _skip_if_missing("fzf")
-
-    # Create test files
-    (tmp_path / "alpha.txt").write_text("content")
-    (tmp_path / "beta.txt").write_text("content")
-
-    async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "filter_files",
-            {"filter": "zzz_nonmatch", "pattern": r"\.txt$", "path": str(tmp_path)},
-        )
+# CLI interface tests
 
-        data = json.loads(result.content[0].text)
-        # fzf may return error for no matches, or empty matches list
-        if "error" in data:
-            # This is acceptable - fzf can return error when no matches
-            assert isinstance(data["error"], str)
-        else:
-            assert "matches" in data
-            assert isinstance(data["matches"], list)
 
-
-# CLI interface tests
+def _run_cli(*argv: str) -> dict:
+    """Run the CLI in-process and decode the JSON it prints."""
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            rc = mcp_fd_server._cli(list(argv))
+    except mcp_fd_server.BinaryMissing as exc:
+        pytest.skip(str(exc))
+    assert rc == 0
+    return json.loads(buf.getvalue())
 
 
 def test_cli_search_command(tmp_path: Path):
     """Test CLI search subcommand."""
     # Create test files
-    (tmp_path / "test.py").write_text("print('hello')")
-    (tmp_path / "test.txt").write_text("hello")
-
-    result = subprocess.run(
-        [sys.executable, "mcp_fd_server.py", "search", r"\.py$", str(tmp_path)],
-        capture_output=True,
-        text=True,
-    )
+    for name in ("test.py", "test.txt"):
+        (tmp_path / name).write_bytes(b"")
 
-    # Skip if fd not available
-    if "Cannot find the `fd` binary" in result.stderr:
-        pytest.skip("fd not available")
+    output = _run_cli("search", PATTERN_PY, str(tmp_path))
 
-    assert result.returncode == 0
-    output = json.loads(result.stdout)
     assert "matches" in output
     assert any("test.py" in match for match in output["matches"])
 
@@ -403,29 +405,11 @@ def test_cli_search_command(tmp_path: Path):
 def test_cli_filter_command(tmp_path: Path):
     """Test CLI filter subcommand."""
     # Create test files
-    (tmp_path / "main.py").write_text("# main")
-    (tmp_path / "minor.py").write_text("# minor")
-
-    result = subprocess.run(
-        [
-            sys.executable,
-            "mcp_fd_server.py",
-            "filter",
-            "main",
-            r"\.py$",
-            str(tmp_path),
-            "--first",
-        ],
-        capture_output=True,
-        text=True,
-    )
+    for name in ("main.py", "minor.py"):
+        (tmp_path / name).write_bytes(b"")
 
-    # Skip if dependencies not available
-    if "Cannot find the" in result.stderr:
-        pytest.skip("fd or fzf not available")
+    output = _run_cli("filter", "main", PATTERN_PY, str(tmp_path), "--first")
 
-    assert result.returncode == 0
-    output = json.loads(result.stdout)
     assert "matches" in output
     if output["matches"]:  # fzf might not find matches depending on version
         assert len(output["matches"]) == 1
@@ -433,40 +417,26 @@ def test_cli_filter_command(tmp_path: Path):
 
 def test_cli_help():
     """Test CLI help output."""
-    result = subprocess.run(
-        [sys.executable, "mcp_fd_server.py", "-h"], capture_output=True, text=True
-    )
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf), pytest.raises(SystemExit) as exc_info:
+        mcp_fd_server._cli(["-h"])
 
-    assert result.returncode == 0
-    assert "fd + fzf powers" in result.stdout
-    assert "search" in result.stdout
-    assert "filter" in result.stdout
+    assert exc_info.value.code == 0
+    help_text = buf.getvalue()
+    assert "fd + fzf powers" in help_text
+    assert "search" in help_text
+    assert "filter" in help_text
 
 
 def test_cli_with_flags(tmp_path: Path):
     """Test CLI with additional flags."""
     # Create test files including hidden
-    (tmp_path / "visible.py").write_text("# visible")
-    (tmp_path / ".hidden.py").write_text("# hidden")
-
-    result = subprocess.run(
-        [
-            sys.executable,
-            "mcp_fd_server.py",
-            "search",
-            r"\.py$",
-            str(tmp_path),
-            "--flags=--hidden",  # Use equals syntax for flags
-        ],
-        capture_output=True,
-        text=True,
-    )
+    for name in ("visible.py", ".hidden.py"):
+        (tmp_path / name).write_bytes(b"")
 
-    if "Cannot find the `fd` binary" in result.stderr:
-        pytest.skip("fd not available")
+    # Use equals syntax for flags
+    output = _run_cli("search", PATTERN_PY, str(tmp_path), "--flags=--hidden")
 
-    assert result.returncode == 0
-    output = json.loads(result.stdout)
     assert "matches" in output
     # Should find both visible and hidden files
     matches = output["matches"]
@@ -476,110 +446,72 @@ def test_cli_with_flags(tmp_path: Path):
 
 # Additional mock-based tests that don't require real binaries
 
-monkeypatch = pytest.MonkeyPatch()
 
-
-def test_fd_flag_handling(tmp_path: Path):
+@pytest.mark.usefixtures("mock_binaries")
+def test_fd_flag_handling():
     """Test that fzf exit code FZF_EXIT_NO_MATCH (1) returns empty matches, not error."""
-    if platform.system() == "Windows":
-        mock_fd = tmp_path / "fd.bat"
-        mock_fd.write_text("""@echo off
-echo file1.txt
-echo file2.log
-""")
-
-        mock_fzf = tmp_path / "fzf.bat"
-        mock_fzf.write_text(f"""@echo off
-rem fzf returns exit code {mcp_fd_server.FZF_EXIT_NO_MATCH} when no matches found
-exit /b {mcp_fd_server.FZF_EXIT_NO_MATCH}
-""")
-    else:
-        mock_fd = tmp_path / "fd"
-        mock_fd.write_text("""#!/usr/bin/env python3
-import sys
-print("file1.txt")
-print("file2.log")
-sys.exit(0)
-""")
-        mock_fd.chmod(0o755)
-
-        mock_fzf = tmp_path / "fzf"
-        mock_fzf.write_text(f"""#!/usr/bin/env python3
-import sys
-# fzf returns exit code {mcp_fd_server.FZF_EXIT_NO_MATCH} when no matches found
-sys.exit({mcp_fd_server.FZF_EXIT_NO_MATCH})
-""")
-        mock_fzf.chmod(0o755)
-
-    with monkeypatch.context() as m:
-        path_sep = ";" if platform.system() == "Windows" else ":"
-        m.setenv("PATH", f"{tmp_path}{path_sep}{os.environ.get('PATH', '')}")
-
-        # Reload module globals to pick up new executables
-        mcp_fd_server.FD_EXECUTABLE = shutil.which("fd") or shutil.which("fdfind")
-        mcp_fd_server.FZF_EXECUTABLE = shutil.which("fzf")
-
+    with (
+        patch("subprocess.Popen", return_value=_fake_proc()),
+        patch(
+            "subprocess.check_output",
+            # fzf returns exit code FZF_EXIT_NO_MATCH when no matches found
+            side_effect=subprocess.CalledProcessError(
+                mcp_fd_server.FZF_EXIT_NO_MATCH, ["/mock/fzf"]
+            ),
+        ),
+    ):
         result = mcp_fd_server.filter_files("nomatch")
 
-        # Should handle empty results gracefully (FZF_EXIT_NO_MATCH = no matches, not error)
-        assert "matches" in result
-        assert result["matches"] == []
+    # Should handle empty results gracefully (FZF_EXIT_NO_MATCH = no matches, not error)
+    assert "matches" in result
+    assert result["matches"] == []
 
 
-def test_fzf_actual_error_handling(tmp_path: Path):
+@pytest.mark.xdist_group(name="path_mutation")
+@pytest.mark.skipif(platform.system() == "Windows", reason="POSIX mock scripts only")
+def test_fzf_actual_error_handling(tmp_path: Path, monkeypatch):
     """Test that fzf exit code FZF_EXIT_ERROR (2) is properly reported as an error."""
-    if platform.system() == "Windows":
-        mock_fd = tmp_path / "fd.bat"
-        mock_fd.write_text("""@echo off
-echo file1.txt
-echo file2.log
-""")
-
-        mock_fzf = tmp_path / "fzf.bat"
-        mock_fzf.write_text(f"""@echo off
-rem fzf returns exit code {mcp_fd_server.FZF_EXIT_ERROR} for actual errors
-echo Error: fzf encountered an error >&2
-exit /b {mcp_fd_server.FZF_EXIT_ERROR}
-""")
-    else:
-        mock_fd = tmp_path / "fd"
-        mock_fd.write_text("""#!/usr/bin/env python3
+    # Mock fd/fzf are prepended to PATH, so these tests share one xdist worker group
+    mock_fd = tmp_path / "fd"
+    mock_fd.write_text("""#!/usr/bin/env python3
 import sys
 print("file1.txt")
 print("file2.log")
 sys.exit(0)
 """)
-        mock_fd.chmod(0o755)
+    mock_fd.chmod(0o755)
 
-        mock_fzf = tmp_path / "fzf"
-        mock_fzf.write_text(f"""#!/usr/bin/env python3
+    mock_fzf = tmp_path / "fzf"
+    mock_fzf.write_text(f"""#!/usr/bin/env python3
 import sys
 # fzf returns exit code {mcp_fd_server.FZF_EXIT_ERROR} for actual errors
 print("Error: fzf encountered an error", file=sys.stderr)
 sys.exit({mcp_fd_server.FZF_EXIT_ERROR})
 """)
-        mock_fzf.chmod(0o755)
+    mock_fzf.chmod(0o755)
 
-    with monkeypatch.context() as m:
-        path_sep = ";" if platform.system() == "Windows" else ":"
-        m.setenv("PATH", f"{tmp_path}{path_sep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
 
-        # Reload module globals to pick up new executables
-        mcp_fd_server.FD_EXECUTABLE = shutil.which("fd") or shutil.which("fdfind")
-        mcp_fd_server.FZF_EXECUTABLE = shutil.which("fzf")
+    # Point module globals at the new executables (restored at teardown)
+    monkeypatch.setattr(
+        mcp_fd_server,
+        "FD_EXECUTABLE",
+        shutil.which("fd") or shutil.which("fdfind"),
+    )
+    monkeypatch.setattr(mcp_fd_server, "FZF_EXECUTABLE", shutil.which("fzf"))
 
-        result = mcp_fd_server.filter_files("searchterm")
+    result = mcp_fd_server.filter_files("searchterm")
 
-        # Should return an error for FZF_EXIT_ERROR, not empty matches
-        assert "error" in result
-        assert "matches" not in result
-        # The error should contain information about the subprocess error
-        assert (
-            "CalledProcessError" in result["error"] or "exit" in result["error"].lower()
-        )
+    # Should return an error for FZF_EXIT_ERROR, not empty matches
+    assert "error" in result
+    assert "matches" not in result
+    # The error should contain information about the subprocess error
+    assert "CalledProcessError" in result["error"] or "exit" in result["error"].lower()
 
 
-def test_fzf_actual_error_handling_multiline(tmp_path: Path):
+@pytest.mark.xdist_group(name="path_mutation")
+@pytest.mark.skipif(platform.system() == "Windows", reason="POSIX mock scripts only")
+def test_fzf_actual_error_handling_multiline(tmp_path: Path, monkeypatch):
     """Test that fzf exit code FZF_EXIT_ERROR (2) in multiline mode is properly reported as an error."""
     # Create test files with content
     test_file1 = tmp_path / "test1.txt"
@@ -587,57 +519,44 @@ def test_fzf_actual_error_handling_multiline(tmp_path: Path):
     test_file2 = tmp_path / "test2.txt"
     test_file2.write_text("content2")
 
-    if platform.system() == "Windows":
-        mock_fd = tmp_path / "fd.bat"
-        mock_fd.write_text(f"""@echo off
-echo {test_file1}
-echo {test_file2}
-""")
-
-        mock_fzf = tmp_path / "fzf.bat"
-        mock_fzf.write_text(f"""@echo off
-rem fzf returns exit code {mcp_fd_server.FZF_EXIT_ERROR} for actual errors in multiline mode
-echo Error: fzf multiline processing failed >&2
-exit /b {mcp_fd_server.FZF_EXIT_ERROR}
-""")
-    else:
-        mock_fd = tmp_path / "fd"
-        mock_fd.write_text(f"""#!/usr/bin/env python3
+    mock_fd = tmp_path / "fd"
+    mock_fd.write_text(f"""#!/usr/bin/env python3
 import sys
 print("{test_file1}")
 print("{test_file2}")
 sys.exit(0)
 """)
-        mock_fd.chmod(0o755)
+    mock_fd.chmod(0o755)
 
-        mock_fzf = tmp_path / "fzf"
-        mock_fzf.write_text(f"""#!/usr/bin/env python3
+    mock_fzf = tmp_path / "fzf"
+    mock_fzf.write_text(f"""#!/usr/bin/env python3
 import sys
 # fzf returns exit code {mcp_fd_server.FZF_EXIT_ERROR} for actual errors in multiline mode
 print("Error: fzf multiline processing failed", file=sys.stderr)
 sys.exit({mcp_fd_server.FZF_EXIT_ERROR})
 """)
-        mock_fzf.chmod(0o755)
+    mock_fzf.chmod(0o755)
 
-    with monkeypatch.context() as m:
-        path_sep = ";" if platform.system() == "Windows" else ":"
-        m.setenv("PATH", f"{tmp_path}{path_sep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ.get('PATH', '')}")
 
-        # Reload module globals to pick up new executables
-        mcp_fd_server.FD_EXECUTABLE = shutil.which("fd") or shutil.which("fdfind")
-        mcp_fd_server.FZF_EXECUTABLE = shutil.which("fzf")
+    # Point module globals at the new executables (restored at teardown)
+    monkeypatch.setattr(
+        mcp_fd_server,
+        "FD_EXECUTABLE",
+        shutil.which("fd") or shutil.which("fdfind"),
+    )
+    monkeypatch.setattr(mcp_fd_server, "FZF_EXECUTABLE", shutil.which("fzf"))
 
-        result = mcp_fd_server.filter_files("searchterm", multiline=True)
+    result = mcp_fd_server.filter_files("searchterm", multiline=True)
 
-        # Should return an error for FZF_EXIT_ERROR in multiline mode too
-        assert "error" in result
-        assert "matches" not in result
-        # The error should contain information about the subprocess error
-        assert (
-            "CalledProcessError" in result["error"] or "exit" in result["error"].lower()
-        )
+    # Should return an error for FZF_EXIT_ERROR in multiline mode too
+    assert "error" in result
+    assert "matches" not in result
+    # The error should contain information about the subprocess error
+    assert "CalledProcessError" in result["error"] or "exit" in result["error"].lower()
 
 
+@pytest.mark.usefixtures("mock_binaries")
 def test_multiline_support(tmp_path: Path):
     """Test multiline support in filter_files."""
     # Create test files with content
@@ -647,66 +566,26 @@ def test_multiline_support(tmp_path: Path):
     test_file2 = tmp_path / "test2.py"
     test_file2.write_text("import os\ndef main():\n    print('hello')")
 
-    if platform.system() == "Windows":
-        mock_fd = tmp_path / "fd.bat"
-        mock_fd.write_text(f"""@echo off
-echo {test_file1}
-echo {test_file2}
-""")
-
-        mock_fzf = tmp_path / "fzf.bat"
-        # Create a Python script that fzf.bat will call
-        fzf_py = tmp_path / "fzf_impl.py"
-        # Escape the path for use in Python string
-        escaped_path = str(test_file1).replace("\\", "\\\\")
-        fzf_py.write_text(f'''import sys
-if "--read0" in sys.argv and "--print0" in sys.argv:
-    # Read null-delimited input
-    data = sys.stdin.buffer.read()
-    # Look for "function" in the content
-    if b"function" in data:
-        # Return matching file record with null terminator
-        content = "{escaped_path}:\\nline 1\\nline 2\\nfunction foo() {{\\n  return bar;\\n}}"
-        print(content, end="\\0")
-''')
-        mock_fzf.write_text(f'@echo off\n{sys.executable} "{fzf_py}" %*')
-    else:
-        mock_fd = tmp_path / "fd"
-        mock_fd.write_text(f'''#!/usr/bin/env python3
-import sys
-print("{test_file1}")
-print("{test_file2}")
-''')
-        mock_fd.chmod(0o755)
-
-        mock_fzf = tmp_path / "fzf"
-        mock_fzf.write_text(f'''#!/usr/bin/env python3
-import sys
-if "--read0" in sys.argv and "--print0" in sys.argv:
-    # Read null-delimited input
-    data = sys.stdin.buffer.read()
-    # Look for "function" in the content
-    if b"function" in data:
-        # Return matching file record with null terminator
-        content = "{test_file1}:\\nline 1\\nline 2\\nfunction foo() {{\\n  return bar;\\n}}"
-        print(content, end="\\0")
-''')
-        mock_fzf.chmod(0o755)
-
-    with monkeypatch.context() as m:
-        path_sep = ";" if platform.system() == "Windows" else ":"
-        m.setenv("PATH", f"{tmp_path}{path_sep}{os.environ.get('PATH', '')}")
-
-        # Reload module globals to pick up new executables
-        mcp_fd_server.FD_EXECUTABLE = shutil.which("fd") or shutil.which("fdfind")
-        mcp_fd_server.FZF_EXECUTABLE = shutil.which("fzf")
+    # Mock fzf returning the matching file record with null terminator
+    fzf_proc = _fake_proc(
+        f"{normalize_path(test_file1)}:\n".encode() + test_file1.read_bytes() + b"\0"
+    )
 
+    with (
+        patch("subprocess.check_output", return_value=f"{test_file1}\n{test_file2}\n"),
+        patch("subprocess.Popen", return_value=fzf_proc),
+    ):
         result = mcp_fd_server.filter_files("function", multiline=True)
 
-        assert "matches" in result
-        matches = result["matches"]
-        assert len(matches) > 0
-        assert "function foo()" in matches[0]
+    assert "matches" in result
+    matches = result["matches"]
+    assert len(matches) > 0
+    assert "function foo()" in matches[0]
+
+    # Both files were read and fed to fzf as NUL-separated records
+    fzf_input = fzf_proc.input
+    assert fzf_input.count(b"\0") == 2
+    assert b"function foo()" in fzf_input
 
 
 def test_multiline_cli_support():
@@ -731,7 +610,8 @@ def test_multiline_cli_support():
             assert call_args[1].get("multiline") is True
 
 
-async def test_filter_files_multiline_mcp():
+@pytest.mark.usefixtures("mock_binaries")
+async def test_filter_files_multiline_mcp(mcp_client):
     """Test multiline support through MCP interface."""
     test_content = "function example() {\n  return 'hello';\n}"
 
@@ -741,8 +621,6 @@ async def test_filter_files_multiline_mcp():
         )
 
         with (
-            patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"),
-            patch.object(mcp_fd_server, "FZF_EXECUTABLE", "/mock/fzf"),
             patch("subprocess.check_output") as mock_fd_output,
             patch("subprocess.Popen") as mock_popen,
         ):
@@ -750,41 +628,37 @@ async def test_filter_files_multiline_mcp():
             mock_fd_output.return_value = "test.js\n"
 
             # Mock fzf finding the function
-            mock_fzf_proc = MagicMock()
-            mock_fzf_proc.communicate.return_value = (
-                b"test.js:\nfunction example() {\n  return 'hello';\n}\x00",
-                b"",
+            mock_popen.return_value = _fake_proc(
+                b"test.js:\nfunction example() {\n  return 'hello';\n}\x00"
             )
-            mock_fzf_proc.returncode = 0  # Success
-            mock_popen.return_value = mock_fzf_proc
 
-            async with client_session(mcp_fd_server.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "filter_files", {"filter": "function", "multiline": True}
-                )
+            result = await mcp_client.call_tool(
+                "filter_files", {"filter": "function", "multiline": True}
+            )
 
-                data = json.loads(result.content[0].text)
-                assert "matches" in data
-                assert len(data["matches"]) > 0
-                assert "function example()" in data["matches"][0]
+            data = _parse(result)
+            assert "matches" in data
+            assert len(data["matches"]) > 0
+            assert "function example()" in data["matches"][0]
 
 
-def test_windows_path_normalization():
-    """Test that Windows paths are properly normalized to forward slashes."""
-    # Test various Windows path formats
-    test_cases = [
+@pytest.mark.parametrize(
+    "windows_path,expected",
+    [
         (r"C:\Users\test\file.py", "C:/Users/test/file.py"),
         (r"D:\Projects\my-app\src\main.py", "D:/Projects/my-app/src/main.py"),
         (r"\\network\share\file.txt", "//network/share/file.txt"),
         (r"C:" + "\\", "C:/"),
         (r"relative\path\file.py", "relative/path/file.py"),
-    ]
-
-    for windows_path, expected in test_cases:
-        result = mcp_fd_server._normalize_path(windows_path)
-        assert result == expected, f"Failed to normalize {windows_path}"
+        ("normal/posix/path.py", "normal/posix/path.py"),
+    ],
+)
+def test_windows_path_normalization(windows_path, expected):
+    """Test that Windows paths are properly normalized to forward slashes."""
+    assert mcp_fd_server._normalize_path(windows_path) == expected
 
 
+@pytest.mark.usefixtures("mock_binaries")
 def test_search_files_windows_path_output():
     """Test that search_files normalizes Windows paths in subprocess output."""
     with patch("subprocess.check_output") as mock_check_output:
@@ -798,22 +672,22 @@ def test_search_files_windows_path_output():
             + "\n"
         )
 
-        with patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"):
-            result = mcp_fd_server.search_files("*.py", ".")
+        result = mcp_fd_server.search_files("*.py", ".")
 
-            assert "matches" in result
-            assert len(result["matches"]) == 3
+        assert "matches" in result
+        assert len(result["matches"]) == 3
 
-            # All paths should be normalized to forward slashes
-            assert result["matches"][0] == "C:/Users/test/file1.py"
-            assert result["matches"][1] == "D:/Projects/app/main.py"
-            assert result["matches"][2] == "//network/share/script.py"
+        # All paths should be normalized to forward slashes
+        assert result["matches"][0] == "C:/Users/test/file1.py"
+        assert result["matches"][1] == "D:/Projects/app/main.py"
+        assert result["matches"][2] == "//network/share/script.py"
 
-            # No backslashes should remain
+    # No backslashes should remain
     for match in result["matches"]:
         assert "\\" not in match
 
 
+@pytest.mark.usefixtures("mock_binaries")
 def test_filter_files_first_overrides_limit_standard_mode():
     """first=True should override limit and return exactly one match in standard mode."""
 
@@ -832,8 +706,6 @@ def test_filter_files_first_overrides_limit_standard_mode():
         return "alpha\nbeta\ngamma\n"
 
     with (
-        patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"),
-        patch.object(mcp_fd_server, "FZF_EXECUTABLE", "/mock/fzf"),
         patch("subprocess.Popen", side_effect=_MockPopen),
         patch("subprocess.check_output", side_effect=fake_check_output),
     ):
@@ -842,6 +714,7 @@ def test_filter_files_first_overrides_limit_standard_mode():
         assert len(res["matches"]) == 1
 
 
+@pytest.mark.usefixtures("mock_binaries")
 def test_filter_files_limit_trims_results_multiline_mode(tmp_path):
     """In multiline mode, limit should trim results when first is not set."""
     # Prepare a couple of files and contents
@@ -874,8 +747,6 @@ def test_filter_files_limit_trims_results_multiline_mode(tmp_path):
             return self._out, b""
 
     with (
-        patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"),
-        patch.object(mcp_fd_server, "FZF_EXECUTABLE", "/mock/fzf"),
         patch("subprocess.check_output", side_effect=fake_fd_output),
         patch("subprocess.Popen", side_effect=_MockFzfProc),
     ):
@@ -884,6 +755,7 @@ def test_filter_files_limit_trims_results_multiline_mode(tmp_path):
         assert len(res["matches"]) == 2
 
 
+@pytest.mark.usefixtures("mock_binaries")
 def test_search_files_limit_uses_fd_max_results_and_trims():
     """search_files should add '-n <limit>' to fd and trim results as a safety."""
     captured_cmds = []
@@ -895,7 +767,6 @@ def test_search_files_limit_uses_fd_max_results_and_trims():
         return "a\nB\nc\n"
 
     with (
-        patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"),
         patch("subprocess.check_output", side_effect=fake_check_output),
     ):
         # With limit=2, ensure '--max-results 2' is present and result trimmed to 2
@@ -911,7 +782,6 @@ def test_search_files_limit_uses_fd_max_results_and_trims():
     # No limit should not include -n
     captured_cmds.clear()
     with (
-        patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"),
         patch("subprocess.check_output", side_effect=fake_check_output),
     ):
         res = mcp_fd_server.search_files(".*", ".", limit=0)
@@ -923,6 +793,7 @@ def test_search_files_limit_uses_fd_max_results_and_trims():
         )
 
 
+@pytest.mark.usefixtures("mock_binaries")
 def test_filter_files_limit_trims_results_standard_mode():
     """filter_files should trim to 'limit' when not using 'first' (standard mode)."""
 
@@ -941,8 +812,6 @@ def test_filter_files_limit_trims_results_standard_mode():
         return "x\ny\nz\n"
 
     with (
-        patch.object(mcp_fd_server, "FD_EXECUTABLE", "/mock/fd"),
-        patch.object(mcp_fd_server, "FZF_EXECUTABLE", "/mock/fzf"),
         patch("subprocess.Popen", side_effect=_MockPopen),
         patch("subprocess.check_output", side_effect=fake_check_output),
     ):
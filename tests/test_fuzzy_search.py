@@ -1,18 +1,26 @@
+import contextlib
+import functools
+import io
 import json
-import os
 import shutil
 import subprocess
 import sys
+import threading
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
-from mcp.shared.memory import (
-    create_connected_server_and_client_session as client_session,
-)
+import pytest_asyncio
 
 import mcp_fuzzy_search
 
+# Use orjson for decoding tool results when it happens to be installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
 
 def normalize_path(path):
     """Normalize path to use forward slashes for cross-platform testing."""
@@ -23,70 +31,192 @@ def normalize_path(path):
 pytestmark = pytest.mark.anyio
 
 
-def _skip_if_missing(binary: str):
-    """Skip test if binary is not available on PATH."""
-    if shutil.which(binary) is None:
-        pytest.skip(f"{binary} not on PATH")
+def _parse(result) -> dict:
+    """Decode the JSON payload of a ``call_tool`` result."""
+    return _json_loads(result.content[0].text)
 
 
-async def test_fuzzy_search_files(tmp_path: Path):
-    """Test fuzzy_search_files with real binaries."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+async def _call(client, tool: str, args: dict) -> dict:
+    """Call *tool* through *client* and return its decoded JSON payload."""
+    return _parse(await client.call_tool(tool, args))
 
-    # Create test files
-    (tmp_path / "main.py").write_text("# main file")
-    (tmp_path / "main_test.py").write_text("# main test")
-    (tmp_path / "utils.py").write_text("# utilities")
-    (tmp_path / "README.md").write_text("# Main documentation")
-
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_files", {"fuzzy_filter": "main", "path": str(tmp_path)}
-        )
 
-        # Parse result
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        assert len(data["matches"]) >= 2  # Should find main.py and main_test.py
-        assert any("main.py" in match for match in data["matches"])
+def _ok(stdout: bytes | str = b"") -> subprocess.CompletedProcess:
+    """Successful ``subprocess.run`` result carrying *stdout*."""
+    return subprocess.CompletedProcess([], 0, stdout=stdout, stderr=b"")
 
 
-async def test_fuzzy_search_files_with_hidden(tmp_path: Path):
-    """Test fuzzy_search_files includes hidden files when requested."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+class _StubPage:
+    """Just the PyMuPDF page methods the PDF tools call, without MagicMock's overhead."""
 
-    # Create test files
-    (tmp_path / ".hidden_config.json").write_text("{}")
-    (tmp_path / "visible_config.json").write_text("{}")
+    __slots__ = ("label", "text")
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Without hidden flag
-        result_no_hidden = await client.call_tool(
-            "fuzzy_search_files", {"fuzzy_filter": "config", "path": str(tmp_path)}
-        )
-        data_no_hidden = json.loads(result_no_hidden.content[0].text)
+    def __init__(self, text: str, label: str):
+        self.text = text
+        self.label = label
 
-        # With hidden flag
-        result_with_hidden = await client.call_tool(
-            "fuzzy_search_files",
-            {"fuzzy_filter": "config", "path": str(tmp_path), "hidden": True},
-        )
-        data_with_hidden = json.loads(result_with_hidden.content[0].text)
+    def get_text(self, *args, **kwargs) -> str:
+        return self.text
 
-        # Assertions
-        assert len(data_with_hidden["matches"]) > len(data_no_hidden["matches"])
-        assert any(".hidden_config" in match for match in data_with_hidden["matches"])
+    def get_label(self) -> str:
+        return self.label
 
 
-async def test_fuzzy_search_content(tmp_path: Path):
-    """Test fuzzy_search_content with ripgrep pattern and fuzzy filter."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+def _make_mock_doc(page_texts, labels=None) -> MagicMock:
+    """
+    Mock PyMuPDF document whose pages return *page_texts* from ``get_text``.
+    Each page's ``get_label`` returns its entry in *labels*, falling back to
+    its 1-based number when no labels are given. Pages are built the first
+    time they are indexed, so tests only pay for the pages the tool reads.
+    """
+    mock_doc = MagicMock()
+    mock_doc.page_count = len(page_texts)
+    mock_doc.get_page_numbers.return_value = []  # No label matches
 
-    # Create test files with content
-    (tmp_path / "todo.py").write_text("""
+    @functools.cache
+    def page(idx):
+        if not 0 <= idx < len(page_texts):
+            return None
+        return _StubPage(page_texts[idx], labels[idx] if labels else str(idx + 1))
+
+    mock_doc.__getitem__ = lambda self, idx: page(idx)
+    return mock_doc
+
+
+# Canned ``fzf`` ``communicate()`` results shared by the mocked tests, built
+# once at import time rather than rebuilt inside every test body.
+_FZF_FILES_MOCK_OUT = (b"src/main.py\nsrc/main_test.py\n", b"")
+_FZF_CONTENT_MOCK_OUT = (
+    "src/app.py:10:    # TODO: implement feature\n"
+    "src/test.py:5:    # TODO: implement tests\n",
+    "",
+)
+_FZF_CONTENT_ONLY_MOCK_OUT = ("src/sync.py:1:async def fetch():\n", "")
+_FZF_FILES_MULTILINE_MOCK_OUT = (
+    b"api.js:\nasync function processData() {\n"
+    b"  const result = await fetch('/api');\n  return result.json();\n}\x00",
+    b"",
+)
+_FZF_CONTENT_MULTILINE_MOCK_OUT = (
+    b"service.js:\nclass DatabaseService {\n  constructor(config) {\n"
+    b"    this.config = config;\n  }\n\n  async connect() {\n"
+    b"    // TODO: implement\n  }\n}\x00",
+    b"",
+)
+
+# A minimal one-page PDF that PyMuPDF can open
+_MINIMAL_PDF_BYTES = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
+
+
+@pytest.fixture(scope="module")
+def mcp_server():
+    """Low-level server behind the shared ``mcp_client`` fixture."""
+    return mcp_fuzzy_search.mcp._mcp_server
+
+
+@pytest.fixture(scope="session")
+def minimal_pdf_path(tmp_path_factory) -> Path:
+    """
+    Write the minimal PDF once for the tests that only open and mock it.
+    Tests must not modify the file; those that need a PDF inside their own
+    search tree still write ``_MINIMAL_PDF_BYTES`` under ``tmp_path``.
+    """
+    path = tmp_path_factory.mktemp("pdf") / "test.pdf"
+    path.write_bytes(_MINIMAL_PDF_BYTES)
+    return path
+
+
+@pytest.fixture
+def fake_run(monkeypatch):
+    """
+    ``subprocess.run`` mock that answers by program name.
+    Tests fill ``fake_run.results`` (e.g. ``results["pandoc"] = _ok(b"...")``);
+    commands for any other program still reach the real ``subprocess.run``,
+    so helpers that shell out to the interpreter keep working.
+    """
+    real_run = subprocess.run
+    results: dict[str, subprocess.CompletedProcess] = {}
+
+    def dispatch(cmd, *args, **kwargs):
+        result = results.get(Path(cmd[0]).stem)
+        return real_run(cmd, *args, **kwargs) if result is None else result
+
+    run = MagicMock(side_effect=dispatch)
+    run.results = results
+    monkeypatch.setattr(subprocess, "run", run)
+    return run
+
+
+@pytest.fixture(autouse=True)
+def fresh_pdf_cache():
+    """Drop documents the PDF tools cached so mocks never leak between tests."""
+    yield
+    mcp_fuzzy_search._pdf_cache.clear()
+
+
+@pytest.fixture
+def mock_rg_fzf(monkeypatch):
+    """
+    Factory wiring mocked rg/fzf processes into ``subprocess``.
+    ``mock_rg_fzf(fzf_out)`` serves a piped rg -> fzf run and returns the
+    Popen mock; with ``rg_files`` it serves the multiline path instead,
+    where rg lists files via ``check_output`` and only fzf is spawned.
+    """
+    monkeypatch.setattr(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg")
+    monkeypatch.setattr(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf")
+
+    def factory(fzf_out, rg_files=None):
+        fzf_proc = MagicMock(returncode=0)
+        fzf_proc.communicate.return_value = fzf_out
+        if rg_files is None:
+            rg_proc = MagicMock(returncode=0)
+            rg_proc.wait.return_value = 0
+            rg_proc.stderr.read.return_value = b""
+            popen = MagicMock(side_effect=[rg_proc, fzf_proc])
+        else:
+            monkeypatch.setattr(
+                subprocess, "check_output", MagicMock(return_value=rg_files)
+            )
+            popen = MagicMock(return_value=fzf_proc)
+        monkeypatch.setattr(subprocess, "Popen", popen)
+        return popen
+
+    return factory
+
+
+@pytest_asyncio.fixture(scope="module")
+async def tool_meta(mcp_client):
+    """Tool descriptors keyed by name, listed once per module."""
+    result = await mcp_client.list_tools()
+    return {tool.name: tool for tool in result.tools}
+
+
+@pytest.fixture(scope="session")
+def binaries():
+    """Resolve the external tools once per session instead of once per test."""
+    return {name: shutil.which(name) for name in ("rg", "fzf", "rga")}
+
+
+def _skip_if_missing(binaries: dict, binary: str):
+    """Skip test if binary is not available on PATH."""
+    if binaries[binary] is None:
+        pytest.skip(f"{binary} not on PATH")
+
+
+# Read-only corpora shared by the real-binary search tests, one subdir each
+_CORPUS = {
+    "files": {
+        "main.py": "# main file",
+        "main_test.py": "# main test",
+        "utils.py": "# utilities",
+        "README.md": "# Main documentation",
+    },
+    "hidden": {
+        ".hidden_config.json": "{}",
+        "visible_config.json": "{}",
+    },
+    "todos": {
+        "todo.py": """
 # TODO: implement user authentication
 def login():
     pass
@@ -94,115 +224,187 @@ def login():
 # TODO: add error handling
 def process():
     pass
-""")
-    (tmp_path / "main.py").write_text("""
+""",
+        "main.py": """
 # TODO: complete main function implementation
 def main():
     pass
-""")
+""",
+    },
+    "mixed": {
+        "mixed.py": """
+def function():
+    print("hello")
+    # This is a comment
+    return True
+""",
+    },
+}
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "TODO implement",
-                "path": str(tmp_path),
-            },
-        )
+# Twenty matching lines for the limit test; deterministic, so built once
+_TODO_20 = "\n".join(f"# TODO: task {i}" for i in range(20))
 
-        # Parse result
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        assert len(data["matches"]) >= 2  # Should find both "implement" TODOs
 
-        # Check structure of matches
-        for match in data["matches"]:
-            assert "file" in match
-            assert "line" in match
-            assert "content" in match
-            assert "implement" in match["content"].lower()
+def _mkfiles(root: Path, files: dict[str, str]) -> None:
+    """Write each ``name: text`` pair under *root*."""
+    for name, data in files.items():
+        (root / name).write_text(data)
 
 
-async def test_fuzzy_search_content_with_limit(tmp_path: Path):
-    """Test fuzzy_search_content respects limit parameter."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory) -> dict[str, Path]:
+    """Write every ``_CORPUS`` subdir once and map its name to its path."""
+    root = tmp_path_factory.mktemp("fuzzy")
+    dirs = {}
+    for name, files in _CORPUS.items():
+        subdir = root / name
+        subdir.mkdir()
+        _mkfiles(subdir, files)
+        dirs[name] = subdir
+    return dirs
 
-    # Create many matching lines
-    content = "\n".join([f"# TODO: task {i}" for i in range(20)])
-    (tmp_path / "tasks.py").write_text(content)
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "TODO task",
-                "path": str(tmp_path),
-                "limit": 5,
-            },
-        )
+async def test_fuzzy_search_files(corpus: dict[str, Path], mcp_client, binaries):
+    """Test fuzzy_search_files with real binaries."""
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
-        data = json.loads(result.content[0].text)
-        assert len(data["matches"]) <= 5
+    result = await mcp_client.call_tool(
+        "fuzzy_search_files", {"fuzzy_filter": "main", "path": str(corpus["files"])}
+    )
 
+    # Parse result
+    data = _parse(result)
+    assert "matches" in data
+    assert len(data["matches"]) >= 2  # Should find main.py and main_test.py
+    assert any("main.py" in match for match in data["matches"])
 
-async def test_fuzzy_search_content_default_pattern(tmp_path: Path):
-    """Test fuzzy_search_content uses default pattern '.' (all lines)."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
 
-    # Create test file with various content
-    (tmp_path / "mixed.py").write_text("""
-def function():
-    print("hello")
-    # This is a comment
-    return True
-""")
+async def test_fuzzy_search_files_with_hidden(
+    corpus: dict[str, Path], mcp_client, binaries
+):
+    """Test fuzzy_search_files includes hidden files when requested."""
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_content",
-            {"fuzzy_filter": "function", "path": str(tmp_path)},  # No pattern specified
-        )
+    # Without hidden flag
+    result_no_hidden = await mcp_client.call_tool(
+        "fuzzy_search_files", {"fuzzy_filter": "config", "path": str(corpus["hidden"])}
+    )
+    data_no_hidden = _parse(result_no_hidden)
+
+    # With hidden flag
+    result_with_hidden = await mcp_client.call_tool(
+        "fuzzy_search_files",
+        {"fuzzy_filter": "config", "path": str(corpus["hidden"]), "hidden": True},
+    )
+    data_with_hidden = _parse(result_with_hidden)
+
+    # Assertions
+    assert len(data_with_hidden["matches"]) > len(data_no_hidden["matches"])
+    assert any(".hidden_config" in match for match in data_with_hidden["matches"])
+
+
+async def test_fuzzy_search_content(corpus: dict[str, Path], mcp_client, binaries):
+    """Test fuzzy_search_content with ripgrep pattern and fuzzy filter."""
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
+
+    result = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "TODO implement",
+            "path": str(corpus["todos"]),
+        },
+    )
+
+    # Parse result
+    data = _parse(result)
+    assert "matches" in data
+    assert len(data["matches"]) >= 2  # Should find both "implement" TODOs
+
+    # Check structure of matches
+    for match in data["matches"]:
+        assert "file" in match
+        assert "line" in match
+        assert "content" in match
+        assert "implement" in match["content"].lower()
+
+
+async def test_fuzzy_search_content_with_limit(tmp_path: Path, mcp_client, binaries):
+    """Test fuzzy_search_content respects limit parameter."""
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
+
+    # Create many matching lines
+    (tmp_path / "tasks.py").write_text(_TODO_20)
+
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "TODO task",
+            "path": str(tmp_path),
+            "limit": 5,
+        },
+    )
+    assert len(data["matches"]) <= 5
 
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        assert len(data["matches"]) >= 1
-        assert any("function" in match["content"] for match in data["matches"])
 
+async def test_fuzzy_search_content_default_pattern(
+    corpus: dict[str, Path], mcp_client, binaries
+):
+    """Test fuzzy_search_content uses default pattern '.' (all lines)."""
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
+
+    # No pattern specified
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {"fuzzy_filter": "function", "path": str(corpus["mixed"])},
+    )
+    assert "matches" in data
+    assert len(data["matches"]) >= 1
+    assert any("function" in match["content"] for match in data["matches"])
 
-async def test_fuzzy_search_content_with_hidden(tmp_path: Path):
+
+async def test_fuzzy_search_content_with_hidden(tmp_path: Path, mcp_client, binaries):
     """Test fuzzy_search_content searches hidden files when requested."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Create hidden and visible files
-    (tmp_path / ".env").write_text("SECRET_KEY=hidden_value")
-    (tmp_path / "config.py").write_text("SECRET_KEY=visible_value")
+    _mkfiles(
+        tmp_path,
+        {
+            ".env": "SECRET_KEY=hidden_value",
+            "config.py": "SECRET_KEY=visible_value",
+        },
+    )
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Without hidden flag
-        result_no_hidden = await client.call_tool(
-            "fuzzy_search_content",
-            {"fuzzy_filter": "SECRET", "path": str(tmp_path)},
-        )
-        data_no_hidden = json.loads(result_no_hidden.content[0].text)
+    # Without hidden flag
+    result_no_hidden = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {"fuzzy_filter": "SECRET", "path": str(tmp_path)},
+    )
+    data_no_hidden = _parse(result_no_hidden)
 
-        # With hidden flag
-        result_with_hidden = await client.call_tool(
-            "fuzzy_search_content",
-            {"fuzzy_filter": "SECRET", "path": str(tmp_path), "hidden": True},
-        )
-        data_with_hidden = json.loads(result_with_hidden.content[0].text)
+    # With hidden flag
+    result_with_hidden = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {"fuzzy_filter": "SECRET", "path": str(tmp_path), "hidden": True},
+    )
+    data_with_hidden = _parse(result_with_hidden)
 
-        # Should find more matches with hidden files
-        assert len(data_with_hidden["matches"]) >= len(data_no_hidden["matches"])
+    # Should find more matches with hidden files
+    assert len(data_with_hidden["matches"]) >= len(data_no_hidden["matches"])
 
 
-async def test_fuzzy_search_content_with_rg_flags(tmp_path: Path):
+async def test_fuzzy_search_content_with_rg_flags(tmp_path: Path, binaries):
     """Test fuzzy_search_content passes extra flags to ripgrep."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
 
 # Regex warning test removed - warnings not implemented in PyMuPDF version
@@ -217,213 +419,284 @@ async def test_fuzzy_search_content_with_rg_flags(tmp_path: Path):
 # Helper functions test removed - these functions don't exist in PyMuPDF implementation
 
 
-async def test_fuzzy_search_content_case_sensitive(tmp_path: Path):
+async def test_fuzzy_search_content_case_sensitive(
+    tmp_path: Path, mcp_client, binaries
+):
     """Test fuzzy_search_content with case-sensitive matching."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Create test file with case-sensitive content
     (tmp_path / "case.py").write_text("ERROR: something failed\nerror: minor issue")
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "error",
-                "path": str(tmp_path),
-                "rg_flags": "-i",  # Case insensitive
-            },
-        )
-
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        # Should find both ERROR and error with -i flag
-        assert len(data["matches"]) >= 2
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "error",
+            "path": str(tmp_path),
+            "rg_flags": "-i",  # Case insensitive
+        },
+    )
+    assert "matches" in data
+    # Should find both ERROR and error with -i flag
+    assert len(data["matches"]) >= 2
 
 
-async def test_fuzzy_search_content_default_vs_content_only(tmp_path: Path):
+async def test_fuzzy_search_content_default_vs_content_only(
+    tmp_path: Path, mcp_client, binaries
+):
     """Test the difference between default and content-only modes."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Create test files with names that might interfere with content search
-    (tmp_path / "test.py").write_text("def update():\n    pass")
-    (tmp_path / "update.py").write_text("def check():\n    pass")
-    (tmp_path / "other.py").write_text("# update comment here\ndef other():\n    pass")
+    _mkfiles(
+        tmp_path,
+        {
+            "test.py": "def update():\n    pass",
+            "update.py": "def check():\n    pass",
+            "other.py": "# update comment here\ndef other():\n    pass",
+        },
+    )
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Test 1: Default mode - search for "update" which should match both filename and content
-        result_default = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "update",  # Should match update.py filename AND update() content
-                "path": str(tmp_path),
-            },
-        )
-        data_default = json.loads(result_default.content[0].text)
+    # Test 1: Default mode - search for "update" which should match both filename and content
+    result_default = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "update",  # Should match update.py filename AND update() content
+            "path": str(tmp_path),
+        },
+    )
+    data_default = _parse(result_default)
 
-        # Test 2: Content-only mode - same search but content-only
-        result_content_only = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "update",  # Should only match update() content, not filename
-                "path": str(tmp_path),
-                "content_only": True,
-            },
-        )
-        data_content_only = json.loads(result_content_only.content[0].text)
+    # Test 2: Content-only mode - same search but content-only
+    result_content_only = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "update",  # Should only match update() content, not filename
+            "path": str(tmp_path),
+            "content_only": True,
+        },
+    )
+    data_content_only = _parse(result_content_only)
 
-        # Both modes should find at least the content matches
-        assert (
-            len(data_default["matches"]) >= 2
-        )  # At least test.py and other.py content
-        assert len(data_content_only["matches"]) >= 2  # Same content matches
-
-        # Default mode might find more matches (including path matches)
-        # Content-only mode should find fewer or equal matches
-        assert len(data_default["matches"]) >= len(data_content_only["matches"])
-
-        # Both should find the content matches for "update"
-        default_content_matches = [
-            match
-            for match in data_default["matches"]
-            if "update" in match["content"].lower()
-        ]
-        content_only_matches = [
-            match
-            for match in data_content_only["matches"]
-            if "update" in match["content"].lower()
-        ]
+    # Both modes should find at least the content matches
+    assert len(data_default["matches"]) >= 2  # At least test.py and other.py content
+    assert len(data_content_only["matches"]) >= 2  # Same content matches
+
+    # Default mode might find more matches (including path matches)
+    # Content-only mode should find fewer or equal matches
+    assert len(data_default["matches"]) >= len(data_content_only["matches"])
+
+    # Both should find the content matches for "update"
+    default_content_matches = [
+        match
+        for match in data_default["matches"]
+        if "update" in match["content"].lower()
+    ]
+    content_only_matches = [
+        match
+        for match in data_content_only["matches"]
+        if "update" in match["content"].lower()
+    ]
 
-        # Should find the same content matches (at least the ones with "update" in content)
-        assert len(default_content_matches) >= 2  # test.py and other.py
-        assert len(content_only_matches) >= 2  # test.py and other.py
+    # Should find the same content matches (at least the ones with "update" in content)
+    assert len(default_content_matches) >= 2  # test.py and other.py
+    assert len(content_only_matches) >= 2  # test.py and other.py
 
-        # Verify files are found
-        default_files = [match["file"] for match in default_content_matches]
-        content_files = [match["file"] for match in content_only_matches]
+    # Verify files are found
+    default_files = [match["file"] for match in default_content_matches]
+    content_files = [match["file"] for match in content_only_matches]
 
-        assert any("test.py" in f for f in default_files)
-        assert any("other.py" in f for f in default_files)
-        assert any("test.py" in f for f in content_files)
-        assert any("other.py" in f for f in content_files)
+    assert any("test.py" in f for f in default_files)
+    assert any("other.py" in f for f in default_files)
+    assert any("test.py" in f for f in content_files)
+    assert any("other.py" in f for f in content_files)
 
 
-async def test_fuzzy_search_content_only_mode(tmp_path: Path):
+async def test_fuzzy_search_content_only_mode(tmp_path: Path, mcp_client, binaries):
     """Test content-only mode ignores file paths in matching."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Create files where filenames might match but content doesn't
-    (tmp_path / "async.py").write_text("def sync_function():\n    return 42")
-    (tmp_path / "sync.py").write_text("async def fetch_data():\n    return await api()")
-    (tmp_path / "main.py").write_text("# No word here\ndef main():\n    pass")
+    _mkfiles(
+        tmp_path,
+        {
+            "async.py": "def sync_function():\n    return 42",
+            "sync.py": "async def fetch_data():\n    return await api()",
+            "main.py": "# No word here\ndef main():\n    pass",
+        },
+    )
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Search for "async" with content-only mode
-        result = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "async",
-                "path": str(tmp_path),
-                "content_only": True,
-            },
-        )
+    # Search for "async" with content-only mode
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "async",
+            "path": str(tmp_path),
+            "content_only": True,
+        },
+    )
+    assert "matches" in data
 
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
+    # Should only find the file with "async" in content, not in filename
+    assert len(data["matches"]) == 1
+    assert data["matches"][0]["file"].endswith("sync.py")
+    assert "async def" in data["matches"][0]["content"]
 
-        # Should only find the file with "async" in content, not in filename
-        assert len(data["matches"]) == 1
-        assert data["matches"][0]["file"].endswith("sync.py")
-        assert "async def" in data["matches"][0]["content"]
 
+async def test_error_handling(mcp_client):
+    """Test error handling for a missing fuzzy_filter argument."""
+    with patch("subprocess.Popen") as mock_popen:
+        result = await mcp_client.call_tool("fuzzy_search_files", {"fuzzy_filter": ""})
+    mock_popen.assert_not_called()
+    data = _parse(result)
+    assert "error" in data
+    assert "'fuzzy_filter' argument is required" in data["error"]
 
-async def test_error_handling():
-    """Test error handling for missing arguments."""
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Missing filter for fuzzy_search_files
-        result = await client.call_tool("fuzzy_search_files", {"fuzzy_filter": ""})
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "'fuzzy_filter' argument is required" in data["error"]
 
-        # Missing filter for fuzzy_search_content
-        result = await client.call_tool("fuzzy_search_content", {"fuzzy_filter": ""})
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "'fuzzy_filter' argument is required" in data["error"]
+@pytest.mark.parametrize("query", ["", "  \t"])
+def test_fuzzy_search_empty_filter_skips_fzf(query):
+    """A blank filter returns rg's first lines as-is and never starts fzf."""
+    rg_out = b"a.py:1:one\nb.py:2:two\nc.py:3:three\n"
+    rg_proc = MagicMock(stdout=io.BytesIO(rg_out), returncode=-9)
+    rg_proc.poll.return_value = None  # still running when we have enough
 
+    with (
+        patch("subprocess.Popen", return_value=rg_proc) as mock_popen,
+        patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg"),
+        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
+    ):
+        result = mcp_fuzzy_search.fuzzy_search_content(query, ".", limit=2)
 
-async def test_list_tools():
-    """Test that tools are properly exposed."""
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.list_tools()
+    assert result == {
+        "matches": [
+            {"file": "a.py", "line": 1, "content": "one"},
+            {"file": "b.py", "line": 2, "content": "two"},
+        ]
+    }
+    assert mock_popen.call_count == 1  # rg only, no fzf
+    rg_proc.kill.assert_called_once()
 
-        assert len(result.tools) == 7
 
-        # Find tools by name
-        files_tool = next(t for t in result.tools if t.name == "fuzzy_search_files")
-        content_tool = next(t for t in result.tools if t.name == "fuzzy_search_content")
-        documents_tool = next(
-            t for t in result.tools if t.name == "fuzzy_search_documents"
-        )
-        pdf_tool = next(t for t in result.tools if t.name == "extract_pdf_pages")
-        labels_tool = next(t for t in result.tools if t.name == "get_pdf_page_labels")
-        count_tool = next(t for t in result.tools if t.name == "get_pdf_page_count")
-        outline_tool = next(t for t in result.tools if t.name == "get_pdf_outline")
+@pytest.mark.parametrize("query", ["", "  \t"])
+def test_fuzzy_search_documents_empty_filter_skips_fzf(query):
+    """A blank filter lists rga's first matches for every line, without fzf."""
+    records = b"".join(
+        json.dumps(
+            {
+                "type": "match",
+                "data": {
+                    "path": {"text": f"doc{i}.txt"},
+                    "lines": {"text": f"line {i}\n"},
+                    "line_number": 1,
+                    "submatches": [],
+                },
+            },
+            separators=(",", ":"),
+        ).encode()
+        + b"\n"
+        for i in range(5)
+    )
+    rga_proc = MagicMock(stdout=io.BytesIO(records))
 
-        # Verify metadata for original tools
-        assert files_tool.description and "fuzzy matching" in files_tool.description
-        assert "fuzzy_filter" in files_tool.inputSchema["required"]
+    with (
+        patch("subprocess.Popen", return_value=rga_proc) as mock_popen,
+        patch.object(mcp_fuzzy_search, "RGA_EXECUTABLE", "/mock/rga"),
+        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
+    ):
+        result = mcp_fuzzy_search.fuzzy_search_documents(query, ".", limit=3)
 
-        # Verify outline tool
-        assert (
-            outline_tool.description and "table of contents" in outline_tool.description
-        )
-        assert "file" in outline_tool.inputSchema["required"]
+    assert [m["file"] for m in result["matches"]] == [
+        "doc0.txt",
+        "doc1.txt",
+        "doc2.txt",
+    ]
+    assert mock_popen.call_count == 1  # rga only, no fzf
+    rga_cmd = mock_popen.call_args[0][0]
+    assert rga_cmd[-2] == ""  # the empty pattern matches every line
 
-        assert (
-            content_tool.description
-            and "Search file contents using fuzzy filtering" in content_tool.description
-        )
-        assert "fuzzy_filter" in content_tool.inputSchema["required"]
 
-        # Verify metadata for PDF tools
-        assert documents_tool.description and "PDFs" in documents_tool.description
-        assert "fuzzy_filter" in documents_tool.inputSchema["required"]
+async def test_list_tools(tool_meta):
+    """Test that tools are properly exposed."""
+    assert len(tool_meta) == 8
+
+    # Find tools by name
+    files_tool = tool_meta["fuzzy_search_files"]
+    content_tool = tool_meta["fuzzy_search_content"]
+    documents_tool = tool_meta["fuzzy_search_documents"]
+    pdf_tool = tool_meta["extract_pdf_pages"]
+    labels_tool = tool_meta["get_pdf_page_labels"]
+    count_tool = tool_meta["get_pdf_page_count"]
+    outline_tool = tool_meta["get_pdf_outline"]
+
+    # Verify metadata for original tools
+    assert files_tool.description and "fuzzy matching" in files_tool.description
+    assert "fuzzy_filter" in files_tool.inputSchema["required"]
+
+    # Verify outline tool
+    assert outline_tool.description and "table of contents" in outline_tool.description
+    assert "file" in outline_tool.inputSchema["required"]
+
+    assert (
+        content_tool.description
+        and "Search file contents using fuzzy filtering" in content_tool.description
+    )
+    assert "fuzzy_filter" in content_tool.inputSchema["required"]
+
+    batch_tool = tool_meta["fuzzy_search_content_batch"]
+    assert batch_tool.description and "ONE ripgrep scan" in batch_tool.description
+    assert batch_tool.inputSchema["required"] == ["fuzzy_filters"]
 
-        assert pdf_tool.description and "Extract specific pages" in pdf_tool.description
-        assert "file" in pdf_tool.inputSchema["required"]
-        assert "pages" in pdf_tool.inputSchema["required"]
+    # Verify metadata for PDF tools
+    assert documents_tool.description and "PDFs" in documents_tool.description
+    assert "fuzzy_filter" in documents_tool.inputSchema["required"]
 
-        # Verify metadata for new PDF info tools
-        assert labels_tool.description and "page labels" in labels_tool.description
-        assert "file" in labels_tool.inputSchema["required"]
+    assert pdf_tool.description and "Extract specific pages" in pdf_tool.description
+    assert "file" in pdf_tool.inputSchema["required"]
+    assert "pages" in pdf_tool.inputSchema["required"]
 
-        assert (
-            count_tool.description and "total number of pages" in count_tool.description
-        )
-        assert "file" in count_tool.inputSchema["required"]
+    # Verify metadata for new PDF info tools
+    assert labels_tool.description and "page labels" in labels_tool.description
+    assert "file" in labels_tool.inputSchema["required"]
+
+    assert count_tool.description and "total number of pages" in count_tool.description
+    assert "file" in count_tool.inputSchema["required"]
+
+
+def _run_cli(*argv: str) -> tuple[str, int]:
+    """Run the CLI in-process, returning its stdout and exit code."""
+    buf = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buf):
+            rc = mcp_fuzzy_search._cli(list(argv))
+    except SystemExit as exc:
+        rc = exc.code
+    except RuntimeError as exc:
+        if "not found" not in str(exc):
+            raise
+        pytest.skip(str(exc))
+    return buf.getvalue(), rc
 
 
 def test_cli_search_files(tmp_path: Path):
     """Test CLI search-files subcommand."""
     # Create test files
-    (tmp_path / "main.py").write_text("# main")
-    (tmp_path / "test_main.py").write_text("# test")
-
-    result = subprocess.run(
-        [sys.executable, "mcp_fuzzy_search.py", "search-files", "main", str(tmp_path)],
-        capture_output=True,
-        text=True,
+    _mkfiles(
+        tmp_path,
+        {
+            "main.py": "# main",
+            "test_main.py": "# test",
+        },
     )
 
-    if "Cannot find the" in result.stderr:
-        pytest.skip("Required binaries not available")
+    stdout, rc = _run_cli("search-files", "main", str(tmp_path))
 
-    assert result.returncode == 0
-    output = json.loads(result.stdout)
+    assert rc == 0
+    output = json.loads(stdout)
     assert "matches" in output
 
 
@@ -432,36 +705,50 @@ def test_cli_search_content(tmp_path: Path):
     # Create test file
     (tmp_path / "app.py").write_text("# TODO: implement feature\n# TODO: fix bug")
 
-    result = subprocess.run(
-        [
-            sys.executable,
-            "mcp_fuzzy_search.py",
-            "search-content",
-            "TODO implement",
-            str(tmp_path),
-        ],
-        capture_output=True,
-        text=True,
-    )
-
-    if "Cannot find the" in result.stderr:
-        pytest.skip("Required binaries not available")
+    stdout, rc = _run_cli("search-content", "TODO implement", str(tmp_path))
 
-    assert result.returncode == 0
-    output = json.loads(result.stdout)
+    assert rc == 0
+    output = json.loads(stdout)
     assert "matches" in output
 
 
 def test_cli_help():
     """Test CLI help output."""
+    stdout, rc = _run_cli("-h")
+
+    assert rc == 0
+    assert "Fuzzy search with ripgrep + fzf" in stdout
+    assert "search-files" in stdout
+    assert "search-content" in stdout
+
+
+@pytest.mark.slow
+def test_cli_help_subprocess():
+    """Smoke-test the script entry point in a real interpreter."""
     result = subprocess.run(
         [sys.executable, "mcp_fuzzy_search.py", "-h"], capture_output=True, text=True
     )
 
     assert result.returncode == 0
     assert "Fuzzy search with ripgrep + fzf" in result.stdout
-    assert "search-files" in result.stdout
-    assert "search-content" in result.stdout
+
+
+@pytest.mark.slow
+def test_import_defers_pymupdf():
+    """Importing the server leaves PyMuPDF unloaded until a PDF is opened."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, mcp_fuzzy_search; print('fitz' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        cwd=Path(mcp_fuzzy_search.__file__).parent,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
 
 
 def test_cli_content_only_flag():
@@ -470,11 +757,7 @@ def test_cli_content_only_flag():
     with patch("mcp_fuzzy_search.fuzzy_search_content") as mock_search:
         mock_search.return_value = {"matches": []}
 
-        with patch(
-            "sys.argv",
-            ["mcp_fuzzy_search.py", "search-content", "test", ".", "--content-only"],
-        ):
-            mcp_fuzzy_search._cli()
+        _run_cli("search-content", "test", ".", "--content-only")
 
         # Verify content_only=True was passed
         mock_search.assert_called_once()
@@ -513,161 +796,219 @@ def test_binary_discovery():
         assert rg_path is None
 
 
-@patch("subprocess.Popen")
-async def test_fuzzy_search_files_mocked(mock_popen):
+async def test_fuzzy_search_files_mocked(mock_rg_fzf, mcp_client):
     """Test fuzzy_search_files with mocked subprocess."""
-    # Mock ripgrep process
-    rg_proc = MagicMock()
-    rg_proc.stdout = MagicMock()
-    rg_proc.wait.return_value = 0
+    mock_rg_fzf(_FZF_FILES_MOCK_OUT)
 
-    # Mock fzf process
-    fzf_proc = MagicMock()
-    fzf_proc.communicate.return_value = ("src/main.py\nsrc/main_test.py\n", "")
-    fzf_proc.returncode = 0
+    data = await _call(
+        mcp_client, "fuzzy_search_files", {"fuzzy_filter": "main", "path": "."}
+    )
+    assert data["matches"] == ["src/main.py", "src/main_test.py"]
 
-    mock_popen.side_effect = [rg_proc, fzf_proc]
 
-    with (
-        patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg"),
-        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
-    ):
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_files", {"fuzzy_filter": "main", "path": "."}
-            )
+async def test_fuzzy_search_content_mocked(mock_rg_fzf, mcp_client):
+    """Test fuzzy_search_content with mocked subprocess."""
+    mock_popen = mock_rg_fzf(_FZF_CONTENT_MOCK_OUT)
+
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {"fuzzy_filter": "TODO implement", "path": "."},
+    )
+    assert len(data["matches"]) == 2
+    assert data["matches"][0]["file"] == "src/app.py"
+    assert data["matches"][0]["line"] == 10
+    assert "implement feature" in data["matches"][0]["content"]
 
-            data = json.loads(result.content[0].text)
-            assert data["matches"] == ["src/main.py", "src/main_test.py"]
+    # Verify fzf was called with --nth=1,3.. by default
+    fzf_call_args = mock_popen.call_args_list[1][0][0]
+    assert "--nth=1,3.." in fzf_call_args
 
 
-@patch("subprocess.Popen")
-async def test_fuzzy_search_content_mocked(mock_popen):
-    """Test fuzzy_search_content with mocked subprocess."""
-    # Mock ripgrep process
-    rg_proc = MagicMock()
-    rg_proc.stdout = MagicMock()
-    rg_proc.stderr = MagicMock()
-    rg_proc.stderr.read.return_value = b""
-    rg_proc.wait.return_value = 0
-    rg_proc.returncode = 0
-
-    # Mock fzf process with properly formatted output
-    fzf_proc = MagicMock()
-    fzf_proc.communicate.return_value = (
-        "src/app.py:10:    # TODO: implement feature\n"
-        "src/test.py:5:    # TODO: implement tests\n",
-        "",
+async def test_fuzzy_search_content_mocked_content_only(mock_rg_fzf, mcp_client):
+    """Test fuzzy_search_content with content_only mode."""
+    mock_popen = mock_rg_fzf(_FZF_CONTENT_ONLY_MOCK_OUT)
+
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {"fuzzy_filter": "async", "path": ".", "content_only": True},
+    )
+    assert len(data["matches"]) == 1
+
+    # Verify fzf was called with --nth=3.. for content-only mode
+    fzf_call_args = mock_popen.call_args_list[1][0][0]
+    assert "--nth=3.." in fzf_call_args
+
+
+@pytest.mark.parametrize(
+    "line,expected",
+    [
+        ("src/app.py:10:x = {'a': 1}", ("src/app.py", 10, "x = {'a': 1}")),
+        ("C:\\src\\app.py:7:  pass", ("C:\\src\\app.py", 7, "pass")),
+        ("C:/src/app.py:3:TODO: fix", ("C:/src/app.py", 3, "TODO: fix")),
+        ("a:12:short name", ("a", 12, "short name")),
+        ("src/app.py-11-context line", None),
+    ],
+    ids=["posix", "drive-backslash", "drive-slash", "one-letter-file", "context"],
+)
+async def test_fuzzy_search_content_parses_rg_lines(
+    line, expected, mock_rg_fzf, mcp_client
+):
+    """file:line:content records parse with Windows drive letters kept intact."""
+    mock_rg_fzf((line + "\n", ""))
+
+    result = await mcp_client.call_tool(
+        "fuzzy_search_content", {"fuzzy_filter": "x", "path": "."}
     )
-    fzf_proc.returncode = 0
 
-    mock_popen.side_effect = [rg_proc, fzf_proc]
+    matches = [(m["file"], m["line"], m["content"]) for m in _parse(result)["matches"]]
+    assert matches == ([expected] if expected else [])
 
-    with (
-        patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg"),
-        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
-    ):
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_content",
-                {"fuzzy_filter": "TODO implement", "path": "."},
-            )
 
-            data = json.loads(result.content[0].text)
-            assert len(data["matches"]) == 2
-            assert data["matches"][0]["file"] == "src/app.py"
-            assert data["matches"][0]["line"] == 10
-            assert "implement feature" in data["matches"][0]["content"]
+async def test_fuzzy_search_content_mocked_limit(mock_rg_fzf, mcp_client):
+    """Only the top ``limit`` fzf lines are parsed into matches."""
+    mock_rg_fzf(_FZF_CONTENT_MOCK_OUT)
+
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {"fuzzy_filter": "TODO implement", "path": ".", "limit": 1},
+    )
+    assert [m["file"] for m in data["matches"]] == ["src/app.py"]
+
+
+async def test_fuzzy_search_content_batch(mcp_client, monkeypatch):
+    """One rg scan feeds every query; each non-blank query gets its own fzf pass."""
+    monkeypatch.setattr(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg")
+    monkeypatch.setattr(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf")
+    rg_out = b"src/app.py:10:# TODO: implement feature\nsrc/db.py:3:def connect():\n"
+    rg_proc = MagicMock(returncode=0)
+    rg_proc.communicate.return_value = (rg_out, b"")
+    hit = MagicMock(returncode=0)
+    hit.communicate.return_value = (b"src/db.py:3:def connect():\n", b"")
+    miss = MagicMock(returncode=mcp_fuzzy_search.FZF_EXIT_NO_MATCH)
+    miss.communicate.return_value = (b"", b"")
+    popen = MagicMock(side_effect=[rg_proc, hit, miss])
+    monkeypatch.setattr(subprocess, "Popen", popen)
+
+    result = await mcp_client.call_tool(
+        "fuzzy_search_content_batch",
+        {"fuzzy_filters": ["connect", "nothing", " "], "path": "."},
+    )
 
-            # Verify fzf was called with --nth=1,3.. by default
-            fzf_call_args = mock_popen.call_args_list[1][0][0]
-            assert "--nth=1,3.." in fzf_call_args
+    assert _parse(result)["results"] == [
+        {
+            "fuzzy_filter": "connect",
+            "matches": [{"file": "src/db.py", "line": 3, "content": "def connect():"}],
+        },
+        {"fuzzy_filter": "nothing", "matches": []},
+        {
+            # A blank query passes rg's lines straight through
+            "fuzzy_filter": " ",
+            "matches": [
+                {
+                    "file": "src/app.py",
+                    "line": 10,
+                    "content": "# TODO: implement feature",
+                },
+                {"file": "src/db.py", "line": 3, "content": "def connect():"},
+            ],
+        },
+    ]
+    assert popen.call_count == 3  # one rg + one fzf per non-blank query
+    assert hit.communicate.call_args[0][0] == rg_out
+    assert miss.communicate.call_args[0][0] == rg_out
 
 
-@patch("subprocess.Popen")
-async def test_fuzzy_search_content_mocked_content_only(mock_popen):
-    """Test fuzzy_search_content with content_only mode."""
-    # Mock ripgrep process
-    rg_proc = MagicMock()
-    rg_proc.stdout = MagicMock()
-    rg_proc.stderr = MagicMock()
-    rg_proc.stderr.read.return_value = b""
-    rg_proc.wait.return_value = 0
-    rg_proc.returncode = 0
-
-    # Mock fzf process
-    fzf_proc = MagicMock()
-    fzf_proc.communicate.return_value = (
-        "src/sync.py:1:async def fetch():\n",
-        "",
+@pytest.mark.parametrize(
+    "tool,fzf_out",
+    [
+        ("fuzzy_search_files", _FZF_FILES_MOCK_OUT),
+        ("fuzzy_search_content", _FZF_CONTENT_MOCK_OUT),
+    ],
+)
+async def test_file_types_forwarded_to_rg(tool, fzf_out, mock_rg_fzf, mcp_client):
+    """file_types becomes one rg --type flag per comma-separated entry."""
+    mock_popen = mock_rg_fzf(fzf_out)
+
+    result = await mcp_client.call_tool(
+        tool, {"fuzzy_filter": "main", "path": ".", "file_types": "py, rust"}
     )
-    fzf_proc.returncode = 0
 
-    mock_popen.side_effect = [rg_proc, fzf_proc]
+    assert len(_parse(result)["matches"]) == 2
+
+    rg_call_args = mock_popen.call_args_list[0][0][0]
+    assert "--type=py" in rg_call_args
+    assert "--type=rust" in rg_call_args
 
-    with (
-        patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg"),
-        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
-    ):
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_content",
-                {"fuzzy_filter": "async", "path": ".", "content_only": True},
-            )
 
-            data = json.loads(result.content[0].text)
-            assert len(data["matches"]) == 1
+@pytest.mark.parametrize(
+    "rg_flags,expected",
+    [
+        ("", "--max-columns=2048"),
+        ("-M 100", "100"),
+        ("-M100", "-M100"),
+        ("--max-columns 300", "300"),
+        ("--max-columns=500", "--max-columns=500"),
+        ("--max-columns-preview", "--max-columns=2048"),
+    ],
+)
+async def test_fuzzy_search_content_max_columns(
+    rg_flags, expected, mock_rg_fzf, mcp_client
+):
+    """rg gets a default --max-columns cap unless rg_flags already sets one."""
+    mock_popen = mock_rg_fzf(_FZF_CONTENT_MOCK_OUT)
+
+    await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {"fuzzy_filter": "TODO", "path": ".", "rg_flags": rg_flags},
+    )
 
-            # Verify fzf was called with --nth=3.. for content-only mode
-            fzf_call_args = mock_popen.call_args_list[1][0][0]
-            assert "--nth=3.." in fzf_call_args
+    rg_call_args = mock_popen.call_args_list[0][0][0]
+    assert expected in rg_call_args
+    caps = [
+        a
+        for a in rg_call_args
+        if a == "--max-columns" or a.startswith(("-M", "--max-columns="))
+    ]
+    assert len(caps) == 1
 
 
 # Multiline support tests
 
-monkeypatch = pytest.MonkeyPatch()
-
 
 def test_fuzzy_search_files_multiline(tmp_path: Path):
     """Test multiline support in fuzzy_search_files."""
     # Create test files with content
-    test_file1 = tmp_path / "code.js"
-    test_file1.write_text(
-        "function example() {\n  return 'hello';\n}\n\nclass TestClass {\n  constructor() {}\n}"
+    _mkfiles(
+        tmp_path,
+        {
+            "code.js": "function example() {\n  return 'hello';\n}\n\nclass TestClass {\n  constructor() {}\n}",
+            "data.py": "def process():\n    print('processing')",
+        },
     )
-
+    test_file1 = tmp_path / "code.js"
     test_file2 = tmp_path / "data.py"
-    test_file2.write_text("def process():\n    print('processing')")
-
-    mock_rg = tmp_path / "rg"
-    mock_rg.write_text(f'''#!/usr/bin/env python3
-import sys
-if "--files" in sys.argv:
-    print("{test_file1}")
-    print("{test_file2}")
-''')
-    mock_rg.chmod(0o755)
-
-    mock_fzf = tmp_path / "fzf"
-    mock_fzf.write_text(f'''#!/usr/bin/env python3
-import sys
-if "--read0" in sys.argv and "--print0" in sys.argv:
-    # Read null-delimited input
-    data = sys.stdin.buffer.read()
-    # Look for "function" in the content
-    if b"function" in data:
-        # Return matching file record with null terminator
-        content = "{test_file1}:\\nfunction example() {{\\n  return 'hello';\\n}}\\n\\nclass TestClass {{\\n  constructor() {{}}\\n}}"
-        print(content, end="\\0")
-''')
-    mock_fzf.chmod(0o755)
 
-    with monkeypatch.context() as m:
-        m.setenv("PATH", f"{tmp_path}:{os.environ.get('PATH', '')}")
+    with (
+        patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg"),
+        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
+        patch("subprocess.check_output") as mock_rg,
+        patch("subprocess.Popen") as mock_popen,
+    ):
+        # Mock rg listing files
+        mock_rg.return_value = f"{test_file1}\n{test_file2}\n"
 
-        # Reload module globals to pick up new executables
-        mcp_fuzzy_search.RG_EXECUTABLE = shutil.which("rg")
-        mcp_fuzzy_search.FZF_EXECUTABLE = shutil.which("fzf")
+        # Mock fzf returning the matching file record with null terminator
+        mock_fzf_proc = MagicMock()
+        record = f"{normalize_path(str(test_file1))}:\n".encode()
+        mock_fzf_proc.communicate.return_value = (
+            record + test_file1.read_bytes() + b"\0",
+            b"",
+        )
+        mock_fzf_proc.returncode = 0
+        mock_popen.return_value = mock_fzf_proc
 
         result = mcp_fuzzy_search.fuzzy_search_files(
             "function", str(tmp_path), multiline=True
@@ -679,12 +1020,20 @@ if "--read0" in sys.argv and "--print0" in sys.argv:
         assert "function example()" in matches[0]
         assert "class TestClass" in matches[0]
 
+        # Both files were read and fed to fzf as NUL-separated records
+        fzf_input = mock_fzf_proc.communicate.call_args[0][0]
+        assert fzf_input.count(b"\0") == 2
+
 
 def test_fuzzy_search_content_multiline(tmp_path: Path):
     """Test multiline support in fuzzy_search_content."""
     # Create test files with multi-line patterns
     test_file1 = tmp_path / "service.py"
-    test_file1.write_text("""
+    test_file2 = tmp_path / "model.py"
+    _mkfiles(
+        tmp_path,
+        {
+            "service.py": """
 class UserService:
     def authenticate(self, user):
         if user.is_valid:
@@ -693,11 +1042,9 @@ class UserService:
 
 def process_request():
     pass
-""")
-
-    test_file2 = tmp_path / "model.py"
-    test_file2.write_text(
-        "class User:\n    def __init__(self):\n        self.name = ''\n        self.email = ''"
+""",
+            "model.py": "class User:\n    def __init__(self):\n        self.name = ''\n        self.email = ''",
+        },
     )
 
     # Use subprocess mocking instead of PATH manipulation for better reliability
@@ -730,151 +1077,85 @@ def process_request():
         assert "def authenticate" in matches[0]["content"]
 
 
-def test_multiline_cli_support():
+@pytest.mark.parametrize(
+    "sub,fn_attr,pos",
+    [
+        # fuzzy_search_files(filter, path, hidden, limit, multiline)
+        ("search-files", "fuzzy_search_files", 4),
+        # fuzzy_search_content(filter, path, hidden, limit, rg_flags, multiline)
+        ("search-content", "fuzzy_search_content", 5),
+    ],
+)
+def test_multiline_cli_support(sub, fn_attr, pos):
     """Test CLI support for multiline flags."""
-    # Test search-files multiline
-    with patch("mcp_fuzzy_search.fuzzy_search_files") as mock_search_files:
-        mock_search_files.return_value = {"matches": ["file1.txt"]}
+    with patch.object(mcp_fuzzy_search, fn_attr) as mock_search:
+        mock_search.return_value = {"matches": []}
 
-        with patch(
-            "sys.argv",
-            ["mcp_fuzzy_search.py", "search-files", "test", ".", "--multiline"],
-        ):
-            mcp_fuzzy_search._cli()
+        _run_cli(sub, "test", ".", "--multiline")
 
         # Verify multiline=True was passed - check both positional and keyword args
-        mock_search_files.assert_called_once()
-        call_args = mock_search_files.call_args
-        # Function signature: fuzzy_search_files(filter, path, hidden, limit, multiline)
-        if len(call_args[0]) > 4:
-            assert call_args[0][4] is True  # positional argument
-        else:
-            assert call_args[1].get("multiline") is True
-
-    # Test search-content multiline
-    with patch("mcp_fuzzy_search.fuzzy_search_content") as mock_search_content:
-        mock_search_content.return_value = {"matches": []}
-
-        with patch(
-            "sys.argv",
-            ["mcp_fuzzy_search.py", "search-content", "test", ".", "--multiline"],
-        ):
-            mcp_fuzzy_search._cli()
-
-        # Verify multiline=True was passed
-        mock_search_content.assert_called_once()
-        call_args = mock_search_content.call_args
-        # Function signature: fuzzy_search_content(filter, path, hidden, limit, rg_flags, multiline)
-        if len(call_args[0]) > 5:
-            assert call_args[0][5] is True  # positional argument
+        mock_search.assert_called_once()
+        call_args = mock_search.call_args
+        if len(call_args[0]) > pos:
+            assert call_args[0][pos] is True  # positional argument
         else:
             assert call_args[1].get("multiline") is True
 
 
-async def test_fuzzy_search_files_multiline_mcp():
+async def test_fuzzy_search_files_multiline_mcp(mcp_client, mock_rg_fzf, monkeypatch):
     """Test multiline support through MCP interface for fuzzy_search_files."""
     test_content = "async function processData() {\n  const result = await fetch('/api');\n  return result.json();\n}"
 
-    # Create a mock file object
-    mock_file = MagicMock()
-    mock_file.read.return_value = test_content.encode()
-
-    # We need to patch Path at the module level
-    with patch("mcp_fuzzy_search.Path") as mock_path_class:
-        # Create a mock Path instance
-        mock_path_instance = MagicMock()
-        mock_path_instance.open.return_value.__enter__.return_value = mock_file
-
-        # Path() constructor returns our mock instance
-        mock_path_class.return_value = mock_path_instance
-
-        # For Path(path).resolve() calls
-        mock_path_class.return_value.resolve.return_value = mock_path_instance
-        mock_path_class.return_value.resolve.return_value.__str__.return_value = (
-            "api.js"
-        )
-
-        with (
-            patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg"),
-            patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
-            patch("subprocess.check_output") as mock_rg_output,
-            patch("subprocess.Popen") as mock_popen,
-        ):
-            # Mock rg listing files
-            mock_rg_output.return_value = "api.js\n"
-
-            # Mock fzf finding the async function
-            mock_fzf_proc = MagicMock()
-            mock_fzf_proc.communicate.return_value = (
-                b"api.js:\nasync function processData() {\n  const result = await fetch('/api');\n  return result.json();\n}\x00",
-                b"",
-            )
-            mock_fzf_proc.returncode = 0
-            mock_popen.return_value = mock_fzf_proc
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "fuzzy_search_files", {"fuzzy_filter": "async", "multiline": True}
-                )
+    # Only the file read is stubbed; path handling stays real
+    monkeypatch.setattr(
+        mcp_fuzzy_search, "_read_file_bytes", lambda _path: test_content.encode()
+    )
+    mock_rg_fzf(_FZF_FILES_MULTILINE_MOCK_OUT, rg_files="api.js\n")
 
-                data = json.loads(result.content[0].text)
-                assert "matches" in data
-                assert len(data["matches"]) > 0
-                assert "async function processData()" in data["matches"][0]
+    data = await _call(
+        mcp_client, "fuzzy_search_files", {"fuzzy_filter": "async", "multiline": True}
+    )
+    assert "matches" in data
+    assert len(data["matches"]) > 0
+    assert "async function processData()" in data["matches"][0]
 
 
-async def test_fuzzy_search_content_multiline_mcp():
+async def test_fuzzy_search_content_multiline_mcp(mcp_client, mock_rg_fzf, monkeypatch):
     """Test multiline support through MCP interface for fuzzy_search_content."""
     test_content = "class DatabaseService {\n  constructor(config) {\n    this.config = config;\n  }\n\n  async connect() {\n    // TODO: implement\n  }\n}"
 
-    # Create a mock file object
-    mock_file = MagicMock()
-    mock_file.read.return_value = test_content.encode()
+    # Only the file read is stubbed; path handling stays real
+    monkeypatch.setattr(
+        mcp_fuzzy_search, "_read_file_bytes", lambda _path: test_content.encode()
+    )
+    mock_rg_fzf(_FZF_CONTENT_MULTILINE_MOCK_OUT, rg_files="service.js\n")
 
-    # We need to patch Path at the module level
-    with patch("mcp_fuzzy_search.Path") as mock_path_class:
-        # Create a mock Path instance
-        mock_path_instance = MagicMock()
-        mock_path_instance.open.return_value.__enter__.return_value = mock_file
+    data = await _call(
+        mcp_client, "fuzzy_search_content", {"fuzzy_filter": "class", "multiline": True}
+    )
+    assert "matches" in data
+    assert len(data["matches"]) > 0
+    assert data["matches"][0]["file"] == "service.js"
+    assert "class DatabaseService" in data["matches"][0]["content"]
+    assert "async connect()" in data["matches"][0]["content"]
 
-        # Path() constructor returns our mock instance
-        mock_path_class.return_value = mock_path_instance
 
-        # For Path(path).resolve() calls
-        mock_path_class.return_value.resolve.return_value = mock_path_instance
-        mock_path_class.return_value.resolve.return_value.__str__.return_value = (
-            "service.js"
-        )
+async def test_fuzzy_search_files_mcp_runs_off_event_loop(mcp_client, mock_rg_fzf):
+    """The blocking rg | fzf pipeline must not run on the event loop thread."""
+    popen = mock_rg_fzf(_FZF_FILES_MOCK_OUT)
+    threads = []
+    procs = popen.side_effect
 
-        with (
-            patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", "/mock/rg"),
-            patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
-            patch("subprocess.check_output") as mock_rg_output,
-            patch("subprocess.Popen") as mock_popen,
-        ):
-            # Mock rg listing files
-            mock_rg_output.return_value = "service.js\n"
-
-            # Mock fzf finding the class
-            mock_fzf_proc = MagicMock()
-            mock_fzf_proc.communicate.return_value = (
-                b"service.js:\nclass DatabaseService {\n  constructor(config) {\n    this.config = config;\n  }\n\n  async connect() {\n    // TODO: implement\n  }\n}\x00",
-                b"",
-            )
-            mock_fzf_proc.returncode = 0
-            mock_popen.return_value = mock_fzf_proc
+    def spawn(*_args, **_kwargs):
+        threads.append(threading.get_ident())
+        return next(procs)
 
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "fuzzy_search_content", {"fuzzy_filter": "class", "multiline": True}
-                )
+    popen.side_effect = spawn
 
-                data = json.loads(result.content[0].text)
-                assert "matches" in data
-                assert len(data["matches"]) > 0
-                assert data["matches"][0]["file"] == "service.js"
-                assert "class DatabaseService" in data["matches"][0]["content"]
-                assert "async connect()" in data["matches"][0]["content"]
+    result = await mcp_client.call_tool("fuzzy_search_files", {"fuzzy_filter": "main"})
+
+    assert _parse(result)["matches"] == ["src/main.py", "src/main_test.py"]
+    assert threads and threading.get_ident() not in threads
 
 
 def test_windows_path_parsing_multiline():
@@ -907,16 +1188,94 @@ def test_windows_path_parsing_multiline():
     ]
 
     for test_case in test_cases:
-        # Simulate what the parsing logic does
         input_str = test_case["input"]
-        if ":\n" in input_str:
-            file_part, content_part = input_str.split(":\n", 1)
-            assert file_part == test_case["expected_file"], (
-                f"Failed to parse file part from {input_str}"
-            )
-            assert content_part == test_case["expected_content"], (
-                f"Failed to parse content part from {input_str}"
-            )
+        file_part, content_part = mcp_fuzzy_search._split_head(input_str)
+        assert file_part == test_case["expected_file"], (
+            f"Failed to parse file part from {input_str}"
+        )
+        assert content_part == test_case["expected_content"], (
+            f"Failed to parse content part from {input_str}"
+        )
+
+    # A record without a "path:" header line is rejected, not mis-split
+    assert mcp_fuzzy_search._split_head("no header: here") is None
+
+
+def test_nul_records():
+    """fzf's NUL-separated output is walked lazily, skipping empty records."""
+    records = mcp_fuzzy_search._nul_records(b"a.py:\nx\0\0b.py:\ny\0c")
+    first = next(records)
+    assert isinstance(first, memoryview)
+    assert str(first, "utf-8") == "a.py:\nx"
+    assert [bytes(r) for r in records] == [b"b.py:\ny", b"c"]
+    assert list(mcp_fuzzy_search._nul_records(b"")) == []
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_emit_output_is_valid_json(capfd, use_orjson):
+    """CLI output round-trips through json.loads with either JSON backend."""
+    payload = {
+        "matches": [{"file": "r\u00e9sum\u00e9.pdf", "page": 2, "page_label": None}],
+        "count": 1,
+    }
+    orjson_mod = None
+    if use_orjson:
+        # orjson is an optional extra; a bytes-producing stand-in covers the path
+        orjson_mod = mcp_fuzzy_search.orjson or SimpleNamespace(
+            OPT_INDENT_2=1,
+            dumps=lambda obj, option=0: json.dumps(obj, indent=2).encode(),
+        )
+    with patch.object(mcp_fuzzy_search, "orjson", orjson_mod):
+        mcp_fuzzy_search._emit(payload)
+    out = capfd.readouterr().out
+    assert out.endswith("}\n")
+    assert json.loads(out) == payload
+
+    # In-process callers capture output with a text-only stdout
+    buf = io.StringIO()
+    with (
+        patch.object(mcp_fuzzy_search, "orjson", orjson_mod),
+        contextlib.redirect_stdout(buf),
+    ):
+        mcp_fuzzy_search._emit(payload)
+    assert buf.getvalue().endswith("}\n")
+    assert json.loads(buf.getvalue()) == payload
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="uses shebang scripts")
+def test_fuzzy_search_content_noisy_rg_stderr(tmp_path: Path):
+    """A megabyte of rg stderr must not stall the rg | fzf pipe."""
+    rg = tmp_path / "rg"
+    rg.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "sys.stderr.write('permission denied\\n' * 60_000)\n"
+        "print('a.py:1:hello world')\n"
+    )
+    fzf = tmp_path / "fzf"
+    fzf.write_text(
+        f"#!{sys.executable}\nimport sys\nsys.stdout.write(sys.stdin.read())\n"
+    )
+    for script in (rg, fzf):
+        script.chmod(0o755)
+
+    result = []
+    with (
+        patch.object(mcp_fuzzy_search, "RG_EXECUTABLE", str(rg)),
+        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", str(fzf)),
+    ):
+        worker = threading.Thread(
+            target=lambda: result.append(
+                mcp_fuzzy_search.fuzzy_search_content("hello", str(tmp_path))
+            ),
+            daemon=True,
+        )
+        worker.start()
+        worker.join(timeout=30)
+
+    assert result == [
+        {"matches": [{"file": "a.py", "line": 1, "content": "hello world"}]}
+    ]
 
 
 def test_fuzzy_search_content_windows_paths():
@@ -1040,9 +1399,8 @@ def test_fuzzy_search_documents_fzf_no_match():
             with patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"):
                 # Mock rga process with JSON output
                 mock_rga_proc = MagicMock()
-                mock_rga_proc.communicate.return_value = (
-                    '{"type":"match","data":{"path":{"text":"test.pdf"},"lines":{"text":"Page 1: Some content"},"line_number":null}}\n',
-                    "",
+                mock_rga_proc.stdout = io.BytesIO(
+                    b'{"type":"match","data":{"path":{"text":"test.pdf"},"lines":{"text":"Page 1: Some content"},"line_number":null}}\n'
                 )
                 mock_rga_proc.wait.return_value = None
 
@@ -1065,6 +1423,108 @@ def test_fuzzy_search_documents_fzf_no_match():
                 assert result["matches"] == []
                 assert "error" not in result
 
+                # rga's output was streamed, never buffered via communicate()
+                mock_rga_proc.communicate.assert_not_called()
+
+
+def test_fuzzy_search_documents_respects_limit():
+    """Only the top ``limit`` of many fzf hits are mapped back and returned."""
+    lines = [f"doc{i}.txt:{i}:needle {i}" for i in range(1000)]
+    records = b"".join(
+        json.dumps(
+            {
+                "type": "match",
+                "data": {
+                    "path": {"text": f"doc{i}.txt"},
+                    "lines": {"text": f"needle {i}\n"},
+                    "line_number": i,
+                    "submatches": [{"match": {"text": "needle"}}],
+                },
+            },
+            separators=(",", ":"),  # rga emits compact JSON
+        ).encode()
+        + b"\n"
+        for i in range(1000)
+    )
+    mock_rga_proc = MagicMock(stdout=io.BytesIO(records))
+    mock_fzf_proc = MagicMock(returncode=0)
+    mock_fzf_proc.communicate.return_value = ("\n".join(lines), None)
+
+    with (
+        patch("subprocess.Popen", side_effect=[mock_rga_proc, mock_fzf_proc]),
+        patch.object(mcp_fuzzy_search, "RGA_EXECUTABLE", "/mock/rga"),
+        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
+    ):
+        result = mcp_fuzzy_search.fuzzy_search_documents("needle", ".", limit=7)
+
+    assert [m["line"] for m in result["matches"]] == list(range(7))
+
+
+def test_fuzzy_search_documents_reaps_rga_on_bad_record():
+    """A record that breaks parsing still kills and reaps the rga process."""
+    record = {"type": "match", "data": {"submatches": [{}]}}
+    stdout = io.BytesIO(json.dumps(record, separators=(",", ":")).encode() + b"\n")
+    mock_rga_proc = MagicMock(stdout=stdout)
+    mock_rga_proc.poll.return_value = None  # still running
+
+    with (
+        patch("subprocess.Popen", return_value=mock_rga_proc),
+        patch.object(mcp_fuzzy_search, "RGA_EXECUTABLE", "/mock/rga"),
+        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
+    ):
+        result = mcp_fuzzy_search.fuzzy_search_documents("needle", ".")
+
+    assert "error" in result
+    mock_rga_proc.kill.assert_called_once()
+    mock_rga_proc.wait.assert_called_once()
+    assert stdout.closed
+
+
+def test_fuzzy_search_documents_dedups_rga_records():
+    """Repeated rga records reach fzf, and the results, only once."""
+
+    def record(line_number, text):
+        return (
+            json.dumps(
+                {
+                    "type": "match",
+                    "data": {
+                        "path": {"text": "doc.pdf"},
+                        "lines": {"text": f"{text}\n"},
+                        "line_number": line_number,
+                        "submatches": [{"match": {"text": "Header"}}],
+                    },
+                },
+                separators=(",", ":"),
+            ).encode()
+            + b"\n"
+        )
+
+    records = (
+        record(1, "Page 1: Header")
+        + record(1, "Page 1: Header")
+        + record(9, "Page 2: Header")
+    )
+    mock_rga_proc = MagicMock(stdout=io.BytesIO(records))
+    mock_fzf_proc = MagicMock(returncode=0)
+    mock_fzf_proc.communicate.return_value = (
+        "doc.pdf:1:Page 1: Header\ndoc.pdf:9:Page 2: Header\n",
+        None,
+    )
+
+    with (
+        patch("subprocess.Popen", side_effect=[mock_rga_proc, mock_fzf_proc]),
+        patch.object(mcp_fuzzy_search, "RGA_EXECUTABLE", "/mock/rga"),
+        patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
+        patch.object(mcp_fuzzy_search, "PYMUPDF_AVAILABLE", False),
+    ):
+        result = mcp_fuzzy_search.fuzzy_search_documents("header", ".")
+
+    fzf_input = mock_fzf_proc.communicate.call_args[0][0]
+    assert fzf_input == "doc.pdf:1:Page 1: Header\ndoc.pdf:9:Page 2: Header"
+    # Same text on another page is a distinct match and is kept
+    assert [m["page"] for m in result["matches"]] == [1, 2]
+
 
 def test_fuzzy_search_files_fzf_actual_error():
     """Test that fuzzy_search_files handles FZF_EXIT_ERROR (exit code 2) correctly."""
@@ -1200,36 +1660,26 @@ def test_fuzzy_search_content_multiline_fzf_no_match():
 # ---------------------------------------------------------------------------
 
 
-async def test_fuzzy_search_documents_missing_binary():
+async def test_fuzzy_search_documents_missing_binary(mcp_client, monkeypatch):
     """Test fuzzy_search_documents handles missing rga binary gracefully."""
-    # Temporarily patch RGA_EXECUTABLE to None
-    original_rga = mcp_fuzzy_search.RGA_EXECUTABLE
-    try:
-        mcp_fuzzy_search.RGA_EXECUTABLE = None
-
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_documents", {"fuzzy_filter": "test", "path": "."}
-            )
+    monkeypatch.setattr(mcp_fuzzy_search, "RGA_EXECUTABLE", None)
 
-            data = json.loads(result.content[0].text)
-            assert "error" in data
-            assert "ripgrep-all" in data["error"]
-            assert "not installed" in data["error"]
-    finally:
-        mcp_fuzzy_search.RGA_EXECUTABLE = original_rga
+    data = await _call(
+        mcp_client, "fuzzy_search_documents", {"fuzzy_filter": "test", "path": "."}
+    )
+    assert "error" in data
+    assert "ripgrep-all" in data["error"]
+    assert "not installed" in data["error"]
 
 
-async def test_fuzzy_search_documents_basic(tmp_path: Path):
+async def test_fuzzy_search_documents_basic(tmp_path: Path, mcp_client, binaries):
     """Test fuzzy_search_documents with mock rga output."""
-    _skip_if_missing("rga")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rga")
+    _skip_if_missing(binaries, "fzf")
 
     # Create a mock PDF file for testing
     test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf.write_bytes(_MINIMAL_PDF_BYTES)
 
     # Mock the rga JSON output with Page prefix
     # Use json.dumps to properly escape the path for JSON
@@ -1248,8 +1698,8 @@ async def test_fuzzy_search_documents_basic(tmp_path: Path):
     with patch("subprocess.Popen") as mock_popen:
         # Mock rga process
         mock_rga_proc = MagicMock()
-        # Mock communicate() to return the output
-        mock_rga_proc.communicate.return_value = (mock_rga_output, "")
+        # rga's stdout is streamed record by record
+        mock_rga_proc.stdout = io.BytesIO(mock_rga_output.encode())
         mock_rga_proc.wait.return_value = None
 
         # Mock fzf process - needs to match the format produced by rga
@@ -1281,77 +1731,72 @@ async def test_fuzzy_search_documents_basic(tmp_path: Path):
                 mock_doc.close.return_value = None
 
                 with patch("fitz.open", return_value=mock_doc):
-                    async with client_session(
-                        mcp_fuzzy_search.mcp._mcp_server
-                    ) as client:
-                        result = await client.call_tool(
-                            "fuzzy_search_documents",
-                            {"fuzzy_filter": "test", "path": str(tmp_path)},
-                        )
-
-                        data = json.loads(result.content[0].text)
-                        # Debug output
-                        if "error" in data:
-                            print(f"ERROR: {data['error']}")
-                        print(f"Got data: {data}")
-                        assert "matches" in data
-                        assert len(data["matches"]) == 1
-
-                        match = data["matches"][0]
-                        assert "file" in match
-                        assert "page" in match
-                        assert "content" in match
-                        assert "match_text" in match
-
-                        assert match["page"] == 1
-                        assert match["page_index_0based"] == 0
-                        assert "test content" in match["content"]
-                        assert match["match_text"] == "test"
-
-                        # Check for page label
-                        assert "page_label" in match
-                        assert match["page_label"] == "Cover"
-            else:
-                # Test without PyMuPDF
-                async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                    result = await client.call_tool(
+                    data = await _call(
+                        mcp_client,
                         "fuzzy_search_documents",
                         {"fuzzy_filter": "test", "path": str(tmp_path)},
                     )
-
-                    data = json.loads(result.content[0].text)
+                    # Debug output
+                    if "error" in data:
+                        print(f"ERROR: {data['error']}")
+                    print(f"Got data: {data}")
                     assert "matches" in data
                     assert len(data["matches"]) == 1
 
                     match = data["matches"][0]
+                    assert "file" in match
+                    assert "page" in match
+                    assert "content" in match
+                    assert "match_text" in match
+
                     assert match["page"] == 1
                     assert match["page_index_0based"] == 0
-                    assert "page_label" not in match  # No label without PyMuPDF
+                    assert "test content" in match["content"]
+                    assert match["match_text"] == "test"
+
+                    # Check for page label
+                    assert "page_label" in match
+                    assert match["page_label"] == "Cover"
+            else:
+                # Test without PyMuPDF
+                data = await _call(
+                    mcp_client,
+                    "fuzzy_search_documents",
+                    {"fuzzy_filter": "test", "path": str(tmp_path)},
+                )
+                assert "matches" in data
+                assert len(data["matches"]) == 1
+
+                match = data["matches"][0]
+                assert match["page"] == 1
+                assert match["page_index_0based"] == 0
+                assert "page_label" not in match  # No label without PyMuPDF
 
 
 async def test_fuzzy_search_documents_parse_rga_json():
     """Test parsing of actual rga JSON output format."""
-    sample_json = """{"type":"match","data":{"path":{"text":"./Linear Algebra Done Right 4e.pdf"},"lines":{"text":"Page 402: of scalar and vector, 12\\n"},"line_number":null,"absolute_offset":1174364,"submatches":[{"match":{"text":"vector"},"start":24,"end":30}]}}"""
+    sample_json = b"""{"type":"match","data":{"path":{"text":"./Linear Algebra Done Right 4e.pdf"},"lines":{"text":"Page 402: of scalar and vector, 12\\n"},"line_number":null,"absolute_offset":1174364,"submatches":[{"match":{"text":"vector"},"start":24,"end":30}]}}"""
 
-    # Parse the JSON
-    data = json.loads(sample_json)
+    # The server's loader (orjson when installed) agrees with the stdlib
+    data = mcp_fuzzy_search._json_loads(sample_json)
+    assert data == json.loads(sample_json)
     assert data["type"] == "match"
     assert data["data"]["line_number"] is None  # PDFs don't have line numbers
     assert "Page 402:" in data["data"]["lines"]["text"]
 
-    # Extract page number
-    import re
-
+    # Extract page number with the server's own prefix pattern
     lines_text = data["data"]["lines"]["text"].strip()
-    page_match = re.match(r"Page (\d+):", lines_text)
+    page_match = mcp_fuzzy_search._PDF_PAGE_RE.match(lines_text)
     assert page_match is not None
     assert int(page_match.group(1)) == 402
 
 
-async def test_fuzzy_search_documents_with_page_labels(tmp_path: Path):
+async def test_fuzzy_search_documents_with_page_labels(
+    tmp_path: Path, mcp_client, binaries
+):
     """Test fuzzy_search_documents correctly extracts page labels from PDFs."""
-    _skip_if_missing("rga")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rga")
+    _skip_if_missing(binaries, "fzf")
 
     if not mcp_fuzzy_search.PYMUPDF_AVAILABLE:
         pytest.skip("PyMuPDF not available")
@@ -1375,7 +1820,7 @@ async def test_fuzzy_search_documents_with_page_labels(tmp_path: Path):
         # Mock rga process
         mock_rga_proc = MagicMock()
         # Join the mock output lines
-        mock_rga_proc.communicate.return_value = ("\n".join(mock_rga_output), "")
+        mock_rga_proc.stdout = io.BytesIO("\n".join(mock_rga_output).encode())
         mock_rga_proc.wait.return_value = None
 
         # Mock fzf process
@@ -1404,131 +1849,195 @@ async def test_fuzzy_search_documents_with_page_labels(tmp_path: Path):
         mock_doc.close.return_value = None
 
         with (
-            patch("fitz.open", return_value=mock_doc),
+            patch("fitz.open", return_value=mock_doc) as mock_fitz_open,
             patch.object(mcp_fuzzy_search, "RGA_EXECUTABLE", "/mock/rga"),
             patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"),
         ):
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "fuzzy_search_documents",
-                    {
-                        "fuzzy_filter": "concept chapter content",
-                        "path": str(tmp_path),
-                    },
-                )
+            data = await _call(
+                mcp_client,
+                "fuzzy_search_documents",
+                {
+                    "fuzzy_filter": "concept chapter content",
+                    "path": str(tmp_path),
+                },
+            )
+            assert "matches" in data
+            assert len(data["matches"]) == 3
+
+            # Check first match - Page 1 (label "i")
+            match1 = data["matches"][0]
+            assert match1["page"] == 1
+            assert match1["page_index_0based"] == 0
+            assert match1["page_label"] == "i"
+            assert "Introduction" in match1["content"]
+
+            # Check second match - Page 5 (label "1")
+            match2 = data["matches"][1]
+            assert match2["page"] == 5
+            assert match2["page_index_0based"] == 4
+            assert match2["page_label"] == "1"
+            assert "Chapter" in match2["content"]
+
+            # Check third match - Page 10 (label "ToC")
+            match3 = data["matches"][2]
+            assert match3["page"] == 10
+            assert match3["page_index_0based"] == 9
+            assert match3["page_label"] == "ToC"
+            assert "contents" in match3["content"]
+
+            # One open per PDF, one page load per distinct returned page
+            assert mock_fitz_open.call_count == 1
+            assert mock_doc.__getitem__.call_count == 3
+
+
+def test_document_match():
+    """rga records become results with page fields and truncated text."""
+    match = mcp_fuzzy_search._document_match("doc.pdf", 7, "Page 3: " + "x" * 3000, "x")
+    assert match["page"] == 3
+    assert match["page_index_0based"] == 2
+    assert match["content"] == "x" * 2048 + "..."
+    assert match["line"] == 7
+
+    plain = mcp_fuzzy_search._document_match("notes.txt", 1, "hello", "hell")
+    assert plain == {
+        "file": "notes.txt",
+        "line": 1,
+        "content": "hello",
+        "match_text": "hell",
+    }
+
+
+def test_pdf_page_labels():
+    """Labels are read from one open of the PDF, skipping pages it lacks."""
+    mock_doc = MagicMock(page_count=10)
+    mock_doc.__getitem__.side_effect = lambda i: MagicMock(
+        get_label=MagicMock(return_value=f"p{i}")
+    )
 
-                data = json.loads(result.content[0].text)
-                assert "matches" in data
-                assert len(data["matches"]) == 3
-
-                # Check first match - Page 1 (label "i")
-                match1 = data["matches"][0]
-                assert match1["page"] == 1
-                assert match1["page_index_0based"] == 0
-                assert match1["page_label"] == "i"
-                assert "Introduction" in match1["content"]
-
-                # Check second match - Page 5 (label "1")
-                match2 = data["matches"][1]
-                assert match2["page"] == 5
-                assert match2["page_index_0based"] == 4
-                assert match2["page_label"] == "1"
-                assert "Chapter" in match2["content"]
-
-                # Check third match - Page 10 (label "ToC")
-                match3 = data["matches"][2]
-                assert match3["page"] == 10
-                assert match3["page_index_0based"] == 9
-                assert match3["page_label"] == "ToC"
-                assert "contents" in match3["content"]
-
-
-async def test_extract_pdf_pages_missing_binaries():
-    """Test extract_pdf_pages handles missing binaries gracefully."""
-    # Test missing PyMuPDF
-    original_pymupdf = mcp_fuzzy_search.PYMUPDF_AVAILABLE
-    try:
-        mcp_fuzzy_search.PYMUPDF_AVAILABLE = False
+    with patch("fitz.open", return_value=mock_doc) as mock_open:
+        labels = mcp_fuzzy_search._pdf_page_labels("doc.pdf", {9, 4, 10, -1})
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "extract_pdf_pages", {"file": "test.pdf", "pages": "1,2,3"}
-            )
+    assert labels == {4: "p4", 9: "p9"}
+    mock_open.assert_called_once_with("doc.pdf")
+    assert mock_doc.__getitem__.call_count == 2
+    mock_doc.close.assert_called_once()
 
-            data = json.loads(result.content[0].text)
-            assert "error" in data
-            assert "PyMuPDF" in data["error"]
-    finally:
-        mcp_fuzzy_search.PYMUPDF_AVAILABLE = original_pymupdf
+    # An unreadable PDF just goes unlabelled
+    with patch("fitz.open", side_effect=RuntimeError("broken")):
+        assert mcp_fuzzy_search._pdf_page_labels("bad.pdf", {0}) == {}
 
-    # Test missing pandoc (only affects markdown conversion)
-    # Create a test PDF file first
-    import tempfile
+    # A page whose label cannot be read is skipped on its own
+    def page(i):
+        if i == 1:
+            raise RuntimeError("bad page")
+        return MagicMock(get_label=MagicMock(return_value=f"p{i}"))
 
-    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-        tmp.write(b"%PDF-1.4\n%fake pdf")
-        test_pdf = tmp.name
+    mock_doc.__getitem__.side_effect = page
+    with patch("fitz.open", return_value=mock_doc):
+        labels = mcp_fuzzy_search._pdf_page_labels("doc.pdf", {0, 1, 2, 3})
+    assert labels == {0: "p0", 2: "p2", 3: "p3"}
 
-    try:
-        original_pandoc = mcp_fuzzy_search.PANDOC_EXECUTABLE
-        try:
-            mcp_fuzzy_search.PANDOC_EXECUTABLE = None
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Without pandoc, markdown format should still work (fallback to plain text)
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {"file": test_pdf, "pages": "1", "format": "markdown"},
-                )
 
-                data = json.loads(result.content[0].text)
-                # Should not error, but fall back to plain text extraction
-                assert "error" not in data or "pandoc" not in data.get("error", "")
-        finally:
-            mcp_fuzzy_search.PANDOC_EXECUTABLE = original_pandoc
-    finally:
-        import os
+def test_pdf_access_is_serialized(minimal_pdf_path: Path):
+    """PyMuPDF is only used under the module's fitz lock, and pandoc never is."""
 
-        os.unlink(test_pdf)
+    def lock_is_held() -> bool:
+        # Probe from another thread; the RLock would let its owner re-enter
+        result = []
 
+        def probe():
+            acquired = mcp_fuzzy_search._fitz_lock.acquire(blocking=False)
+            if acquired:
+                mcp_fuzzy_search._fitz_lock.release()
+            result.append(not acquired)
 
-async def test_extract_pdf_pages_invalid_input(tmp_path: Path):
-    """Test extract_pdf_pages handles invalid input gracefully."""
-    # No need to skip for PyMuPDF - it's imported at module level
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+        return result[0]
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Test missing file
-        result = await client.call_tool(
-            "extract_pdf_pages",
-            {"file": str(tmp_path / "nonexistent.pdf"), "pages": "1"},
-        )
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "not found" in data["error"]
+    held = []
 
-        # Test invalid page numbers
-        test_pdf = tmp_path / "test.pdf"
-        # Create a minimal valid PDF that PyMuPDF can open
-        pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-        test_pdf.write_bytes(pdf_content)
+    def fake_open(*args, **kwargs):
+        held.append(lock_is_held())
+        return _make_mock_doc(["text"])
+
+    def fake_pandoc(*args, **kwargs):
+        held.append(lock_is_held())
+        return _ok(b"text\n")
+
+    with (
+        patch("fitz.open", side_effect=fake_open),
+        patch("subprocess.run", side_effect=fake_pandoc),
+        patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"),
+    ):
+        mcp_fuzzy_search._pdf_page_labels(str(minimal_pdf_path), {0})
+        mcp_fuzzy_search.get_pdf_page_count(str(minimal_pdf_path))
+        result = mcp_fuzzy_search.extract_pdf_pages(str(minimal_pdf_path), "1")
 
-        result = await client.call_tool(
-            "extract_pdf_pages", {"file": str(test_pdf), "pages": "abc"}
+    assert result["content"] == "text\n"
+    # page labels, page count (opens and caches), extract (cache hit), pandoc
+    assert held == [True, True, False]
+
+
+async def test_extract_pdf_pages_missing_binaries(
+    tmp_path: Path, mcp_client, monkeypatch
+):
+    """Test extract_pdf_pages handles missing binaries gracefully."""
+    # Test missing PyMuPDF
+    with monkeypatch.context() as m:
+        m.setattr(mcp_fuzzy_search, "PYMUPDF_AVAILABLE", False)
+
+        data = await _call(
+            mcp_client, "extract_pdf_pages", {"file": "test.pdf", "pages": "1,2,3"}
         )
-        data = json.loads(result.content[0].text)
         assert "error" in data
-        assert "Invalid page specification" in data["error"]
+        assert "PyMuPDF" in data["error"]
 
+    # Test missing pandoc (only affects markdown conversion)
+    test_pdf = tmp_path / "test.pdf"
+    test_pdf.write_bytes(b"%PDF-1.4\n%fake pdf")
+    monkeypatch.setattr(mcp_fuzzy_search, "PANDOC_EXECUTABLE", None)
 
-async def test_extract_pdf_pages_basic(tmp_path: Path):
-    """Test extract_pdf_pages with mock PyMuPDF."""
+    # Without pandoc, markdown format should still work (fallback to plain text)
+    data = await _call(
+        mcp_client,
+        "extract_pdf_pages",
+        {"file": str(test_pdf), "pages": "1", "format": "markdown"},
+    )
+    # Should not error, but fall back to plain text extraction
+    assert "error" not in data or "pandoc" not in data.get("error", "")
+
+
+async def test_extract_pdf_pages_invalid_input(tmp_path: Path, mcp_client):
+    """Test extract_pdf_pages handles invalid input gracefully."""
     # No need to skip for PyMuPDF
 
-    # Create a test PDF
+    # Test missing file
+    data = await _call(
+        mcp_client,
+        "extract_pdf_pages",
+        {"file": str(tmp_path / "nonexistent.pdf"), "pages": "1"},
+    )
+    assert "error" in data
+    assert "not found" in data["error"]
+
+    # Test invalid page numbers
     test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf.write_bytes(_MINIMAL_PDF_BYTES)
+
+    data = await _call(
+        mcp_client, "extract_pdf_pages", {"file": str(test_pdf), "pages": "abc"}
+    )
+    assert "error" in data
+    assert "Invalid page specification" in data["error"]
+
+
+async def test_extract_pdf_pages_basic(minimal_pdf_path: Path, mcp_client, fake_run):
+    """Test extract_pdf_pages with mock PyMuPDF."""
+    # No need to skip for PyMuPDF
+
+    test_pdf = minimal_pdf_path
 
     # Mock PyMuPDF
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
@@ -1536,7 +2045,6 @@ async def test_extract_pdf_pages_basic(tmp_path: Path):
         mock_doc = MagicMock()
         mock_doc.page_count = 5
         mock_doc.get_page_numbers.return_value = []  # No label matches
-        mock_doc.get_page_labels.return_value = None
 
         # Create mock page
         mock_page = MagicMock()
@@ -1551,38 +2059,77 @@ async def test_extract_pdf_pages_basic(tmp_path: Path):
         mock_fitz_open.return_value = mock_doc
 
         # Mock pandoc for markdown conversion
-        with patch("subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"# Page 1\n\nExtracted content from page 1\n"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {"file": str(test_pdf), "pages": "1", "format": "markdown"},
-                )
-
-                data = json.loads(result.content[0].text)
-                assert "content" in data
-                assert "pages_extracted" in data
-                assert "format" in data
+        with patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"):
+            fake_run.results["pandoc"] = _ok(
+                b"# Page 1\n\nExtracted content from page 1\n"
+            )
 
-                assert data["pages_extracted"] == [0]  # 0-based index for page 1
-                assert data["format"] == "markdown"
-                assert "Extracted content" in data["content"]
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {"file": str(test_pdf), "pages": "1", "format": "markdown"},
+            )
+            assert "content" in data
+            assert "pages_extracted" in data
+            assert "format" in data
 
+            assert data["pages_extracted"] == [0]  # 0-based index for page 1
+            assert data["format"] == "markdown"
+            assert "Extracted content" in data["content"]
 
-async def test_fuzzy_search_documents_with_file_types(tmp_path: Path):
+            # Another call on the unchanged file reuses the open document
+            await mcp_client.call_tool(
+                "extract_pdf_pages",
+                {"file": str(test_pdf), "pages": "1", "format": "markdown"},
+            )
+            assert mock_fitz_open.call_count == 1
+            mock_doc.close.assert_not_called()
+
+
+def test_open_pdf_cached_invalidation_and_eviction(tmp_path: Path, monkeypatch):
+    """Edited files are reopened and the least recently used document closed."""
+    monkeypatch.setattr(mcp_fuzzy_search, "PDF_CACHE_MAX", 2)
+    paths = [tmp_path / f"{name}.pdf" for name in "abc"]
+    for path in paths:
+        path.write_bytes(b"%PDF-1.4")
+
+    with patch("fitz.open", side_effect=lambda **_kw: MagicMock()) as mock_open:
+        a = mcp_fuzzy_search._open_pdf_cached(paths[0])
+        assert mcp_fuzzy_search._open_pdf_cached(paths[0]) is a
+        # The document is read from memory, not from an open file handle
+        assert mock_open.call_args.kwargs == {
+            "stream": b"%PDF-1.4",
+            "filetype": "pdf",
+        }
+        # A relative spelling of the same file shares its cache entry
+        monkeypatch.chdir(tmp_path)
+        assert mcp_fuzzy_search._open_pdf_cached(Path("a.pdf")) is a
+
+        # Editing the file changes its size, so it is reopened
+        paths[0].write_bytes(b"%PDF-1.4\n%edited")
+        a2 = mcp_fuzzy_search._open_pdf_cached(paths[0])
+        assert a2 is not a
+        a.close.assert_called_once()
+
+        # A third document pushes out the least recently used one (a2)
+        b = mcp_fuzzy_search._open_pdf_cached(paths[1])
+        mcp_fuzzy_search._open_pdf_cached(paths[2])
+        a2.close.assert_called_once()
+        assert mcp_fuzzy_search._open_pdf_cached(paths[1]) is b
+        assert mock_open.call_count == 4
+
+
+async def test_fuzzy_search_documents_with_file_types(
+    tmp_path: Path, mcp_client, binaries
+):
     """Test fuzzy_search_documents with file type filtering."""
-    _skip_if_missing("rga")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rga")
+    _skip_if_missing(binaries, "fzf")
 
     with patch("subprocess.Popen") as mock_popen:
         # Mock processes
         mock_rga_proc = MagicMock()
-        mock_rga_proc.communicate.return_value = ("", "")
+        mock_rga_proc.stdout = io.BytesIO(b"")
         mock_rga_proc.wait.return_value = None
 
         mock_fzf_proc = MagicMock()
@@ -1591,46 +2138,47 @@ async def test_fuzzy_search_documents_with_file_types(tmp_path: Path):
 
         mock_popen.side_effect = [mock_rga_proc, mock_fzf_proc]
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_documents",
-                {
-                    "fuzzy_filter": "test",
-                    "path": str(tmp_path),
-                    "file_types": "pdf,docx",
-                },
-            )
+        result = await mcp_client.call_tool(
+            "fuzzy_search_documents",
+            {
+                "fuzzy_filter": "test",
+                "path": str(tmp_path),
+                "file_types": "pdf,docx",
+            },
+        )
 
-            # Check that rga was called with the right adapter flags
-            rga_call = mock_popen.call_args_list[0]
-            args = rga_call[0][0]
-            # Find the adapter argument with equals sign
-            adapter_arg = None
-            for arg in args:
-                if arg.startswith("--rga-adapters="):
-                    adapter_arg = arg
-                    break
-            assert adapter_arg is not None
-            # Check for actual adapter names in the combined string
-            assert (
-                adapter_arg == "--rga-adapters=+poppler,pandoc"
-            )  # pdf maps to poppler, docx maps to pandoc
-
-            # Verify the result (should have empty matches since mocks return empty)
-            data = json.loads(result.content[0].text)
-            assert "matches" in data
-            assert data["matches"] == []
+        # Check that rga was called with the right adapter flags
+        rga_call = mock_popen.call_args_list[0]
+        args = rga_call[0][0]
+        # Find the adapter argument with equals sign
+        adapter_arg = None
+        for arg in args:
+            if arg.startswith("--rga-adapters="):
+                adapter_arg = arg
+                break
+        assert adapter_arg is not None
+        # Check for actual adapter names in the combined string
+        assert (
+            adapter_arg == "--rga-adapters=+poppler,pandoc"
+        )  # pdf maps to poppler, docx maps to pandoc
+
+        # Verify the result (should have empty matches since mocks return empty)
+        data = _parse(result)
+        assert "matches" in data
+        assert data["matches"] == []
 
 
-async def test_fuzzy_search_documents_preview_false(tmp_path: Path):
+async def test_fuzzy_search_documents_preview_false(
+    tmp_path: Path, mcp_client, binaries
+):
     """Test fuzzy_search_documents with preview=False parameter."""
-    _skip_if_missing("rga")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rga")
+    _skip_if_missing(binaries, "fzf")
 
     with patch("subprocess.Popen") as mock_popen:
         # Mock processes to return empty results
         mock_rga_proc = MagicMock()
-        mock_rga_proc.communicate.return_value = ("", "")
+        mock_rga_proc.stdout = io.BytesIO(b"")
         mock_rga_proc.wait.return_value = None
 
         mock_fzf_proc = MagicMock()
@@ -1639,35 +2187,33 @@ async def test_fuzzy_search_documents_preview_false(tmp_path: Path):
 
         mock_popen.side_effect = [mock_rga_proc, mock_fzf_proc]
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            # Test that preview=False parameter is accepted without errors
-            result = await client.call_tool(
-                "fuzzy_search_documents",
-                {
-                    "fuzzy_filter": "test",
-                    "path": str(tmp_path),
-                    "preview": False,  # Test preview=False
-                },
-            )
-
-            # Just verify the call completed successfully
-            data = json.loads(result.content[0].text)
-            assert "error" not in data
-            assert "matches" in data
+        # Test that preview=False parameter is accepted without errors
+        result = await mcp_client.call_tool(
+            "fuzzy_search_documents",
+            {
+                "fuzzy_filter": "test",
+                "path": str(tmp_path),
+                "preview": False,  # Test preview=False
+            },
+        )
 
-            # Also test with preview=True to ensure both values are accepted
-            result = await client.call_tool(
-                "fuzzy_search_documents",
-                {
-                    "fuzzy_filter": "test",
-                    "path": str(tmp_path),
-                    "preview": True,  # Test preview=True
-                },
-            )
+        # Just verify the call completed successfully
+        data = _parse(result)
+        assert "error" not in data
+        assert "matches" in data
 
-            data = json.loads(result.content[0].text)
-            assert "error" not in data
-            assert "matches" in data
+        # Also test with preview=True to ensure both values are accepted
+        data = await _call(
+            mcp_client,
+            "fuzzy_search_documents",
+            {
+                "fuzzy_filter": "test",
+                "path": str(tmp_path),
+                "preview": True,  # Test preview=True
+            },
+        )
+        assert "error" not in data
+        assert "matches" in data
 
 
 # ---------------------------------------------------------------------------
@@ -1679,19 +2225,18 @@ async def test_fuzzy_search_documents_preview_false(tmp_path: Path):
 # PyMuPDF handles page labels natively, no need for custom parsing
 
 
-async def test_extract_pdf_pages_with_labels(tmp_path: Path):
+async def test_extract_pdf_pages_with_labels(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
     """Test extract_pdf_pages with page labels."""
     # Test with PyMuPDF
 
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
         # Create mock document
-        mock_doc = MagicMock()
-        mock_doc.page_count = 5
+        labels = ["iii", "iv", "v", "1", "2"]
+        mock_doc = _make_mock_doc([f"Content from page {lb}" for lb in labels], labels)
 
         # Mock get_page_numbers to return pages for labels
         def mock_get_page_numbers(label):
@@ -1700,36 +2245,20 @@ async def test_extract_pdf_pages_with_labels(tmp_path: Path):
 
         mock_doc.get_page_numbers = mock_get_page_numbers
 
-        # Create mock pages
-        mock_pages = {}
-        for i, label in enumerate(["iii", "iv", "v", "1", "2"]):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = f"Content from page {label}"
-            mock_page.get_label.return_value = label
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
-
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
         # Mock pandoc for markdown conversion
-        with patch("subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"# Roman Numeral Pages\n\nContent from page iii\n\nContent from page iv\n"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {"file": str(test_pdf), "pages": "iii,iv", "format": "markdown"},
-                )
+        with patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"):
+            fake_run.results["pandoc"] = _ok(
+                b"# Roman Numeral Pages\n\nContent from page iii\n\nContent from page iv\n"
+            )
 
-            data = json.loads(result.content[0].text)
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {"file": str(test_pdf), "pages": "iii,iv", "format": "markdown"},
+            )
             # Debug: print what we actually got
             if "error" in data:
                 print(f"ERROR: {data['error']}")
@@ -1745,18 +2274,18 @@ async def test_extract_pdf_pages_with_labels(tmp_path: Path):
             assert "Roman Numeral Pages" in data["content"]
 
 
-async def test_extract_pdf_pages_with_ranges(tmp_path: Path):
+async def test_extract_pdf_pages_with_ranges(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
     """Test extract_pdf_pages with page label ranges."""
     # Test with PyMuPDF
 
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document
-        mock_doc = MagicMock()
+        # Create mock document with page labels
+        labels = ["iii", "iv", "v", "vi"]
+        mock_doc = _make_mock_doc([f"Content from page {lb}" for lb in labels], labels)
         mock_doc.page_count = 10
 
         # Mock get_page_numbers to return pages for labels
@@ -1766,39 +2295,20 @@ async def test_extract_pdf_pages_with_ranges(tmp_path: Path):
 
         mock_doc.get_page_numbers = mock_get_page_numbers
 
-        # Mock get_page_labels to return page labels
-        mock_doc.get_page_labels.return_value = ["iii", "iv", "v", "vi"]
-
-        # Create mock pages
-        mock_pages = {}
-        for i, label in enumerate(["iii", "iv", "v", "vi"]):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = f"Content from page {label}"
-            mock_page.get_label.return_value = label
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
-
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
         # Mock pandoc for markdown conversion
-        with patch("subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"# Range Content\n\nContent from page iii\n\nContent from page iv\n\nContent from page v\n"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {"file": str(test_pdf), "pages": "iii-v", "format": "markdown"},
-                )
+        with patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"):
+            fake_run.results["pandoc"] = _ok(
+                b"# Range Content\n\nContent from page iii\n\nContent from page iv\n\nContent from page v\n"
+            )
 
-            data = json.loads(result.content[0].text)
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {"file": str(test_pdf), "pages": "iii-v", "format": "markdown"},
+            )
 
             # Should extract pages 0, 1, 2 (0-based indices for labels iii, iv, v)
             assert data["pages_extracted"] == [0, 1, 2]
@@ -1806,19 +2316,19 @@ async def test_extract_pdf_pages_with_ranges(tmp_path: Path):
             assert "Range Content" in data["content"]
 
 
-async def test_extract_pdf_pages_mixed_specs(tmp_path: Path):
+async def test_extract_pdf_pages_mixed_specs(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
     """Test extract_pdf_pages with mixed page specifications."""
     # Test with PyMuPDF
 
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
         # Create mock document
-        mock_doc = MagicMock()
-        mock_doc.page_count = 10
+        # Page indices: 0=iii, 1=iv, 2=v, 3=1, 4=5 (to match test expectation)
+        labels = ["iii", "iv", "v", "1", "5", "6", "7", "8", "9", "10"]
+        mock_doc = _make_mock_doc([f"Content from page {lb}" for lb in labels], labels)
 
         # Mock get_page_numbers to return pages for labels
         def mock_get_page_numbers(label):
@@ -1828,40 +2338,21 @@ async def test_extract_pdf_pages_mixed_specs(tmp_path: Path):
 
         mock_doc.get_page_numbers = mock_get_page_numbers
 
-        # Create mock pages
-        mock_pages = {}
-        # Page indices: 0=iii, 1=iv, 2=v, 3=1, 4=5 (to match test expectation)
-        labels = ["iii", "iv", "v", "1", "5", "6", "7", "8", "9", "10"]
-        for i in range(10):
-            mock_page = MagicMock()
-            label = labels[i] if i < len(labels) else str(i + 1)
-            mock_page.get_text.return_value = f"Content from page {label}"
-            mock_page.get_label.return_value = label
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
-
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
         # Mock pandoc for markdown conversion
-        with patch("subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"# Mixed Content\n\nContent from page iii\n\nContent from page 3\n\nContent from page 4\n\nContent from page 5\n"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Mix of labels and numeric indices
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {"file": str(test_pdf), "pages": "iii,5,iv", "format": "markdown"},
-                )
+        with patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"):
+            fake_run.results["pandoc"] = _ok(
+                b"# Mixed Content\n\nContent from page iii\n\nContent from page 3\n\nContent from page 4\n\nContent from page 5\n"
+            )
 
-            data = json.loads(result.content[0].text)
+            # Mix of labels and numeric indices
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {"file": str(test_pdf), "pages": "iii,5,iv", "format": "markdown"},
+            )
 
             # Should extract pages 0 (iii), 4 (page 5 -> index 4), 1 (iv)
             assert data["pages_extracted"] == [0, 4, 1]
@@ -1869,20 +2360,70 @@ async def test_extract_pdf_pages_mixed_specs(tmp_path: Path):
             assert "Mixed Content" in data["content"]
 
 
+def test_extract_pdf_pages_real_page_labels(tmp_path: Path):
+    """Labels come from each page, not from the document's label rules."""
+    if not mcp_fuzzy_search.PYMUPDF_AVAILABLE:
+        pytest.skip("PyMuPDF not available")
+
+    fitz = mcp_fuzzy_search._get_fitz()
+    doc = fitz.open()
+    for i in range(4):
+        doc.new_page().insert_text((72, 72), f"Body {i}")
+    doc.set_page_labels(
+        [
+            {"startpage": 0, "prefix": "", "style": "r", "firstpagenum": 1},
+            {"startpage": 2, "prefix": "", "style": "D", "firstpagenum": 1},
+        ]
+    )
+    test_pdf = tmp_path / "labelled.pdf"
+    doc.save(test_pdf)
+    doc.close()
+
+    result = mcp_fuzzy_search.extract_pdf_pages(str(test_pdf), "i-ii,1", format="plain")
+
+    assert result["pages_extracted"] == [0, 1, 2]
+    assert result["page_labels"] == ["i", "ii", "1"]
+    assert "(Label: i)" in result["content"]
+    assert "(Label: ii)" in result["content"]
+
+
 # ---------------------------------------------------------------------------
 # Clean HTML Tests
 # ---------------------------------------------------------------------------
 
 
-async def test_extract_pdf_pages_clean_html_true(tmp_path: Path):
-    """Test extract_pdf_pages with clean_html=True strips HTML styling."""
-    # Test with PyMuPDF
-
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
-
+@pytest.mark.parametrize(
+    ("clean_html", "expected_from", "expected_to", "expect_clean"),
+    [
+        pytest.param(
+            True,
+            "--from=html-native_divs-native_spans",
+            "--to=gfm+tex_math_dollars-raw_html",
+            True,
+            id="true",
+        ),
+        pytest.param(
+            False, "--from=html", "--to=gfm+tex_math_dollars", False, id="false"
+        ),
+        pytest.param(
+            None,
+            "--from=html-native_divs-native_spans",
+            "--to=gfm+tex_math_dollars-raw_html",
+            True,
+            id="default",
+        ),
+    ],
+)
+async def test_extract_pdf_pages_clean_html(
+    minimal_pdf_path: Path,
+    mcp_client,
+    clean_html,
+    expected_from,
+    expected_to,
+    expect_clean,
+    fake_run,
+):
+    """clean_html (on by default) strips styling before pandoc and picks its flags."""
     # HTML output with styling from PyMuPDF
     html_with_styling = (
         '<p><span style="font-family: TimesLTPro-Roman; font-size:9px">'
@@ -1891,214 +2432,59 @@ async def test_extract_pdf_pages_clean_html_true(tmp_path: Path):
         "Styled div content</div>"
         "<!-- HTML comment -->"
     )
+    args = {"file": str(minimal_pdf_path), "pages": "1", "format": "markdown"}
+    if clean_html is not None:
+        args["clean_html"] = clean_html
 
-    with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document
-        mock_doc = MagicMock()
-        mock_doc.page_count = 1
-        mock_doc.get_page_numbers.return_value = []  # No label matches
-        mock_doc.get_page_labels.return_value = None
-
-        # Create mock page that returns HTML with styling
-        mock_page = MagicMock()
-        mock_page.get_text.return_value = html_with_styling
-        mock_page.get_label.return_value = "1"
-
-        # Configure document to return page
-        mock_doc.__getitem__.return_value = mock_page
-        mock_doc.close = MagicMock()
-
-        # Configure fitz.open to return mock document
-        mock_fitz_open.return_value = mock_doc
-
-        # Mock pandoc for markdown conversion
-        with patch("subprocess.run") as mock_run:
-            # Mock pandoc process returning clean markdown
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"Text with styling\n\nStyled div content\n"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "1",
-                        "format": "markdown",
-                        "clean_html": True,
-                    },
-                )
-
-            data = json.loads(result.content[0].text)
-            assert "content" in data
-            assert data["format"] == "markdown"
-
-            # Verify pandoc was called with clean HTML arguments
-            pandoc_call = mock_run.call_args_list[0]  # First and only call
-            pandoc_args = pandoc_call[0][0]
-            assert "--from=html-native_divs-native_spans" in pandoc_args
-            assert "--to=gfm+tex_math_dollars-raw_html" in pandoc_args
-            assert "--strip-comments" in pandoc_args
-
-            # Content should not contain HTML styling
-            content = data["content"]
-            assert "font-family" not in content
-            assert "font-size" not in content
-            assert "<span" not in content
-            assert "<div" not in content
-            assert "style=" not in content
-
-
-async def test_extract_pdf_pages_clean_html_false(tmp_path: Path):
-    """Test extract_pdf_pages with clean_html=False preserves HTML styling."""
-    # Test with PyMuPDF
-
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
-
-    # HTML output with styling from pdf2txt
-    html_with_styling = (
-        '<p><span style="font-family: TimesLTPro-Roman; font-size:9px">'
-        "Text with styling</span></p>"
-    )
-
-    with patch("subprocess.run") as mock_run:
-        # Mock pdf2txt process
-        mock_pdf_result = MagicMock()
-        mock_pdf_result.returncode = 0
-        mock_pdf_result.stdout = html_with_styling.encode()
-        mock_pdf_result.stderr = b""
-
-        # Mock pandoc process preserving HTML
-        mock_pandoc_result = MagicMock()
-        mock_pandoc_result.returncode = 0
-        mock_pandoc_result.stdout = b'<span style="font-family: TimesLTPro-Roman; font-size:9px">Text with styling</span>\n'
-        mock_pandoc_result.stderr = b""
-
-        mock_run.side_effect = [mock_pdf_result, mock_pandoc_result]
-
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "extract_pdf_pages",
-                {
-                    "file": str(test_pdf),
-                    "pages": "1",
-                    "format": "markdown",
-                    "clean_html": False,
-                },
-            )
-
-            data = json.loads(result.content[0].text)
-            assert "content" in data
-
-            # Verify pandoc was called with standard arguments (no cleaning)
-            pandoc_call = mock_run.call_args_list[0]  # First and only call
-            pandoc_args = pandoc_call[0][0]
-            assert "--from=html" in pandoc_args
-            assert "--to=gfm+tex_math_dollars" in pandoc_args
-            assert "--strip-comments" not in pandoc_args
-
-
-async def test_extract_pdf_pages_clean_html_plain_format(tmp_path: Path):
+    with (
+        patch(
+            "mcp_fuzzy_search.fitz.open",
+            return_value=_make_mock_doc([html_with_styling]),
+        ),
+        patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"),
+    ):
+        fake_run.results["pandoc"] = _ok(b"Text with styling\n\nStyled div content\n")
+        data = _parse(await mcp_client.call_tool("extract_pdf_pages", args))
+
+    assert data["format"] == "markdown"
+    assert data["content"] == "Text with styling\n\nStyled div content\n"
+
+    # One pandoc run, with flags and input matching the clean_html setting
+    fake_run.assert_called_once()
+    pandoc_args = fake_run.call_args[0][0]
+    assert expected_from in pandoc_args
+    assert expected_to in pandoc_args
+    assert ("--strip-comments" in pandoc_args) == expect_clean
+    pandoc_input = fake_run.call_args[1]["input"]
+    assert (b"style=" not in pandoc_input) == expect_clean
+    assert (b"<span" not in pandoc_input) == expect_clean
+
+
+async def test_extract_pdf_pages_clean_html_plain_format(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
     """Test extract_pdf_pages with clean_html=True and plain format."""
-    # Test with PyMuPDF
-
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
-
-    with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document
-        mock_doc = MagicMock()
-        mock_doc.page_count = 1
-        mock_doc.get_page_numbers.return_value = []  # No label matches
-        mock_doc.get_page_labels.return_value = None
-
-        # Create mock page that returns plain text
-        mock_page = MagicMock()
-        mock_page.get_text.return_value = "Plain text content"
-        mock_page.get_label.return_value = "1"
-
-        # Configure document to return page
-        mock_doc.__getitem__.return_value = mock_page
-        mock_doc.close = MagicMock()
-
-        # Configure fitz.open to return mock document
-        mock_fitz_open.return_value = mock_doc
-
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "extract_pdf_pages",
-                {
-                    "file": str(test_pdf),
-                    "pages": "1",
-                    "format": "plain",
-                    "clean_html": True,  # Should be ignored for plain format
-                },
-            )
-
-        data = json.loads(result.content[0].text)
-        assert data["format"] == "plain"
-        assert "Plain text content" in data["content"]
-        # No pandoc should be called for plain format
-
-
-async def test_extract_pdf_pages_clean_html_default_true(tmp_path: Path):
-    """Test extract_pdf_pages has clean_html=True by default."""
-    # Test with PyMuPDF
-
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
-
-    with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document
-        mock_doc = MagicMock()
-        mock_doc.page_count = 1
-        mock_doc.get_page_numbers.return_value = []  # No label matches
-        mock_doc.get_page_labels.return_value = None
-
-        # Create mock page that returns HTML with styling
-        mock_page = MagicMock()
-        mock_page.get_text.return_value = '<span style="font-size:12px">Content</span>'
-        mock_page.get_label.return_value = "1"
-
-        # Configure document to return page
-        mock_doc.__getitem__.return_value = mock_page
-        mock_doc.close = MagicMock()
-
-        # Configure fitz.open to return mock document
-        mock_fitz_open.return_value = mock_doc
-
-        # Mock pandoc for markdown conversion
-        with patch("subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"Content\n"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Don't specify clean_html parameter - should default to True
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {"file": str(test_pdf), "pages": "1", "format": "markdown"},
-                )
-
-            data = json.loads(result.content[0].text)
-            assert "content" in data
+    with (
+        patch(
+            "mcp_fuzzy_search.fitz.open",
+            return_value=_make_mock_doc(["Plain text content"]),
+        ),
+    ):
+        result = await mcp_client.call_tool(
+            "extract_pdf_pages",
+            {
+                "file": str(minimal_pdf_path),
+                "pages": "1",
+                "format": "plain",
+                "clean_html": True,  # Should be ignored for plain format
+            },
+        )
 
-            # Should use clean HTML arguments by default
-            pandoc_call = mock_run.call_args_list[0]  # First and only call
-            pandoc_args = pandoc_call[0][0]
-            assert "--from=html-native_divs-native_spans" in pandoc_args
-            assert "--strip-comments" in pandoc_args
+    data = _parse(result)
+    assert data["format"] == "plain"
+    assert "Plain text content" in data["content"]
+    # No pandoc should be called for plain format
+    fake_run.assert_not_called()
 
 
 # ---------------------------------------------------------------------------
@@ -2106,71 +2492,47 @@ async def test_extract_pdf_pages_clean_html_default_true(tmp_path: Path):
 # ---------------------------------------------------------------------------
 
 
-async def test_extract_pdf_pages_with_fuzzy_hint(tmp_path: Path):
+async def test_extract_pdf_pages_with_fuzzy_hint(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
     """Test extract_pdf_pages with fuzzy_hint parameter filters pages by content."""
     # Test with PyMuPDF
 
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document with multiple pages
-        mock_doc = MagicMock()
-        mock_doc.page_count = 5
-        mock_doc.get_page_numbers.return_value = []  # No label matches
-        mock_doc.get_page_labels.return_value = None
-
-        # Create mock pages with different content
-        mock_pages = {}
-        page_contents = [
-            "This page talks about neural networks and deep learning",
-            "This page is about data structures and algorithms",
-            "Machine learning and neural networks are discussed here",
-            "Python programming basics",
-            "Advanced neural network architectures",
-        ]
-
-        for i in range(5):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = page_contents[i]
-            mock_page.get_label.return_value = str(i + 1)
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
-
-        # Configure fitz.open to return mock document
-        mock_fitz_open.return_value = mock_doc
+        # Create mock document with pages of different content
+        mock_fitz_open.return_value = _make_mock_doc(
+            [
+                "This page talks about neural networks and deep learning",
+                "This page is about data structures and algorithms",
+                "Machine learning and neural networks are discussed here",
+                "Python programming basics",
+                "Advanced neural network architectures",
+            ]
+        )
 
         # Mock fzf for fuzzy filtering
-        with patch("subprocess.run") as mock_run:
-            # Mock fzf filtering - return only pages containing "neural"
-            mock_fzf_result = MagicMock()
-            mock_fzf_result.returncode = 0
-            # Return pages 1, 3, and 5 (0-based: 0, 2, 4) that mention neural
-            mock_fzf_result.stdout = (
+        with patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"):
+            # Mock fzf filtering - return only pages containing "neural":
+            # pages 1, 3, and 5 (0-based: 0, 2, 4)
+            fake_run.results["fzf"] = _ok(
                 b"Page 1 (Label: 1)\nThis page talks about neural networks and deep learning\x00"
                 b"Page 3 (Label: 3)\nMachine learning and neural networks are discussed here\x00"
                 b"Page 5 (Label: 5)\nAdvanced neural network architectures\x00"
             )
-            mock_run.return_value = mock_fzf_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Extract all pages but filter with fuzzy_hint
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "1-5",
-                        "format": "plain",
-                        "fuzzy_hint": "neural",
-                    },
-                )
 
-            data = json.loads(result.content[0].text)
+            # Extract all pages but filter with fuzzy_hint
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {
+                    "file": str(test_pdf),
+                    "pages": "1-5",
+                    "format": "plain",
+                    "fuzzy_hint": "neural",
+                },
+            )
             assert "content" in data
             assert "fuzzy_hint" in data
             assert data["fuzzy_hint"] == "neural"
@@ -2188,53 +2550,34 @@ async def test_extract_pdf_pages_with_fuzzy_hint(tmp_path: Path):
             assert "Python programming" not in content  # Page 4 filtered out
 
 
-async def test_extract_pdf_pages_fuzzy_hint_no_matches(tmp_path: Path):
+async def test_extract_pdf_pages_fuzzy_hint_no_matches(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
     """Test extract_pdf_pages with fuzzy_hint that matches no pages returns all pages."""
     # Test with PyMuPDF
 
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
         # Create mock document
-        mock_doc = MagicMock()
-        mock_doc.page_count = 2
-        mock_doc.get_page_numbers.return_value = []
-        mock_doc.get_page_labels.return_value = None
-
-        # Create mock pages
-        mock_pages = {}
-        for i in range(2):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = f"Content for page {i + 1}"
-            mock_page.get_label.return_value = str(i + 1)
-            mock_pages[i] = mock_page
-
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
-        mock_fitz_open.return_value = mock_doc
+        mock_fitz_open.return_value = _make_mock_doc(
+            [f"Content for page {i + 1}" for i in range(2)]
+        )
 
         # Mock fzf returning no matches
-        with patch("subprocess.run") as mock_run:
-            mock_fzf_result = MagicMock()
-            mock_fzf_result.returncode = 0
-            mock_fzf_result.stdout = b""  # No matches
-            mock_run.return_value = mock_fzf_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "1,2",
-                        "format": "plain",
-                        "fuzzy_hint": "nonexistent",
-                    },
-                )
+        with patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"):
+            fake_run.results["fzf"] = _ok(b"")
 
-            data = json.loads(result.content[0].text)
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {
+                    "file": str(test_pdf),
+                    "pages": "1,2",
+                    "format": "plain",
+                    "fuzzy_hint": "nonexistent",
+                },
+            )
 
             # Should return all pages when no matches
             assert data["pages_before_filter"] == 2
@@ -2245,372 +2588,200 @@ async def test_extract_pdf_pages_fuzzy_hint_no_matches(tmp_path: Path):
 
 
 # ---------------------------------------------------------------------------
-# Zero-Based Index Tests
-# ---------------------------------------------------------------------------
-
-
-async def test_extract_pdf_pages_zero_based_single(tmp_path: Path):
-    """Test extract_pdf_pages with zero_based=True for single pages."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
-
-    with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document with 5 pages
-        mock_doc = MagicMock()
-        mock_doc.page_count = 5
-        mock_doc.get_page_labels.return_value = ["i", "ii", "iii", "1", "2"]
-
-        # Create mock pages
-        mock_pages = {}
-        for i in range(5):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = f"Content from page {i}"
-            mock_page.get_label.return_value = mock_doc.get_page_labels.return_value[i]
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages using __getitem__
-        def mock_getitem(self, idx):
-            return mock_pages.get(idx)
-
-        mock_doc.__getitem__ = mock_getitem
-        mock_doc.close = MagicMock()
-        mock_fitz_open.return_value = mock_doc
-
-        # Mock pandoc (need to patch subprocess.run in mcp_fuzzy_search module)
-        with patch("mcp_fuzzy_search.subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"Markdown content"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Test extracting pages using 0-based indices
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "0,2,4",  # First, third, and fifth pages
-                        "zero_based": True,
-                    },
-                )
-
-                data = json.loads(result.content[0].text)
-                assert "error" not in data
-                assert data["pages_extracted"] == [0, 2, 4]
-                # With zero_based=true, page_labels should show the 0-based indices
-                assert data["page_labels"] == ["0", "2", "4"]
-                assert data["format"] == "markdown"
-
-
-async def test_extract_pdf_pages_zero_based_ranges(tmp_path: Path):
-    """Test extract_pdf_pages with zero_based=True for ranges."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
-
-    with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document with 10 pages
-        mock_doc = MagicMock()
-        mock_doc.page_count = 10
-        mock_doc.get_page_labels.return_value = [
-            "i",
-            "ii",
-            "iii",
-            "iv",
-            "v",
-            "1",
-            "2",
-            "3",
-            "4",
-            "5",
-        ]
-
-        # Create mock pages
-        mock_pages = {}
-        for i in range(10):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = f"Content from page {i}"
-            if i < len(mock_doc.get_page_labels.return_value):
-                mock_page.get_label.return_value = (
-                    mock_doc.get_page_labels.return_value[i]
-                )
-            else:
-                mock_page.get_label.return_value = str(i + 1)
-            mock_pages[i] = mock_page
+# Zero-Based Index Tests
+# ---------------------------------------------------------------------------
 
-        # Configure document to return pages using __getitem__
-        def mock_getitem(self, idx):
-            return mock_pages.get(idx)
 
-        mock_doc.__getitem__ = mock_getitem
-        mock_doc.close = MagicMock()
-        mock_fitz_open.return_value = mock_doc
+@pytest.mark.parametrize(
+    ("pages", "labels", "expected_indices"),
+    [
+        # First, third, and fifth pages
+        pytest.param("0,2,4", ["i", "ii", "iii", "1", "2"], [0, 2, 4], id="single"),
+        # First 5 pages (0,1,2,3,4)
+        pytest.param(
+            "0-4",
+            ["i", "ii", "iii", "iv", "v", "1", "2", "3", "4", "5"],
+            [0, 1, 2, 3, 4],
+            id="ranges",
+        ),
+        # Pages 1, 3-5, 8, 10 (1-based) of a document without page labels
+        pytest.param("0,2-4,7,9", None, [0, 2, 3, 4, 7, 9], id="mixed"),
+    ],
+)
+async def test_extract_pdf_pages_zero_based(
+    minimal_pdf_path: Path, mcp_client, pages, labels, expected_indices, fake_run
+):
+    """Test extract_pdf_pages with zero_based=True for single pages and ranges."""
+    page_count = len(labels) if labels else 10
+    mock_doc = _make_mock_doc(
+        [f"Content from page {i}" for i in range(page_count)], labels
+    )
 
-        # Mock pandoc (need to patch subprocess.run in mcp_fuzzy_search module)
-        with patch("mcp_fuzzy_search.subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"Markdown content"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Test extracting pages using 0-based range
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "0-4",  # First 5 pages (0,1,2,3,4)
-                        "zero_based": True,
-                    },
-                )
+    with (
+        patch("mcp_fuzzy_search.fitz.open", return_value=mock_doc),
+        patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"),
+    ):
+        fake_run.results["pandoc"] = _ok(b"Markdown content")
+        result = await mcp_client.call_tool(
+            "extract_pdf_pages",
+            {"file": str(minimal_pdf_path), "pages": pages, "zero_based": True},
+        )
 
-                data = json.loads(result.content[0].text)
-                assert "error" not in data
-                assert data["pages_extracted"] == [0, 1, 2, 3, 4]
-                # With zero_based=true and ranges, page_labels should show the 0-based indices
-                assert data["page_labels"] == ["0", "1", "2", "3", "4"]
-                assert data["format"] == "markdown"
+    data = _parse(result)
+    assert "error" not in data
+    assert data["pages_extracted"] == expected_indices
+    # With zero_based=true, page_labels show the 0-based indices, not the labels
+    assert data["page_labels"] == [str(i) for i in expected_indices]
+    assert data["format"] == "markdown"
 
 
-async def test_extract_pdf_pages_zero_based_mixed(tmp_path: Path):
-    """Test extract_pdf_pages with zero_based=True for mixed specifications."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+async def test_extract_pdf_pages_zero_based_errors(minimal_pdf_path: Path, mcp_client):
+    """Test extract_pdf_pages with zero_based=True error handling."""
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document with 10 pages
+        # Create mock document with 5 pages
         mock_doc = MagicMock()
-        mock_doc.page_count = 10
-        mock_doc.get_page_labels.return_value = None  # No page labels
-
-        # Create mock pages
-        mock_pages = {}
-        for i in range(10):
-            mock_page = MagicMock()
-            mock_page.get_text.return_value = f"Content from page {i}"
-            mock_page.get_label.return_value = str(i + 1)
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages using __getitem__
-        def mock_getitem(self, idx):
-            return mock_pages.get(idx)
-
-        mock_doc.__getitem__ = mock_getitem
-        mock_doc.close = MagicMock()
+        mock_doc.page_count = 5
         mock_fitz_open.return_value = mock_doc
 
-        # Mock pandoc (need to patch subprocess.run in mcp_fuzzy_search module)
-        with patch("mcp_fuzzy_search.subprocess.run") as mock_run:
-            mock_pandoc_result = MagicMock()
-            mock_pandoc_result.returncode = 0
-            mock_pandoc_result.stdout = b"Markdown content"
-            mock_pandoc_result.stderr = b""
-            mock_run.return_value = mock_pandoc_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Test extracting pages using mixed 0-based specifications
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "0,2-4,7,9",  # Pages 1, 3-5, 8, 10 (1-based)
-                        "zero_based": True,
-                    },
-                )
+        # Test out of range index
+        data = await _call(
+            mcp_client,
+            "extract_pdf_pages",
+            {
+                "file": str(test_pdf),
+                "pages": "10",  # Out of range (only 5 pages)
+                "zero_based": True,
+            },
+        )
+        assert "error" in data
+        assert "Must be a valid 0-based index" in data["error"]
+        assert "0 to 4" in data["error"]  # Should show valid range
 
-                data = json.loads(result.content[0].text)
-                assert "error" not in data
-                assert data["pages_extracted"] == [0, 2, 3, 4, 7, 9]
-                assert data["page_labels"] == ["0", "2", "3", "4", "7", "9"]
-                assert data["format"] == "markdown"
+        # Test invalid range (start > end)
+        data = await _call(
+            mcp_client,
+            "extract_pdf_pages",
+            {
+                "file": str(test_pdf),
+                "pages": "3-1",  # Invalid range
+                "zero_based": True,
+            },
+        )
+        assert "error" in data
+        assert "Must be a valid 0-based index" in data["error"]
+
+        # Test non-numeric input
+        data = await _call(
+            mcp_client,
+            "extract_pdf_pages",
+            {
+                "file": str(test_pdf),
+                "pages": "abc",  # Not a number
+                "zero_based": True,
+            },
+        )
+        assert "error" in data
+        assert "Must be a valid 0-based index" in data["error"]
 
 
-async def test_extract_pdf_pages_zero_based_errors(tmp_path: Path):
-    """Test extract_pdf_pages with zero_based=True error handling."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+async def test_extract_pdf_pages_one_based(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
+    """Test extract_pdf_pages with one_based=True."""
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document with 5 pages
-        mock_doc = MagicMock()
-        mock_doc.page_count = 5
-        mock_fitz_open.return_value = mock_doc
+        # Create mock document with 10 pages
+        mock_fitz_open.return_value = _make_mock_doc(
+            [f"Page {i + 1} content" for i in range(10)]
+        )
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            # Test out of range index
-            result = await client.call_tool(
+        # Mock subprocess for pdftotext/pandoc - return bytes
+        with patch.object(mcp_fuzzy_search, "PANDOC_EXECUTABLE", "/mock/pandoc"):
+            fake_run.results["pandoc"] = _ok(b"Page 1 content")
+
+            # Test single page with one_based
+            data = await _call(
+                mcp_client,
                 "extract_pdf_pages",
                 {
                     "file": str(test_pdf),
-                    "pages": "10",  # Out of range (only 5 pages)
-                    "zero_based": True,
+                    "pages": "5",  # Page 5 (1-based)
+                    "one_based": True,
                 },
             )
+            assert "error" not in data
+            assert data["pages_extracted"] == [4]  # 0-based index
+            assert data["page_labels"] == ["5"]  # 1-based page number as label
 
-            data = json.loads(result.content[0].text)
-            assert "error" in data
-            assert "Must be a valid 0-based index" in data["error"]
-            assert "0 to 4" in data["error"]  # Should show valid range
-
-            # Test invalid range (start > end)
-            result = await client.call_tool(
+            # Test range with one_based
+            data = await _call(
+                mcp_client,
                 "extract_pdf_pages",
                 {
                     "file": str(test_pdf),
-                    "pages": "3-1",  # Invalid range
-                    "zero_based": True,
+                    "pages": "1-3",  # Pages 1-3 (1-based)
+                    "one_based": True,
+                },
+            )
+            assert "error" not in data
+            assert data["pages_extracted"] == [0, 1, 2]  # 0-based indices
+            assert data["page_labels"] == [
+                "1",
+                "2",
+                "3",
+            ]  # 1-based page numbers as labels
+
+            # Test mixed pages with one_based
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {
+                    "file": str(test_pdf),
+                    "pages": "1,3-5,8,10",  # Pages 1, 3-5, 8, 10 (1-based)
+                    "one_based": True,
+                },
+            )
+            assert "error" not in data
+            assert data["pages_extracted"] == [0, 2, 3, 4, 7, 9]  # 0-based indices
+            assert data["page_labels"] == [
+                "1",
+                "3",
+                "4",
+                "5",
+                "8",
+                "10",
+            ]  # 1-based page numbers as labels
+
+            # Test error handling - out of range
+            data = await _call(
+                mcp_client,
+                "extract_pdf_pages",
+                {
+                    "file": str(test_pdf),
+                    "pages": "11",  # Out of range (only 10 pages)
+                    "one_based": True,
                 },
             )
-
-            data = json.loads(result.content[0].text)
             assert "error" in data
-            assert "Must be a valid 0-based index" in data["error"]
+            assert "Must be a valid 1-based page number" in data["error"]
+            assert "1 to 10" in data["error"]  # Should show valid range
 
-            # Test non-numeric input
-            result = await client.call_tool(
+            # Test that one_based and zero_based cannot be used together
+            data = await _call(
+                mcp_client,
                 "extract_pdf_pages",
                 {
                     "file": str(test_pdf),
-                    "pages": "abc",  # Not a number
-                    "zero_based": True,
+                    "pages": "1-3",
+                    "one_based": True,
+                    "zero_based": True,  # Both flags set
                 },
             )
-
-            data = json.loads(result.content[0].text)
             assert "error" in data
-            assert "Must be a valid 0-based index" in data["error"]
-
-
-async def test_extract_pdf_pages_one_based(tmp_path: Path):
-    """Test extract_pdf_pages with one_based=True."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
-
-    with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document with 10 pages
-        mock_doc = MagicMock()
-        mock_doc.page_count = 10
-
-        # Create mock pages with proper get_text method
-        mock_pages = {}
-        for i in range(10):
-            mock_page = MagicMock()
-            # Mock the get_text method to return page content
-            mock_page.get_text.return_value = f"Page {i + 1} content"
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
-
-        # Configure fitz.open to return mock document
-        mock_fitz_open.return_value = mock_doc
-
-        # Mock subprocess for pdftotext/pandoc - return bytes
-        with patch("subprocess.run") as mock_run:
-            mock_result = MagicMock()
-            mock_result.returncode = 0
-            mock_result.stdout = b"Page 1 content"  # Return bytes
-            mock_result.stderr = b""
-            mock_run.return_value = mock_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                # Test single page with one_based
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "5",  # Page 5 (1-based)
-                        "one_based": True,
-                    },
-                )
-
-                data = json.loads(result.content[0].text)
-                assert "error" not in data
-                assert data["pages_extracted"] == [4]  # 0-based index
-                assert data["page_labels"] == ["5"]  # 1-based page number as label
-
-                # Test range with one_based
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "1-3",  # Pages 1-3 (1-based)
-                        "one_based": True,
-                    },
-                )
-
-                data = json.loads(result.content[0].text)
-                assert "error" not in data
-                assert data["pages_extracted"] == [0, 1, 2]  # 0-based indices
-                assert data["page_labels"] == [
-                    "1",
-                    "2",
-                    "3",
-                ]  # 1-based page numbers as labels
-
-                # Test mixed pages with one_based
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "1,3-5,8,10",  # Pages 1, 3-5, 8, 10 (1-based)
-                        "one_based": True,
-                    },
-                )
-
-                data = json.loads(result.content[0].text)
-                assert "error" not in data
-                assert data["pages_extracted"] == [0, 2, 3, 4, 7, 9]  # 0-based indices
-                assert data["page_labels"] == [
-                    "1",
-                    "3",
-                    "4",
-                    "5",
-                    "8",
-                    "10",
-                ]  # 1-based page numbers as labels
-
-                # Test error handling - out of range
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "11",  # Out of range (only 10 pages)
-                        "one_based": True,
-                    },
-                )
-
-                data = json.loads(result.content[0].text)
-                assert "error" in data
-                assert "Must be a valid 1-based page number" in data["error"]
-                assert "1 to 10" in data["error"]  # Should show valid range
-
-                # Test that one_based and zero_based cannot be used together
-                result = await client.call_tool(
-                    "extract_pdf_pages",
-                    {
-                        "file": str(test_pdf),
-                        "pages": "1-3",
-                        "one_based": True,
-                        "zero_based": True,  # Both flags set
-                    },
-                )
-
-                data = json.loads(result.content[0].text)
-                assert "error" in data
-                assert "Cannot use both" in data["error"]
+            assert "Cannot use both" in data["error"]
 
 
 # ---------------------------------------------------------------------------
@@ -2618,40 +2789,20 @@ async def test_extract_pdf_pages_one_based(tmp_path: Path):
 # ---------------------------------------------------------------------------
 
 
-async def test_get_pdf_page_labels(tmp_path: Path):
+async def test_get_pdf_page_labels(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_page_labels tool."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document
-        mock_doc = MagicMock()
-        mock_doc.page_count = 5
-
-        # Create mock pages with labels
-        mock_pages = {}
+        # Create mock document with labelled pages
         labels = ["i", "ii", "iii", "1", "2"]
-        for i in range(5):
-            mock_page = MagicMock()
-            mock_page.get_label.return_value = labels[i]
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
+        mock_fitz_open.return_value = _make_mock_doc([""] * len(labels), labels)
 
-        # Configure fitz.open to return mock document
-        mock_fitz_open.return_value = mock_doc
-
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_page_labels",
-                {"file": str(test_pdf)},
-            )
-
-        data = json.loads(result.content[0].text)
+        data = await _call(
+            mcp_client,
+            "get_pdf_page_labels",
+            {"file": str(test_pdf)},
+        )
         assert data["page_count"] == 5
         assert data["page_labels"] == {
             "0": "i",
@@ -2662,12 +2813,9 @@ async def test_get_pdf_page_labels(tmp_path: Path):
         }
 
 
-async def test_get_pdf_page_count(tmp_path: Path):
+async def test_get_pdf_page_count(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_page_count tool."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
         # Create mock document
@@ -2678,64 +2826,40 @@ async def test_get_pdf_page_count(tmp_path: Path):
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_page_count",
-                {"file": str(test_pdf)},
-            )
-
-        data = json.loads(result.content[0].text)
+        data = await _call(
+            mcp_client,
+            "get_pdf_page_count",
+            {"file": str(test_pdf)},
+        )
         assert data["page_count"] == 123
 
 
-async def test_get_pdf_page_labels_missing_file():
+async def test_get_pdf_page_labels_missing_file(mcp_client):
     """Test get_pdf_page_labels with missing file."""
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "get_pdf_page_labels",
-            {"file": "/nonexistent/file.pdf"},
-        )
-
-    data = json.loads(result.content[0].text)
+    data = await _call(
+        mcp_client,
+        "get_pdf_page_labels",
+        {"file": "/nonexistent/file.pdf"},
+    )
     assert "error" in data
     assert "not found" in data["error"]
 
 
-async def test_get_pdf_page_labels_with_start_limit(tmp_path: Path):
+async def test_get_pdf_page_labels_with_start_limit(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_page_labels with start and limit parameters."""
-    test_pdf = tmp_path / "test.pdf"
-    # Create a minimal valid PDF that PyMuPDF can open
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
-        # Create mock document with 10 pages
-        mock_doc = MagicMock()
-        mock_doc.page_count = 10
-
-        # Create mock pages with labels
-        mock_pages = {}
+        # Create mock document with 10 labelled pages
         labels = ["i", "ii", "iii", "iv", "v", "1", "2", "3", "4", "5"]
-        for i in range(10):
-            mock_page = MagicMock()
-            mock_page.get_label.return_value = labels[i]
-            mock_pages[i] = mock_page
-
-        # Configure document to return pages
-        mock_doc.__getitem__ = lambda self, idx: mock_pages.get(idx)
-        mock_doc.close = MagicMock()
+        mock_fitz_open.return_value = _make_mock_doc([""] * len(labels), labels)
 
-        # Configure fitz.open to return mock document
-        mock_fitz_open.return_value = mock_doc
-
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            # Test with start=2, limit=3 (should return pages 2,3,4)
-            result = await client.call_tool(
-                "get_pdf_page_labels",
-                {"file": str(test_pdf), "start": 2, "limit": 3},
-            )
-
-        data = json.loads(result.content[0].text)
+        # Test with start=2, limit=3 (should return pages 2,3,4)
+        data = await _call(
+            mcp_client,
+            "get_pdf_page_labels",
+            {"file": str(test_pdf), "start": 2, "limit": 3},
+        )
         assert data["page_count"] == 10  # Total count remains the same
         assert data["page_labels"] == {
             "2": "iii",
@@ -2744,13 +2868,11 @@ async def test_get_pdf_page_labels_with_start_limit(tmp_path: Path):
         }
 
         # Test with only limit
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_page_labels",
-                {"file": str(test_pdf), "limit": 2},
-            )
-
-        data = json.loads(result.content[0].text)
+        data = await _call(
+            mcp_client,
+            "get_pdf_page_labels",
+            {"file": str(test_pdf), "limit": 2},
+        )
         assert data["page_count"] == 10
         assert data["page_labels"] == {
             "0": "i",
@@ -2758,26 +2880,22 @@ async def test_get_pdf_page_labels_with_start_limit(tmp_path: Path):
         }
 
         # Test with start beyond page count
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_page_labels",
-                {"file": str(test_pdf), "start": 20, "limit": 5},
-            )
-
-        data = json.loads(result.content[0].text)
+        data = await _call(
+            mcp_client,
+            "get_pdf_page_labels",
+            {"file": str(test_pdf), "start": 20, "limit": 5},
+        )
         assert data["page_count"] == 10
         assert data["page_labels"] == {}  # Empty since start is beyond page count
 
 
-async def test_get_pdf_page_count_missing_file():
+async def test_get_pdf_page_count_missing_file(mcp_client):
     """Test get_pdf_page_count with missing file."""
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "get_pdf_page_count",
-            {"file": "/nonexistent/file.pdf"},
-        )
-
-    data = json.loads(result.content[0].text)
+    data = await _call(
+        mcp_client,
+        "get_pdf_page_count",
+        {"file": "/nonexistent/file.pdf"},
+    )
     assert "error" in data
     assert "not found" in data["error"]
 
@@ -2787,12 +2905,9 @@ async def test_get_pdf_page_count_missing_file():
 # ---------------------------------------------------------------------------
 
 
-async def test_get_pdf_outline_basic(tmp_path: Path):
+async def test_get_pdf_outline_basic(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_outline with basic outline structure."""
-    # Create a test PDF
-    test_pdf = tmp_path / "test_outline.pdf"
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     # Mock PyMuPDF
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
@@ -2832,32 +2947,27 @@ async def test_get_pdf_outline_basic(tmp_path: Path):
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_outline",
-                {"file": str(test_pdf)},
-            )
-
-            data = json.loads(result.content[0].text)
-            assert "outline" in data
-            assert "total_entries" in data
-            assert "max_depth_found" in data
+        data = await _call(
+            mcp_client,
+            "get_pdf_outline",
+            {"file": str(test_pdf)},
+        )
+        assert "outline" in data
+        assert "total_entries" in data
+        assert "max_depth_found" in data
 
-            assert data["total_entries"] == 2
-            assert data["max_depth_found"] == 1
+        assert data["total_entries"] == 2
+        assert data["max_depth_found"] == 1
 
-            # Check outline entries
-            assert len(data["outline"]) == 2
-            assert data["outline"][0] == [1, "Chapter 1", 1, "i"]
-            assert data["outline"][1] == [1, "Chapter 2", 5, "1"]
+        # Check outline entries
+        assert len(data["outline"]) == 2
+        assert data["outline"][0] == [1, "Chapter 1", 1, "i"]
+        assert data["outline"][1] == [1, "Chapter 2", 5, "1"]
 
 
-async def test_get_pdf_outline_empty(tmp_path: Path):
+async def test_get_pdf_outline_empty(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_outline with PDF that has no outline."""
-    # Create a test PDF
-    test_pdf = tmp_path / "test_no_outline.pdf"
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     # Mock PyMuPDF
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
@@ -2870,24 +2980,19 @@ async def test_get_pdf_outline_empty(tmp_path: Path):
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_outline",
-                {"file": str(test_pdf)},
-            )
-
-            data = json.loads(result.content[0].text)
-            assert data["outline"] == []
-            assert data["total_entries"] == 0
-            assert data["max_depth_found"] == 0
+        data = await _call(
+            mcp_client,
+            "get_pdf_outline",
+            {"file": str(test_pdf)},
+        )
+        assert data["outline"] == []
+        assert data["total_entries"] == 0
+        assert data["max_depth_found"] == 0
 
 
-async def test_get_pdf_outline_hierarchical(tmp_path: Path):
+async def test_get_pdf_outline_hierarchical(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_outline with hierarchical outline structure."""
-    # Create a test PDF
-    test_pdf = tmp_path / "test_hierarchical.pdf"
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     # Mock PyMuPDF
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
@@ -2960,31 +3065,26 @@ async def test_get_pdf_outline_hierarchical(tmp_path: Path):
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_outline",
-                {"file": str(test_pdf)},
-            )
-
-            data = json.loads(result.content[0].text)
-            assert data["total_entries"] == 5
-            assert data["max_depth_found"] == 3
+        data = await _call(
+            mcp_client,
+            "get_pdf_outline",
+            {"file": str(test_pdf)},
+        )
+        assert data["total_entries"] == 5
+        assert data["max_depth_found"] == 3
 
-            # Check outline entries
-            assert len(data["outline"]) == 5
-            assert data["outline"][0] == [1, "Chapter 1", 1, "1"]
-            assert data["outline"][1] == [2, "Section 1.1", 2, "2"]
-            assert data["outline"][2] == [3, "Subsection 1.1.1", 3, "3"]
-            assert data["outline"][3] == [2, "Section 1.2", 4, "4"]
-            assert data["outline"][4] == [1, "Chapter 2", 6, "6"]
+        # Check outline entries
+        assert len(data["outline"]) == 5
+        assert data["outline"][0] == [1, "Chapter 1", 1, "1"]
+        assert data["outline"][1] == [2, "Section 1.1", 2, "2"]
+        assert data["outline"][2] == [3, "Subsection 1.1.1", 3, "3"]
+        assert data["outline"][3] == [2, "Section 1.2", 4, "4"]
+        assert data["outline"][4] == [1, "Chapter 2", 6, "6"]
 
 
-async def test_get_pdf_outline_with_max_depth(tmp_path: Path):
+async def test_get_pdf_outline_with_max_depth(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_outline with max_depth parameter."""
-    # Create a test PDF
-    test_pdf = tmp_path / "test_max_depth.pdf"
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     # Mock PyMuPDF with same hierarchical structure as before
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
@@ -3033,29 +3133,26 @@ async def test_get_pdf_outline_with_max_depth(tmp_path: Path):
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_outline",
-                {"file": str(test_pdf), "max_depth": 2},
-            )
-
-            data = json.loads(result.content[0].text)
-            # Should only include entries up to depth 2
-            assert data["total_entries"] == 2
-            assert data["max_depth_found"] == 2
+        data = await _call(
+            mcp_client,
+            "get_pdf_outline",
+            {"file": str(test_pdf), "max_depth": 2},
+        )
+        # Should only include entries up to depth 2
+        assert data["total_entries"] == 2
+        assert data["max_depth_found"] == 2
 
-            # Check outline entries - should not include depth 3
-            assert len(data["outline"]) == 2
-            assert data["outline"][0] == [1, "Chapter 1", 1, "1"]
-            assert data["outline"][1] == [2, "Section 1.1", 2, "2"]
+        # Check outline entries - should not include depth 3
+        assert len(data["outline"]) == 2
+        assert data["outline"][0] == [1, "Chapter 1", 1, "1"]
+        assert data["outline"][1] == [2, "Section 1.1", 2, "2"]
 
 
-async def test_get_pdf_outline_with_fuzzy_filter(tmp_path: Path):
+async def test_get_pdf_outline_with_fuzzy_filter(
+    minimal_pdf_path: Path, mcp_client, fake_run
+):
     """Test get_pdf_outline with fuzzy filtering."""
-    # Create a test PDF
-    test_pdf = tmp_path / "test_fuzzy.pdf"
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     # Mock PyMuPDF
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
@@ -3105,38 +3202,30 @@ async def test_get_pdf_outline_with_fuzzy_filter(tmp_path: Path):
         mock_fitz_open.return_value = mock_doc
 
         # Mock fzf subprocess for fuzzy filtering
-        with patch("subprocess.run") as mock_run:
+        with patch.object(mcp_fuzzy_search, "FZF_EXECUTABLE", "/mock/fzf"):
             # Simulate fzf filtering for "chapter"
-            mock_result = MagicMock()
-            mock_result.returncode = 0
-            mock_result.stdout = (
+            fake_run.results["fzf"] = _ok(
                 "1:Chapter 1: Getting Started\n2:Chapter 2: Advanced Topics"
             )
-            mock_run.return_value = mock_result
-
-            async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-                result = await client.call_tool(
-                    "get_pdf_outline",
-                    {"file": str(test_pdf), "fuzzy_filter": "chapter"},
-                )
 
-                data = json.loads(result.content[0].text)
-                assert "filtered_count" in data
-                assert data["filtered_count"] == 2
-                assert data["total_entries"] == 3
+            data = await _call(
+                mcp_client,
+                "get_pdf_outline",
+                {"file": str(test_pdf), "fuzzy_filter": "chapter"},
+            )
+            assert "filtered_count" in data
+            assert data["filtered_count"] == 2
+            assert data["total_entries"] == 3
 
-                # Check filtered outline entries
-                assert len(data["outline"]) == 2
-                assert data["outline"][0][1] == "Chapter 1: Getting Started"
-                assert data["outline"][1][1] == "Chapter 2: Advanced Topics"
+            # Check filtered outline entries
+            assert len(data["outline"]) == 2
+            assert data["outline"][0][1] == "Chapter 1: Getting Started"
+            assert data["outline"][1][1] == "Chapter 2: Advanced Topics"
 
 
-async def test_get_pdf_outline_detailed_output(tmp_path: Path):
+async def test_get_pdf_outline_detailed_output(minimal_pdf_path: Path, mcp_client):
     """Test get_pdf_outline with detailed output (simple=False)."""
-    # Create a test PDF
-    test_pdf = tmp_path / "test_detailed.pdf"
-    pdf_content = b"%PDF-1.4\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>\nendobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer\n<< /Size 4 /Root 1 0 R >>\nstartxref\n203\n%%EOF"
-    test_pdf.write_bytes(pdf_content)
+    test_pdf = minimal_pdf_path
 
     # Mock PyMuPDF
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
@@ -3174,48 +3263,44 @@ async def test_get_pdf_outline_detailed_output(tmp_path: Path):
         # Configure fitz.open to return mock document
         mock_fitz_open.return_value = mock_doc
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_outline",
-                {"file": str(test_pdf), "simple": False},
-            )
-
-            data = json.loads(result.content[0].text)
-            assert len(data["outline"]) == 1
-
-            # Check detailed entry format
-            entry = data["outline"][0]
-            assert len(entry) == 5  # [level, title, page, page_label, link]
-            assert entry[0] == 1  # level
-            assert entry[1] == "Chapter 1"  # title
-            assert entry[2] == 1  # page
-            assert entry[3] == "1"  # page_label
-
-            # Check link details
-            link = entry[4]
-            assert link["page"] == 1
-            assert link["uri"] == "#page=1&zoom=100,0,0"
-            assert link["is_external"] is False
-            assert link["is_open"] is True
-            assert "dest" in link
-            assert link["dest"]["kind"] == 1
-            assert link["dest"]["zoom"] == 100
-
-
-async def test_get_pdf_outline_missing_file():
-    """Test get_pdf_outline with missing file."""
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
+        data = await _call(
+            mcp_client,
             "get_pdf_outline",
-            {"file": "/nonexistent/file.pdf"},
+            {"file": str(test_pdf), "simple": False},
         )
-
-    data = json.loads(result.content[0].text)
+        assert len(data["outline"]) == 1
+
+        # Check detailed entry format
+        entry = data["outline"][0]
+        assert len(entry) == 5  # [level, title, page, page_label, link]
+        assert entry[0] == 1  # level
+        assert entry[1] == "Chapter 1"  # title
+        assert entry[2] == 1  # page
+        assert entry[3] == "1"  # page_label
+
+        # Check link details
+        link = entry[4]
+        assert link["page"] == 1
+        assert link["uri"] == "#page=1&zoom=100,0,0"
+        assert link["is_external"] is False
+        assert link["is_open"] is True
+        assert "dest" in link
+        assert link["dest"]["kind"] == 1
+        assert link["dest"]["zoom"] == 100
+
+
+async def test_get_pdf_outline_missing_file(mcp_client):
+    """Test get_pdf_outline with missing file."""
+    data = await _call(
+        mcp_client,
+        "get_pdf_outline",
+        {"file": "/nonexistent/file.pdf"},
+    )
     assert "error" in data
     assert "not found" in data["error"]
 
 
-async def test_get_pdf_outline_invalid_pdf(tmp_path: Path):
+async def test_get_pdf_outline_invalid_pdf(tmp_path: Path, mcp_client):
     """Test get_pdf_outline with invalid PDF."""
     # Create an invalid PDF file
     test_pdf = tmp_path / "invalid.pdf"
@@ -3225,37 +3310,32 @@ async def test_get_pdf_outline_invalid_pdf(tmp_path: Path):
     with patch("mcp_fuzzy_search.fitz.open") as mock_fitz_open:
         mock_fitz_open.side_effect = Exception("Invalid PDF format")
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "get_pdf_outline",
-                {"file": str(test_pdf)},
-            )
-
-        data = json.loads(result.content[0].text)
+        data = await _call(
+            mcp_client,
+            "get_pdf_outline",
+            {"file": str(test_pdf)},
+        )
         assert "error" in data
         assert "Failed to get outline" in data["error"]
 
 
-async def test_fuzzy_search_files_root_path_validation():
+async def test_fuzzy_search_files_root_path_validation(mcp_client, binaries):
     """Test that searching from root directory without confirm_root fails."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
-
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_files", {"fuzzy_filter": "test", "path": "/"}
-        )
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "root directory" in data["error"].lower()
-        assert "confirm_root=True" in data["error"]
+    data = await _call(
+        mcp_client, "fuzzy_search_files", {"fuzzy_filter": "test", "path": "/"}
+    )
+    assert "error" in data
+    assert "root directory" in data["error"].lower()
+    assert "confirm_root=True" in data["error"]
 
 
-async def test_fuzzy_search_files_root_path_with_confirm():
+async def test_fuzzy_search_files_root_path_with_confirm(mcp_client, binaries):
     """Test that searching from root directory works with confirm_root=True."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Mock subprocess to avoid actually searching from root
     with patch("subprocess.Popen") as mock_popen:
@@ -3266,40 +3346,35 @@ async def test_fuzzy_search_files_root_path_with_confirm():
 
         # Mock the second Popen call for fzf
         fzf_proc = MagicMock()
-        fzf_proc.communicate.return_value = ("test.txt\n", None)
+        fzf_proc.communicate.return_value = (b"test.txt\n", None)
         fzf_proc.returncode = 0
         mock_popen.side_effect = [mock_proc, fzf_proc]
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_files",
-                {"fuzzy_filter": "test", "path": "/", "confirm_root": True},
-            )
-
-            data = json.loads(result.content[0].text)
-            assert "matches" in data  # Should succeed with confirm_root
+        data = await _call(
+            mcp_client,
+            "fuzzy_search_files",
+            {"fuzzy_filter": "test", "path": "/", "confirm_root": True},
+        )
+        assert "matches" in data  # Should succeed with confirm_root
 
 
-async def test_fuzzy_search_content_root_path_validation():
+async def test_fuzzy_search_content_root_path_validation(mcp_client, binaries):
     """Test that searching content from root directory without confirm_root fails."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
-
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_content", {"fuzzy_filter": "test", "path": "/"}
-        )
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "root directory" in data["error"].lower()
-        assert "confirm_root=True" in data["error"]
+    data = await _call(
+        mcp_client, "fuzzy_search_content", {"fuzzy_filter": "test", "path": "/"}
+    )
+    assert "error" in data
+    assert "root directory" in data["error"].lower()
+    assert "confirm_root=True" in data["error"]
 
 
-async def test_fuzzy_search_content_root_path_with_confirm():
+async def test_fuzzy_search_content_root_path_with_confirm(mcp_client, binaries):
     """Test that searching content from root directory works with confirm_root=True."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Mock subprocess to avoid actually searching from root
     with patch("subprocess.Popen") as mock_popen:
@@ -3316,48 +3391,38 @@ async def test_fuzzy_search_content_root_path_with_confirm():
 
         mock_popen.side_effect = [mock_rg_proc, mock_fzf_proc]
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_content",
-                {"fuzzy_filter": "test", "path": "/", "confirm_root": True},
-            )
-
-            data = json.loads(result.content[0].text)
-            assert "matches" in data  # Should succeed with confirm_root
+        data = await _call(
+            mcp_client,
+            "fuzzy_search_content",
+            {"fuzzy_filter": "test", "path": "/", "confirm_root": True},
+        )
+        assert "matches" in data  # Should succeed with confirm_root
 
 
-async def test_fuzzy_search_documents_root_path_validation():
+async def test_fuzzy_search_documents_root_path_validation(mcp_client, binaries):
     """Test that searching documents from root directory without confirm_root fails."""
-    # Skip if rga is not available
-    if shutil.which("rga") is None:
-        pytest.skip("rga not on PATH")
-    _skip_if_missing("fzf")
-
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        result = await client.call_tool(
-            "fuzzy_search_documents", {"fuzzy_filter": "test", "path": "/"}
-        )
+    _skip_if_missing(binaries, "rga")
+    _skip_if_missing(binaries, "fzf")
 
-        data = json.loads(result.content[0].text)
-        assert "error" in data
-        assert "root directory" in data["error"].lower()
-        assert "confirm_root=True" in data["error"]
+    data = await _call(
+        mcp_client, "fuzzy_search_documents", {"fuzzy_filter": "test", "path": "/"}
+    )
+    assert "error" in data
+    assert "root directory" in data["error"].lower()
+    assert "confirm_root=True" in data["error"]
 
 
-async def test_fuzzy_search_documents_root_path_with_confirm():
+async def test_fuzzy_search_documents_root_path_with_confirm(mcp_client, binaries):
     """Test that searching documents from root directory works with confirm_root=True."""
-    # Skip if rga is not available
-    if shutil.which("rga") is None:
-        pytest.skip("rga not on PATH")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rga")
+    _skip_if_missing(binaries, "fzf")
 
     # Mock subprocess to avoid actually searching from root
     with patch("subprocess.Popen") as mock_popen:
         # Mock rga process
         mock_rga_proc = MagicMock()
-        mock_rga_proc.communicate.return_value = (
-            '{"type":"match","data":{"path":{"text":"/test.pdf"},"lines":{"text":"test"},"line_number":1,"submatches":[{"match":{"text":"test"}}]}}\n',
-            "",
+        mock_rga_proc.stdout = io.BytesIO(
+            b'{"type":"match","data":{"path":{"text":"/test.pdf"},"lines":{"text":"test"},"line_number":1,"submatches":[{"match":{"text":"test"}}]}}\n'
         )
 
         # Mock fzf process
@@ -3367,20 +3432,20 @@ async def test_fuzzy_search_documents_root_path_with_confirm():
 
         mock_popen.side_effect = [mock_rga_proc, mock_fzf_proc]
 
-        async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-            result = await client.call_tool(
-                "fuzzy_search_documents",
-                {"fuzzy_filter": "test", "path": "/", "confirm_root": True},
-            )
-
-            data = json.loads(result.content[0].text)
-            assert "matches" in data  # Should succeed with confirm_root
+        data = await _call(
+            mcp_client,
+            "fuzzy_search_documents",
+            {"fuzzy_filter": "test", "path": "/", "confirm_root": True},
+        )
+        assert "matches" in data  # Should succeed with confirm_root
 
 
-async def test_fuzzy_search_content_with_file_path(tmp_path: Path):
+async def test_fuzzy_search_content_with_file_path(
+    tmp_path: Path, mcp_client, binaries
+):
     """Test fuzzy_search_content works correctly when given a file path instead of directory."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Create a test file with specific content
     test_file = tmp_path / "single_file.py"
@@ -3394,46 +3459,46 @@ def transform_data(data):
     return data.upper()
 """)
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Test searching in a single file
-        result = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "data",
-                "path": str(test_file),
-            },
-        )
-
-        data = json.loads(result.content[0].text)
-        assert "matches" in data
-        assert len(data["matches"]) >= 3  # Should find multiple occurrences of "data"
+    # Test searching in a single file
+    data = await _call(
+        mcp_client,
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "data",
+            "path": str(test_file),
+        },
+    )
+    assert "matches" in data
+    assert len(data["matches"]) >= 3  # Should find multiple occurrences of "data"
 
-        # Verify all matches are from the same file
-        for match in data["matches"]:
-            assert str(test_file) in match["file"]
-            assert "data" in match["content"].lower()
+    # Verify all matches are from the same file
+    for match in data["matches"]:
+        assert str(test_file) in match["file"]
+        assert "data" in match["content"].lower()
 
-        # Test with content_only mode
-        result_content_only = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "transform",
-                "path": str(test_file),
-                "content_only": True,
-            },
-        )
+    # Test with content_only mode
+    result_content_only = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "transform",
+            "path": str(test_file),
+            "content_only": True,
+        },
+    )
 
-        data_content_only = json.loads(result_content_only.content[0].text)
-        assert "matches" in data_content_only
-        assert (
-            len(data_content_only["matches"]) >= 2
-        )  # Should find transform_data occurrences
+    data_content_only = _parse(result_content_only)
+    assert "matches" in data_content_only
+    assert (
+        len(data_content_only["matches"]) >= 2
+    )  # Should find transform_data occurrences
 
 
-async def test_fuzzy_search_content_file_vs_directory(tmp_path: Path):
+async def test_fuzzy_search_content_file_vs_directory(
+    tmp_path: Path, mcp_client, binaries
+):
     """Test that fuzzy_search_content produces consistent results for file vs directory containing that file."""
-    _skip_if_missing("rg")
-    _skip_if_missing("fzf")
+    _skip_if_missing(binaries, "rg")
+    _skip_if_missing(binaries, "fzf")
 
     # Create a test file
     test_file = tmp_path / "test_consistency.py"
@@ -3442,48 +3507,47 @@ def unique_function_name():
     return "unique_result"
 """)
 
-    async with client_session(mcp_fuzzy_search.mcp._mcp_server) as client:
-        # Search in the file directly
-        result_file = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "unique_function_name",
-                "path": str(test_file),
-            },
-        )
+    # Search in the file directly
+    result_file = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "unique_function_name",
+            "path": str(test_file),
+        },
+    )
 
-        # Search in the directory containing the file
-        # Use a simpler filter that works on both Windows and Unix
-        result_dir = await client.call_tool(
-            "fuzzy_search_content",
-            {
-                "fuzzy_filter": "unique_function_name",
-                "path": str(tmp_path),
-            },
-        )
+    # Search in the directory containing the file
+    # Use a simpler filter that works on both Windows and Unix
+    result_dir = await mcp_client.call_tool(
+        "fuzzy_search_content",
+        {
+            "fuzzy_filter": "unique_function_name",
+            "path": str(tmp_path),
+        },
+    )
 
-        data_file = json.loads(result_file.content[0].text)
-        data_dir = json.loads(result_dir.content[0].text)
+    data_file = _parse(result_file)
+    data_dir = _parse(result_dir)
 
-        # Both should find the function
-        assert len(data_file["matches"]) >= 1
-        assert len(data_dir["matches"]) >= 1
+    # Both should find the function
+    assert len(data_file["matches"]) >= 1
+    assert len(data_dir["matches"]) >= 1
 
-        # Find the unique_function_name content in both results
-        file_contents = [
-            match["content"]
-            for match in data_file["matches"]
-            if "unique_function_name" in match["content"]
-        ]
-        dir_contents = [
-            match["content"]
-            for match in data_dir["matches"]
-            if "unique_function_name" in match["content"]
-        ]
+    # Find the unique_function_name content in both results
+    file_contents = [
+        match["content"]
+        for match in data_file["matches"]
+        if "unique_function_name" in match["content"]
+    ]
+    dir_contents = [
+        match["content"]
+        for match in data_dir["matches"]
+        if "unique_function_name" in match["content"]
+    ]
 
-        # Both should find at least one match with the function name
-        assert len(file_contents) >= 1
-        assert len(dir_contents) >= 1
+    # Both should find at least one match with the function name
+    assert len(file_contents) >= 1
+    assert len(dir_contents) >= 1
 
-        # At least one content match should be the same (allowing for ordering differences)
-        assert any(fc in dir_contents for fc in file_contents)
+    # At least one content match should be the same (allowing for ordering differences)
+    assert any(fc in dir_contents for fc in file_contents)